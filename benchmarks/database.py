@@ -0,0 +1,185 @@
+import hashlib
+import io
+import os
+import random
+import shutil
+import subprocess
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+
+import psycopg2
+
+# Database name is fixed by src/config.py
+DB_NAME = "annotationtaskdb"
+
+REPO_DIR = Path(__file__).resolve().parent.parent
+SCHEMA_FILE = Path(__file__).with_name("schema.sql")
+MIGRATIONS_DIR = REPO_DIR / "migrations"
+
+TEAMS = ["vision", "audio", "text", "medical", "robotics"]
+ANNOTATION_STATUSES = ["to do", "in progress", "in review", "done"]
+TAGS = ["cat", "dog", "car", "person", "tree", "building", "noise", "speech", "blurry", "night"]
+# Uploaded content seeded for downloads, content ids 1 to CONTENT_COUNT. Each fits in one chunk of the
+# default CONTENT_CHUNK_SIZE (256 KiB)
+CONTENT_COUNT = 20
+CONTENT_SIZE = 64 * 1024
+
+
+def get_username(number):
+    return f"user{number}"
+
+
+def connect(connection_details, database=DB_NAME):
+    return psycopg2.connect(database=database, **connection_details)
+
+
+# Existing server given by BENCHMARK_DB_HOST, BENCHMARK_DB_USER and BENCHMARK_DB_PASSWORD. These are kept
+# apart from the DB_* variables of the app so a benchmark is never pointed at a real database by accident
+def get_existing_database():
+    return {
+        "host": os.environ["BENCHMARK_DB_HOST"],
+        "user": os.environ["BENCHMARK_DB_USER"],
+        "password": os.environ["BENCHMARK_DB_PASSWORD"],
+    }
+
+
+# Creates a throwaway cluster with initdb that only listens on a unix socket in a temporary directory,
+# so it doesn't clash with a server already running on the machine. Yields the connection details
+@contextmanager
+def disposable_cluster(user="benchmark", max_connections=200):
+    directory = tempfile.mkdtemp(prefix="annotation-benchmark-")
+    data_dir = os.path.join(directory, "data")
+    server_options = f"-k {directory} -c listen_addresses='' -c max_connections={max_connections}"
+    try:
+        subprocess.run(
+            ["initdb", "-D", data_dir, "-U", user, "--auth=trust"],
+            check=True,
+            stdout=subprocess.DEVNULL,
+        )
+        subprocess.run(
+            ["pg_ctl", "-D", data_dir, "-l", os.path.join(directory, "server.log"), "-o", server_options, "-w", "start"],
+            check=True,
+            stdout=subprocess.DEVNULL,
+        )
+        # trust authentication ignores the password but the app requires one to be set
+        connection_details = {"host": directory, "user": user, "password": "benchmark"}
+
+        db_connection = connect(connection_details, database="postgres")
+        db_connection.autocommit = True
+        with db_connection.cursor() as db_cursor:
+            db_cursor.execute(f"CREATE DATABASE {DB_NAME};")
+        db_connection.close()
+
+        yield connection_details
+    finally:
+        if os.path.exists(os.path.join(data_dir, "postmaster.pid")):
+            subprocess.run(["pg_ctl", "-D", data_dir, "-m", "fast", "-w", "stop"], stdout=subprocess.DEVNULL)
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+# Creates the tables then applies the migrations in order with psql, which runs each statement on its
+# own as CREATE INDEX CONCURRENTLY requires
+def create_schema(connection_details):
+    environment = dict(os.environ, PGPASSWORD=connection_details["password"])
+    sql_files = [SCHEMA_FILE] + sorted(MIGRATIONS_DIR.glob("*.sql"))
+    for sql_file in sql_files:
+        subprocess.run(
+            [
+                "psql", "-q", "-v", "ON_ERROR_STOP=1",
+                "-h", connection_details["host"],
+                "-U", connection_details["user"],
+                "-d", DB_NAME,
+                "-f", str(sql_file),
+            ],
+            check=True,
+            env=environment,
+            stdout=subprocess.DEVNULL,
+        )
+
+
+def copy_rows(db_cursor, table_name, attributes, rows):
+    buffer = io.StringIO()
+    for row in rows:
+        buffer.write("\t".join(str(value) for value in row) + "\n")
+    buffer.seek(0)
+    db_cursor.copy_expert(f"COPY {table_name} ({', '.join(attributes)}) FROM STDIN", buffer)
+
+
+def seed_content(db_cursor, generator):
+    for _ in range(CONTENT_COUNT):
+        data = generator.randbytes(CONTENT_SIZE)
+        db_cursor.execute(
+            "INSERT INTO content (hash, size) VALUES (%s, %s) RETURNING contentid;",
+            [hashlib.sha256(data).hexdigest(), len(data)],
+        )
+        db_cursor.execute(
+            "INSERT INTO content_chunk (contentid, chunkindex, data) VALUES (%s, 0, %s);",
+            [db_cursor.fetchone()[0], psycopg2.Binary(data)],
+        )
+
+
+# Replaces the contents of the tables with a fixed dataset generated from seed. Annotations get the ids
+# 1 to annotation_count and belong to user1 to user<employee_count>. The change log, tombstones and stored
+# content are emptied too so every run starts from the same state
+def seed_database(connection_details, employee_count, annotation_count, seed=0):
+    generator = random.Random(seed)
+    employees = (
+        (
+            get_username(number),
+            f"first{number}",
+            f"last{number}",
+            TEAMS[number % len(TEAMS)],
+            "true" if number % 20 == 0 else "false",
+            f"password{number}",
+        )
+        for number in range(1, employee_count + 1)
+    )
+    annotations = (
+        (
+            get_username(generator.randint(1, employee_count)),
+            generator.choice(ANNOTATION_STATUSES),
+            f"original data {number} " + "x" * generator.randint(20, 200),
+            f"annotated data {number}",
+            ",".join(generator.sample(TAGS, generator.randint(1, 3))),
+        )
+        for number in range(1, annotation_count + 1)
+    )
+
+    db_connection = connect(connection_details)
+    try:
+        with db_connection.cursor() as db_cursor:
+            db_cursor.execute(
+                "TRUNCATE annotation, employee, annotation_change, annotation_tombstone, content"
+                " RESTART IDENTITY CASCADE;"
+            )
+            copy_rows(
+                db_cursor,
+                "employee",
+                ["username", "firstname", "lastname", "team", "admin", "password"],
+                employees,
+            )
+            copy_rows(
+                db_cursor,
+                "annotation",
+                ["username", "annotationstatus", "originaldata", "annotateddata", "tags"],
+                annotations,
+            )
+            seed_content(db_cursor, generator)
+        db_connection.commit()
+
+        db_connection.autocommit = True
+        with db_connection.cursor() as db_cursor:
+            db_cursor.execute("ANALYZE;")
+    finally:
+        db_connection.close()
+
+
+# Connections to the benchmark database other than the one asking
+def count_connections(db_connection):
+    with db_connection.cursor() as db_cursor:
+        db_cursor.execute(
+            "SELECT count(*) FROM pg_stat_activity WHERE datname = %s AND pid <> pg_backend_pid();",
+            [DB_NAME],
+        )
+        return db_cursor.fetchone()[0]
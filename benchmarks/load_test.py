@@ -0,0 +1,393 @@
+import argparse
+import http.client
+import itertools
+import json
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+from .database import (
+    REPO_DIR,
+    connect,
+    count_connections,
+    create_schema,
+    disposable_cluster,
+    get_existing_database,
+    get_username,
+    seed_database,
+    CONTENT_COUNT,
+    TAGS,
+    TEAMS,
+)
+
+# Drives every route of src/app.py with concurrent clients against a seeded database and reports latency
+# percentiles, throughput and database connections per route. Run from the repository root, e.g.
+#   python -m benchmarks.load_test --initdb --save-baseline main
+#   python -m benchmarks.load_test --initdb --compare main
+
+BASELINES_DIR = Path(__file__).with_name("baselines")
+
+
+def create_annotation(generator, employee_count):
+    return {
+        "user-name": get_username(generator.randint(1, employee_count)),
+        "annotation-status": "to do",
+        "original-data": "benchmark data",
+        "annotated-data": "",
+        "tags": generator.choice(TAGS),
+    }
+
+
+# Each scenario returns the method, path and JSON body of its next request. Updates use the lower half
+# of the seeded annotations and deletes use the upper half, so they don't interfere with each other
+def get_scenarios(employee_count, annotation_count, clients=1):
+    new_users = itertools.count(1)
+    delete_ids = iter(range(annotation_count, annotation_count // 2, -1))
+    # every annotation is patched once, while it is still at the seeded version 1
+    patch_ids = iter(range(1, annotation_count + 1))
+    update_id_range = (1, max(annotation_count // 2, 1))
+    # each client thread cycles through its own slice of the update ids
+    client_numbers = itertools.count()
+    client_state = threading.local()
+
+    def random_user(generator):
+        return get_username(generator.randint(1, employee_count))
+
+    def next_delete_ids(count):
+        return [next(delete_ids, 0) for _ in range(count)]  # 0 never exists once the ids run out
+
+    def next_own_update_id():
+        if not hasattr(client_state, "update_ids"):
+            slice_size = max(update_id_range[1] // clients, 1)
+            first_id = next(client_numbers) * slice_size + 1
+            client_state.update_ids = itertools.cycle(range(first_id, first_id + slice_size))
+        return next(client_state.update_ids)
+
+    return {
+        "add_user": lambda generator: (
+            "POST",
+            "/add_user",
+            {
+                "user-name": f"benchmark{next(new_users)}",
+                "first-name": "first",
+                "last-name": "last",
+                "team": generator.choice(TEAMS),
+                "admin": False,
+                "password": "password",
+            },
+        ),
+        "get_user_password": lambda generator: (
+            "POST", "/get_user_password", {"user-name": random_user(generator)}
+        ),
+        "get_user_access_level": lambda generator: (
+            "POST", "/get_user_access_level", {"user-name": random_user(generator)}
+        ),
+        "get_users": lambda generator: ("GET", "/get_users", None),
+        "get_annotations": lambda generator: ("GET", "/get_annotations", None),
+        "get_annotations_page": lambda generator: (
+            "GET", "/get_annotations?page-size=100", None
+        ),
+        "get_annotations_filtered": lambda generator: (
+            "GET",
+            f"/get_annotations?page-size=100&user-name={random_user(generator)}",
+            None,
+        ),
+        "get_annotations_projected": lambda generator: (
+            "GET", "/get_annotations?page-size=100&fields=username,annotationstatus,tags", None
+        ),
+        "get_annotation": lambda generator: (
+            "GET", f"/get_annotation?annotation-id={generator.randint(*update_id_range)}", None
+        ),
+        "get_annotation_stats": lambda generator: ("GET", "/get_annotation_stats", None),
+        "search_annotations": lambda generator: (
+            "GET", f"/search_annotations?q={generator.choice(TAGS)[:3]}*&page-size=20", None
+        ),
+        "export_annotations": lambda generator: (
+            "GET", f"/export_annotations?user-name={random_user(generator)}", None
+        ),
+        "add_annotation": lambda generator: (
+            "POST", "/add_annotation", create_annotation(generator, employee_count)
+        ),
+        "add_annotations": lambda generator: (
+            "POST",
+            "/add_annotations",
+            [create_annotation(generator, employee_count) for _ in range(100)],
+        ),
+        "update_annotation": lambda generator: (
+            "POST",
+            "/update_annotation",
+            dict(
+                create_annotation(generator, employee_count),
+                **{"annotation-id": generator.randint(*update_id_range)},
+            ),
+        ),
+        "update_annotations": lambda generator: (
+            "POST",
+            "/update_annotations",
+            {
+                "annotation-ids": [generator.randint(*update_id_range) for _ in range(10)],
+                "changes": {"annotation-status": generator.choice(["in review", "done"])},
+            },
+        ),
+        # single row writes where no two clients touch the same annotation, so clients only wait for each
+        # other on rows shared by every write. Compare requests-per-second of runs with --clients 1 and with
+        # many clients to find where writes stop scaling
+        "concurrent_status_updates": lambda generator: (
+            "POST",
+            "/update_annotations",
+            {
+                "annotation-ids": [next_own_update_id()],
+                "changes": {"annotation-status": generator.choice(["in review", "done"])},
+            },
+        ),
+        "patch_annotation": lambda generator: (
+            "POST",
+            "/patch_annotation",
+            {
+                "annotation-id": next(patch_ids, 0),  # 0 never exists once the ids run out
+                "version": 1,
+                "patch": [{"op": "replace", "path": "/annotation-status", "value": "in review"}],
+            },
+        ),
+        "sync_annotations": lambda generator: ("GET", "/sync_annotations?page-size=500", None),
+        # long poll of a client that is up to date, answered straight away
+        "annotation_changes": lambda generator: ("GET", "/annotation_changes?wait=0", None),
+        "upload_content": lambda generator: (
+            "POST", "/upload_content", generator.randbytes(generator.randint(1024, 512 * 1024))
+        ),
+        "get_content": lambda generator: (
+            "GET", f"/get_content?content-id={generator.randint(1, CONTENT_COUNT)}", None
+        ),
+        "claim_annotations": lambda generator: (
+            "POST", "/claim_annotations", {"user-name": random_user(generator), "count": 5}
+        ),
+        "delete_annotation": lambda generator: (
+            "POST", "/delete_annotation", {"annotation-id": next_delete_ids(1)[0]}
+        ),
+        "delete_annotations": lambda generator: (
+            "POST", "/delete_annotations", {"annotation-ids": next_delete_ids(10)}
+        ),
+    }
+
+
+# Sends one request and returns whether it succeeded. Handlers answer errors with HTTP 200 and the
+# status in the body, so JSON bodies are checked as well
+def send_request(port, method, path, body):
+    connection = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+    try:
+        if isinstance(body, bytes):  # sent as is, e.g. uploaded content
+            headers = {"Content-Type": "application/octet-stream"}
+        elif body is not None:
+            headers = {"Content-Type": "application/json"}
+            body = json.dumps(body)
+        else:
+            headers = {}
+        connection.request(method, path, body, headers)
+        response = connection.getresponse()
+        data = response.read()
+        if response.status != 200:
+            return False
+        if response.getheader("Content-Type", "").startswith("application/json"):
+            return json.loads(data)["statusCode"] == 200
+        return True
+    except (OSError, http.client.HTTPException, ValueError):
+        return False
+    finally:
+        connection.close()
+
+
+def get_percentile(sorted_values, percentile):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, int(len(sorted_values) * percentile / 100))
+    return sorted_values[index]
+
+
+# Runs scenario from clients threads for duration seconds while sampling the database connections
+def run_scenario(port, scenario, clients, duration, seed, connection_details):
+    latencies = []
+    errors = []
+    deadline = time.monotonic() + duration
+
+    def client(client_number):
+        generator = random.Random(seed * 1000 + client_number)
+        client_latencies = []
+        client_errors = 0
+        while time.monotonic() < deadline:
+            method, path, body = scenario(generator)
+            start = time.perf_counter()
+            succeeded = send_request(port, method, path, body)
+            client_latencies.append(time.perf_counter() - start)
+            client_errors += not succeeded
+        latencies.extend(client_latencies)
+        errors.append(client_errors)
+
+    threads = [threading.Thread(target=client, args=[number]) for number in range(clients)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+
+    max_connections = 0
+    monitor_connection = connect(connection_details)
+    monitor_connection.autocommit = True
+    try:
+        while any(thread.is_alive() for thread in threads):
+            max_connections = max(max_connections, count_connections(monitor_connection))
+            time.sleep(0.1)
+    finally:
+        monitor_connection.close()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": sum(errors),
+        "requests-per-second": round(len(latencies) / elapsed, 1),
+        "p50-ms": round(get_percentile(latencies, 50) * 1000, 2) if latencies else None,
+        "p95-ms": round(get_percentile(latencies, 95) * 1000, 2) if latencies else None,
+        "p99-ms": round(get_percentile(latencies, 99) * 1000, 2) if latencies else None,
+        "max-db-connections": max_connections,
+    }
+
+
+@contextmanager
+def app_server(connection_details, port, workers):
+    environment = dict(
+        os.environ,
+        DB_HOST=connection_details["host"],
+        DB_USER=connection_details["user"],
+        DB_PASSWORD=connection_details["password"],
+    )
+    server = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-w", str(workers), "-b", f"127.0.0.1:{port}", "src.app:app"],
+        cwd=REPO_DIR,
+        env=environment,
+    )
+    try:
+        deadline = time.monotonic() + 30
+        while not send_request(port, "GET", "/metrics", None):
+            if server.poll() is not None or time.monotonic() > deadline:
+                raise RuntimeError("The app server didn't start")
+            time.sleep(0.2)
+        yield
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def print_results(results, baseline=None):
+    columns = ["requests", "errors", "requests-per-second", "p50-ms", "p95-ms", "p99-ms", "max-db-connections"]
+    print(f"{'route':<26}" + "".join(f"{column:>22}" for column in columns))
+    for route, route_results in results["routes"].items():
+        row = f"{route:<26}"
+        for column in columns:
+            value = route_results[column]
+            cell = "-" if value is None else str(value)
+            baseline_value = (baseline or {}).get("routes", {}).get(route, {}).get(column)
+            if value is not None and baseline_value:
+                cell += f" ({(value - baseline_value) / baseline_value:+.0%})"
+            row += f"{cell:>22}"
+        print(row)
+
+
+# Routes that got slower or handle fewer requests than the baseline by more than threshold percent
+def find_regressions(results, baseline, threshold):
+    regressions = []
+    for route, route_results in results["routes"].items():
+        baseline_results = baseline["routes"].get(route)
+        if not baseline_results:
+            continue
+        for column in ["p50-ms", "p95-ms", "p99-ms"]:
+            if route_results[column] and baseline_results[column]:
+                if route_results[column] > baseline_results[column] * (1 + threshold / 100):
+                    regressions.append(f"{route} {column}: {baseline_results[column]} -> {route_results[column]}")
+        if route_results["requests-per-second"] < baseline_results["requests-per-second"] * (1 - threshold / 100):
+            regressions.append(
+                f"{route} requests-per-second: {baseline_results['requests-per-second']} -> {route_results['requests-per-second']}"
+            )
+    return regressions
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="Load test the API routes against a local Postgres")
+    parser.add_argument("--initdb", action="store_true", help="run against a disposable cluster created with initdb instead of BENCHMARK_DB_HOST")
+    parser.add_argument("--employees", type=int, default=100)
+    parser.add_argument("--annotations", type=int, default=10_000)
+    parser.add_argument("--clients", type=int, default=8, help="concurrent clients per route")
+    parser.add_argument("--duration", type=float, default=10, help="seconds each route is driven for")
+    parser.add_argument("--workers", type=int, default=4, help="gunicorn workers")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--routes", nargs="+", help="only run these scenarios")
+    parser.add_argument("--save-baseline", metavar="NAME")
+    parser.add_argument("--compare", metavar="NAME", help="compare with a saved baseline and fail on regressions")
+    parser.add_argument("--threshold", type=float, default=10, help="percent change counted as a regression")
+    return parser.parse_args()
+
+
+def run_benchmark(arguments, connection_details):
+    create_schema(connection_details)
+    route_names = arguments.routes or list(get_scenarios(arguments.employees, arguments.annotations))
+
+    results = {
+        "settings": {
+            key: getattr(arguments, key)
+            for key in ["employees", "annotations", "clients", "duration", "workers", "seed"]
+        },
+        "routes": {},
+    }
+    for route_name in route_names:
+        # every route starts from the same data
+        seed_database(connection_details, arguments.employees, arguments.annotations, arguments.seed)
+        scenarios = get_scenarios(arguments.employees, arguments.annotations, arguments.clients)
+        with app_server(connection_details, arguments.port, arguments.workers):
+            results["routes"][route_name] = run_scenario(
+                arguments.port,
+                scenarios[route_name],
+                arguments.clients,
+                arguments.duration,
+                arguments.seed,
+                connection_details,
+            )
+        print(f"{route_name}: {results['routes'][route_name]}", file=sys.stderr)
+    return results
+
+
+def main():
+    arguments = parse_arguments()
+    if arguments.initdb:
+        with disposable_cluster() as connection_details:
+            results = run_benchmark(arguments, connection_details)
+    else:
+        results = run_benchmark(arguments, get_existing_database())
+
+    baseline = None
+    if arguments.compare:
+        baseline = json.loads((BASELINES_DIR / f"{arguments.compare}.json").read_text())
+        if baseline["settings"] != results["settings"]:
+            print(f"Warning: baseline was run with {baseline['settings']}", file=sys.stderr)
+    print_results(results, baseline)
+
+    if arguments.save_baseline:
+        BASELINES_DIR.mkdir(exist_ok=True)
+        baseline_file = BASELINES_DIR / f"{arguments.save_baseline}.json"
+        baseline_file.write_text(json.dumps(results, indent=2) + "\n")
+        print(f"Saved baseline to {baseline_file}")
+
+    if baseline is not None:
+        regressions = find_regressions(results, baseline, arguments.threshold)
+        for regression in regressions:
+            print(f"Regression: {regression}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,18 @@
+-- Tables used by the app, for benchmark databases. The migrations in migrations/ are applied after this.
+CREATE TABLE IF NOT EXISTS employee (
+    username text PRIMARY KEY,
+    firstname text NOT NULL,
+    lastname text NOT NULL,
+    team text NOT NULL,
+    admin boolean NOT NULL DEFAULT false,
+    password text NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS annotation (
+    annotationid serial PRIMARY KEY,
+    username text NOT NULL REFERENCES employee (username),
+    annotationstatus text NOT NULL,
+    originaldata text NOT NULL,
+    annotateddata text,
+    tags text
+);
@@ -0,0 +1,206 @@
+import os
+import random
+
+import pytest
+from werkzeug.datastructures import MultiDict
+
+# Micro-benchmarks of the data layer, run with pytest-benchmark:
+#   pip install pytest-benchmark
+#   BENCHMARK_INITDB=true python -m pytest benchmarks --benchmark-only
+# Tests that need a database use a disposable initdb cluster when BENCHMARK_INITDB is true, or the server
+# given by BENCHMARK_DB_HOST/USER/PASSWORD, and are skipped otherwise. The serialization ones always run
+pytest.importorskip("pytest_benchmark")
+
+from benchmarks.database import (
+    create_schema,
+    disposable_cluster,
+    get_existing_database,
+    seed_database,
+    ANNOTATION_STATUSES,
+    TAGS,
+    TEAMS,
+)
+from src.app import app
+from src.modules import database_transactions
+from src.modules.api_response import response_format
+from src.modules.annotation_table import (
+    ANNOTATION_LISTING_FIELDS,
+    ANNOTATION_EMPLOYEE_JOIN,
+    get_annotation_filters,
+)
+from src.modules.database_transactions import (
+    add_to_table,
+    add_many_to_table,
+    close_connection_pool,
+    create_database_connection,
+    delete_record,
+    get_connection_pool,
+    get_record_field_from_table,
+    update_field,
+)
+
+EMPLOYEE_COUNT = 100
+ANNOTATION_COUNT = int(os.environ.get("BENCHMARK_ANNOTATIONS", "10000"))
+
+ANNOTATION_ATTRIBUTES = ["username", "annotationstatus", "originaldata", "annotateddata", "tags"]
+
+
+@pytest.fixture(scope="session")
+def database():
+    if os.environ.get("BENCHMARK_INITDB", "false").lower() == "true":
+        with disposable_cluster() as connection_details:
+            create_schema(connection_details)
+            seed_database(connection_details, EMPLOYEE_COUNT, ANNOTATION_COUNT)
+            yield connection_details
+    elif "BENCHMARK_DB_HOST" in os.environ:
+        connection_details = get_existing_database()
+        create_schema(connection_details)
+        seed_database(connection_details, EMPLOYEE_COUNT, ANNOTATION_COUNT)
+        yield connection_details
+    else:
+        pytest.skip("Set BENCHMARK_INITDB=true or BENCHMARK_DB_HOST to benchmark against a database")
+
+
+# Points the data layer at the benchmark database with a fresh pool
+@pytest.fixture
+def data_layer(database, monkeypatch):
+    monkeypatch.setattr(database_transactions, "DB_HOST", database["host"])
+    monkeypatch.setattr(database_transactions, "DB_USER", database["user"])
+    monkeypatch.setattr(database_transactions, "DB_PASSWORD", database["password"])
+    close_connection_pool()
+    yield
+    close_connection_pool()
+
+
+# Records shaped like the /get_annotations listing: dicts keyed by column name, annotation fields then
+# employee details
+def create_listing_rows(count):
+    generator = random.Random(0)
+    return [
+        {
+            "annotationid": number,
+            "version": 1,
+            "username": f"user{generator.randint(1, EMPLOYEE_COUNT)}",
+            "annotationstatus": generator.choice(ANNOTATION_STATUSES),
+            "originaldata": f"original data {number} " + "x" * generator.randint(20, 200),
+            "annotateddata": f"annotated data {number}",
+            "tags": ",".join(generator.sample(TAGS, 2)),
+            "firstname": "first",
+            "lastname": "last",
+            "team": generator.choice(TEAMS),
+        }
+        for number in range(1, count + 1)
+    ]
+
+
+@pytest.mark.benchmark(group="connection")
+def test_connection_setup(benchmark, data_layer):
+    def connect_and_close():
+        create_database_connection().close()
+
+    benchmark(connect_and_close)
+
+
+@pytest.mark.benchmark(group="connection")
+def test_pool_checkout(benchmark, data_layer):
+    pool = get_connection_pool()
+
+    def checkout_and_return():
+        pool.put_connection(pool.get_connection())
+
+    benchmark(checkout_and_return)
+
+
+@pytest.mark.benchmark(group="read")
+def test_get_record_field_single_row(benchmark, data_layer):
+    response = benchmark(
+        get_record_field_from_table, "employee", "admin, team", "WHERE username = %s", ["user1"]
+    )
+    assert response["statusCode"] == 200
+
+
+@pytest.mark.benchmark(group="read")
+def test_get_record_field_all_annotations(benchmark, data_layer):
+    response = benchmark(
+        get_record_field_from_table,
+        "annotation",
+        ANNOTATION_LISTING_FIELDS,
+        f"{ANNOTATION_EMPLOYEE_JOIN};",
+        [],
+        keyed=True,
+    )
+    assert len(response["body"]) == ANNOTATION_COUNT
+
+
+@pytest.mark.benchmark(group="write")
+def test_add_to_table(benchmark, data_layer):
+    response = benchmark(
+        add_to_table,
+        "annotation",
+        ANNOTATION_ATTRIBUTES,
+        ["user1", "to do", "benchmark data", "", "cat"],
+    )
+    assert response["statusCode"] == 200
+
+
+@pytest.mark.benchmark(group="write")
+def test_update_field(benchmark, data_layer):
+    response = benchmark(
+        update_field, "annotation", "annotationstatus", "done", "WHERE annotationid = 1"
+    )
+    assert response["statusCode"] == 200
+
+
+@pytest.mark.benchmark(group="write")
+def test_delete_record(benchmark, data_layer):
+    # every round deletes an annotation added by its setup so the dataset keeps its size
+    def add_annotation():
+        response = add_many_to_table(
+            "annotation",
+            ANNOTATION_ATTRIBUTES,
+            [["user1", "to do", "benchmark data", "", "cat"]],
+            "annotationid",
+            1,
+        )
+        return ("annotation", "WHERE annotationid = %s", [response["body"][0][0]]), {}
+
+    response = benchmark.pedantic(delete_record, setup=add_annotation, rounds=200)
+    assert response["statusCode"] == 200
+
+
+# Not a benchmark, checks the tag filter against PostgreSQL: a tag that is a prefix or suffix of
+# another one only matches annotations having that exact tag
+def test_tag_filter_matches_whole_tags(data_layer):
+    tags = ["bobcat", "category", "Cat,dog", "dog, cat", "cats"]
+    response = add_many_to_table(
+        "annotation",
+        ANNOTATION_ATTRIBUTES,
+        [["user1", "tag test", "benchmark data", "", tag] for tag in tags],
+        "annotationid",
+        len(tags),
+    )
+    annotation_ids = [row[0] for row in response["body"]]
+    try:
+        conditions, values = get_annotation_filters(
+            MultiDict([("annotation-status", "tag test"), ("tags", "cat")])
+        )
+        response = get_record_field_from_table(
+            "annotation", "tags", f"WHERE {' AND '.join(conditions)} ORDER BY annotationid", values
+        )
+        assert [row[0] for row in response["body"]] == ["Cat,dog", "dog, cat"]
+    finally:
+        delete_record("annotation", "WHERE annotationid = ANY(%s)", [annotation_ids])
+
+
+@pytest.mark.benchmark(group="serialization")
+def test_response_format(benchmark):
+    rows = create_listing_rows(ANNOTATION_COUNT)
+    benchmark(response_format, 200, rows)
+
+
+@pytest.mark.benchmark(group="serialization")
+def test_encode_annotation_listing(benchmark):
+    response = response_format(200, create_listing_rows(ANNOTATION_COUNT))
+    with app.app_context():
+        body = benchmark(app.json.dumps, response)
+    assert body.startswith("{")
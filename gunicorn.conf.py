@@ -0,0 +1,14 @@
+import os
+
+from prometheus_client import multiprocess
+
+# Threaded workers, so open change feed streams and long polls (see src/modules/change_feed.py) each take up
+# a thread rather than a whole worker
+worker_class = "gthread"
+threads = int(os.environ.get("GUNICORN_THREADS", "32"))
+
+
+# Drops the metrics of workers that have exited when running with PROMETHEUS_MULTIPROC_DIR set
+def child_exit(server, worker):
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,18 @@
+-- Indexes supporting the filters on /get_annotations.
+-- CREATE INDEX CONCURRENTLY can't run inside a transaction so run this file with psql's default autocommit.
+
+-- Equality filters combined with the keyset ordering on annotationid
+CREATE INDEX CONCURRENTLY IF NOT EXISTS annotation_username_annotationid_idx
+    ON annotation (username, annotationid);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS annotation_annotationstatus_annotationid_idx
+    ON annotation (annotationstatus, annotationid);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS employee_team_idx
+    ON employee (team);
+
+-- Tag filters match with ILIKE '%tag%', which a trigram GIN index can serve
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS annotation_tags_trgm_idx
+    ON annotation USING GIN (tags gin_trgm_ops);
@@ -0,0 +1,37 @@
+-- Version counter per table, bumped by every statement that writes to the table.
+-- Used to tell if cached /get_users and /get_annotations responses are still current.
+-- Each table has 16 counter rows and a write bumps the row picked by its backend, so concurrent writes on
+-- different connections rarely wait for the same row lock. The version of a table is the sum of its rows.
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS table_version (
+    tablename text NOT NULL,
+    shard smallint NOT NULL,
+    version bigint NOT NULL DEFAULT 0,
+    PRIMARY KEY (tablename, shard)
+);
+
+INSERT INTO table_version (tablename, shard)
+SELECT tablename, shard
+FROM unnest(ARRAY['annotation', 'employee']) AS tablename, generate_series(0, 15) AS shard
+ON CONFLICT (tablename, shard) DO NOTHING;
+
+CREATE OR REPLACE FUNCTION bump_table_version() RETURNS trigger AS $$
+BEGIN
+    UPDATE table_version SET version = version + 1
+    WHERE tablename = TG_TABLE_NAME AND shard = pg_backend_pid() % 16;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS annotation_bump_table_version ON annotation;
+CREATE TRIGGER annotation_bump_table_version
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON annotation
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_table_version();
+
+DROP TRIGGER IF EXISTS employee_bump_table_version ON employee;
+CREATE TRIGGER employee_bump_table_version
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON employee
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_table_version();
+
+COMMIT;
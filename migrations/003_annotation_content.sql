@@ -0,0 +1,26 @@
+-- Storage for large annotation data uploaded through /upload_content.
+-- Content is deduplicated by its SHA-256 hash and stored in fixed size chunks so ranges can be read on their own.
+-- Annotations reference it through originaldataid/annotateddataid instead of the inline columns.
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS content (
+    contentid bigserial PRIMARY KEY,
+    hash text UNIQUE, -- set once every chunk has been stored
+    size bigint NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS content_chunk (
+    contentid bigint NOT NULL REFERENCES content (contentid) ON DELETE CASCADE,
+    chunkindex integer NOT NULL,
+    data bytea NOT NULL,
+    PRIMARY KEY (contentid, chunkindex)
+);
+
+ALTER TABLE annotation ADD COLUMN IF NOT EXISTS originaldataid bigint REFERENCES content (contentid);
+ALTER TABLE annotation ADD COLUMN IF NOT EXISTS annotateddataid bigint REFERENCES content (contentid);
+
+-- the inline data is left empty when the annotation references uploaded content
+ALTER TABLE annotation ALTER COLUMN originaldata DROP NOT NULL;
+ALTER TABLE annotation ALTER COLUMN annotateddata DROP NOT NULL;
+
+COMMIT;
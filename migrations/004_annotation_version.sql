@@ -0,0 +1,19 @@
+-- Version of each annotation, starting at 1 and bumped by every update of the row.
+-- /patch_annotation only writes an annotation when the version sent is still current.
+BEGIN;
+
+ALTER TABLE annotation ADD COLUMN IF NOT EXISTS version bigint NOT NULL DEFAULT 1;
+
+CREATE OR REPLACE FUNCTION bump_annotation_version() RETURNS trigger AS $$
+BEGIN
+    NEW.version := OLD.version + 1;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS annotation_bump_version ON annotation;
+CREATE TRIGGER annotation_bump_version
+    BEFORE UPDATE ON annotation
+    FOR EACH ROW EXECUTE FUNCTION bump_annotation_version();
+
+COMMIT;
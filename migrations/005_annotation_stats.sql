@@ -0,0 +1,77 @@
+-- Number of annotations per user and status, read by /get_annotation_stats instead of counting the
+-- annotation table. Kept current by statement level triggers, so a bulk write updates each counter once.
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS annotation_stats (
+    username text NOT NULL,
+    annotationstatus text NOT NULL,
+    annotationcount bigint NOT NULL DEFAULT 0,
+    PRIMARY KEY (username, annotationstatus)
+);
+
+-- Adds the changes to the counters. Counters are upserted in key order so concurrent writes lock them
+-- in the same order and can't deadlock
+CREATE OR REPLACE FUNCTION update_annotation_stats() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO annotation_stats AS stats (username, annotationstatus, annotationcount)
+        SELECT username, annotationstatus, count(*) FROM new_rows
+        GROUP BY username, annotationstatus ORDER BY username, annotationstatus
+        ON CONFLICT (username, annotationstatus)
+        DO UPDATE SET annotationcount = stats.annotationcount + EXCLUDED.annotationcount;
+    ELSIF TG_OP = 'DELETE' THEN
+        INSERT INTO annotation_stats AS stats (username, annotationstatus, annotationcount)
+        SELECT username, annotationstatus, -count(*) FROM old_rows
+        GROUP BY username, annotationstatus ORDER BY username, annotationstatus
+        ON CONFLICT (username, annotationstatus)
+        DO UPDATE SET annotationcount = stats.annotationcount + EXCLUDED.annotationcount;
+    ELSIF TG_OP = 'UPDATE' THEN
+        -- only rows whose user or status changed move between counters
+        INSERT INTO annotation_stats AS stats (username, annotationstatus, annotationcount)
+        SELECT username, annotationstatus, sum(change) FROM (
+            SELECT old_rows.username, old_rows.annotationstatus, -1 AS change
+            FROM old_rows INNER JOIN new_rows ON old_rows.annotationid = new_rows.annotationid
+            WHERE (old_rows.username, old_rows.annotationstatus) <> (new_rows.username, new_rows.annotationstatus)
+            UNION ALL
+            SELECT new_rows.username, new_rows.annotationstatus, 1 AS change
+            FROM old_rows INNER JOIN new_rows ON old_rows.annotationid = new_rows.annotationid
+            WHERE (old_rows.username, old_rows.annotationstatus) <> (new_rows.username, new_rows.annotationstatus)
+        ) AS changes
+        GROUP BY username, annotationstatus HAVING sum(change) <> 0 ORDER BY username, annotationstatus
+        ON CONFLICT (username, annotationstatus)
+        DO UPDATE SET annotationcount = stats.annotationcount + EXCLUDED.annotationcount;
+    ELSIF TG_OP = 'TRUNCATE' THEN
+        DELETE FROM annotation_stats;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- no annotation can be written between counting the existing ones and creating the triggers
+LOCK TABLE annotation IN SHARE ROW EXCLUSIVE MODE;
+
+DROP TRIGGER IF EXISTS annotation_stats_insert ON annotation;
+CREATE TRIGGER annotation_stats_insert
+    AFTER INSERT ON annotation REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION update_annotation_stats();
+
+DROP TRIGGER IF EXISTS annotation_stats_update ON annotation;
+CREATE TRIGGER annotation_stats_update
+    AFTER UPDATE ON annotation REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION update_annotation_stats();
+
+DROP TRIGGER IF EXISTS annotation_stats_delete ON annotation;
+CREATE TRIGGER annotation_stats_delete
+    AFTER DELETE ON annotation REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION update_annotation_stats();
+
+DROP TRIGGER IF EXISTS annotation_stats_truncate ON annotation;
+CREATE TRIGGER annotation_stats_truncate
+    AFTER TRUNCATE ON annotation
+    FOR EACH STATEMENT EXECUTE FUNCTION update_annotation_stats();
+
+DELETE FROM annotation_stats;
+INSERT INTO annotation_stats (username, annotationstatus, annotationcount)
+SELECT username, annotationstatus, count(*) FROM annotation GROUP BY username, annotationstatus;
+
+COMMIT;
@@ -0,0 +1,50 @@
+-- Log of annotation inserts, updates and deletes, read by the /annotation_changes feed.
+-- Every statement that writes annotations logs the ids it changed and wakes up the feed with
+-- NOTIFY annotation_changes. Changes are ordered by the writing transaction and then changeid. A change
+-- is only read once its transaction id is below the xmin of the reader's snapshot. Every transaction
+-- that could still log a change before it then has ended, so a reader never skips a change committed late.
+-- Needs PostgreSQL 13 or later for pg_current_xact_id. Old changes can be removed at any time, e.g.
+--   DELETE FROM annotation_change WHERE changedat < now() - interval '7 days';
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS annotation_change (
+    changeid bigserial PRIMARY KEY,
+    transactionid bigint NOT NULL DEFAULT pg_current_xact_id()::text::bigint,
+    annotationid integer NOT NULL,
+    operation text NOT NULL,
+    changedat timestamptz NOT NULL DEFAULT now()
+);
+
+CREATE INDEX IF NOT EXISTS annotation_change_position_idx ON annotation_change (transactionid, changeid);
+
+CREATE OR REPLACE FUNCTION log_annotation_changes() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        INSERT INTO annotation_change (annotationid, operation)
+        SELECT annotationid, 'delete' FROM old_rows ORDER BY annotationid;
+    ELSE
+        INSERT INTO annotation_change (annotationid, operation)
+        SELECT annotationid, lower(TG_OP) FROM new_rows ORDER BY annotationid;
+    END IF;
+    -- delivered on commit, repeated notifications in a transaction are sent once
+    PERFORM pg_notify('annotation_changes', '');
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS annotation_log_insert ON annotation;
+CREATE TRIGGER annotation_log_insert
+    AFTER INSERT ON annotation REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION log_annotation_changes();
+
+DROP TRIGGER IF EXISTS annotation_log_update ON annotation;
+CREATE TRIGGER annotation_log_update
+    AFTER UPDATE ON annotation REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION log_annotation_changes();
+
+DROP TRIGGER IF EXISTS annotation_log_delete ON annotation;
+CREATE TRIGGER annotation_log_delete
+    AFTER DELETE ON annotation REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION log_annotation_changes();
+
+COMMIT;
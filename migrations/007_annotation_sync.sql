@@ -0,0 +1,55 @@
+-- Lets /sync_annotations return only the annotations changed since a client's watermark.
+-- changetransaction is the id of the transaction that last wrote the annotation, and deleted annotations
+-- leave a tombstone with the id of the deleting transaction. Both are only read once that transaction is
+-- below the xmin of the reader's snapshot, so a change committed late is never skipped.
+-- Needs PostgreSQL 13 or later. Existing annotations start at 0 so the first sync returns all of them.
+-- The index is created concurrently after the transaction, so run this file with psql's default autocommit.
+BEGIN;
+
+ALTER TABLE annotation ADD COLUMN IF NOT EXISTS changetransaction bigint NOT NULL DEFAULT 0;
+ALTER TABLE annotation ALTER COLUMN changetransaction SET DEFAULT pg_current_xact_id()::text::bigint;
+ALTER TABLE annotation ADD COLUMN IF NOT EXISTS updatedat timestamptz;
+ALTER TABLE annotation ALTER COLUMN updatedat SET DEFAULT now();
+
+CREATE OR REPLACE FUNCTION mark_annotation_changed() RETURNS trigger AS $$
+BEGIN
+    NEW.changetransaction := pg_current_xact_id()::text::bigint;
+    NEW.updatedat := now();
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS annotation_mark_changed ON annotation;
+CREATE TRIGGER annotation_mark_changed
+    BEFORE UPDATE ON annotation
+    FOR EACH ROW EXECUTE FUNCTION mark_annotation_changed();
+
+CREATE TABLE IF NOT EXISTS annotation_tombstone (
+    annotationid integer PRIMARY KEY,
+    changetransaction bigint NOT NULL DEFAULT pg_current_xact_id()::text::bigint,
+    deletedat timestamptz NOT NULL DEFAULT now()
+);
+
+CREATE INDEX IF NOT EXISTS annotation_tombstone_changetransaction_idx
+    ON annotation_tombstone (changetransaction, annotationid);
+
+CREATE OR REPLACE FUNCTION add_annotation_tombstones() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO annotation_tombstone (annotationid)
+    SELECT annotationid FROM old_rows ORDER BY annotationid
+    ON CONFLICT (annotationid) DO UPDATE
+    SET changetransaction = EXCLUDED.changetransaction, deletedat = EXCLUDED.deletedat;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS annotation_add_tombstones ON annotation;
+CREATE TRIGGER annotation_add_tombstones
+    AFTER DELETE ON annotation REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION add_annotation_tombstones();
+
+COMMIT;
+
+-- Keyset reads of the changes since a watermark
+CREATE INDEX CONCURRENTLY IF NOT EXISTS annotation_changetransaction_idx
+    ON annotation (changetransaction, annotationid);
@@ -0,0 +1,17 @@
+-- Full text search for /search_annotations. The search vector is generated from the tags, annotated data
+-- and original data, weighted in that order, so matches in the tags rank first. Only the first 100000
+-- characters of the data are indexed, a tsvector is limited to 1MB.
+-- Adding the stored column rewrites the annotation table, which is locked until this commits.
+BEGIN;
+
+ALTER TABLE annotation ADD COLUMN IF NOT EXISTS searchvector tsvector GENERATED ALWAYS AS (
+    setweight(to_tsvector('english', coalesce(tags, '')), 'A')
+    || setweight(to_tsvector('english', left(coalesce(annotateddata, ''), 100000)), 'B')
+    || setweight(to_tsvector('english', left(coalesce(originaldata, ''), 100000)), 'C')
+) STORED;
+
+COMMIT;
+
+-- Matches are found through the index, without reading the annotations
+CREATE INDEX CONCURRENTLY IF NOT EXISTS annotation_searchvector_idx
+    ON annotation USING GIN (searchvector);
@@ -0,0 +1,10 @@
+-- Tag filters match whole tags: the comma separated tags are split into a lowercase array and every tag
+-- filtered on has to be in it. The index expression has to stay the same as ANNOTATION_TAG_ARRAY in
+-- src/modules/annotation_table.py for the filters to use it.
+-- CREATE INDEX CONCURRENTLY can't run inside a transaction so run this file with psql's default autocommit.
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS annotation_tags_array_idx
+    ON annotation USING GIN (regexp_split_to_array(lower(tags), '\s*,\s*'));
+
+-- the trigram index served the substring matches filters used before
+DROP INDEX CONCURRENTLY IF EXISTS annotation_tags_trgm_idx;
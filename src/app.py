@@ -7,13 +7,31 @@ from .modules.user_table import (
 )
 from .modules.annotation_table import (
     get_all_annotations,
+    get_annotation,
+    export_annotations,
     add_annotation_task,
+    add_annotation_tasks,
     update_annotation_record,
+    update_annotation_records,
+    patch_annotation_record,
+    claim_annotation_tasks,
     delete_annotation_record,
+    delete_annotation_records,
 )
+from .modules.annotation_search import search_annotations
+from .modules.annotation_stats import get_annotation_stats
+from .modules.annotation_sync import sync_annotations
+from .modules.change_feed import get_annotation_changes
+from .modules.content_storage import upload_content, download_content
+from .modules.response_cache import get_cached_response
+from .modules.metrics import init_metrics
+from .modules.query_profiler import init_query_profiler
+from .modules.json_provider import FastJSONProvider
+from .config import ANNOTATION_TABLE_NAME, EMPLOYEE_TABLE_NAME
 from flask_cors import CORS
 
 app = Flask(__name__)
+app.json = FastJSONProvider(app)
 CORS(app)
 
 
@@ -34,12 +52,48 @@ def get_user_access_route():
 
 @app.route("/get_users", methods=["GET"])
 def get_users_route():
-    return get_users()
+    return get_cached_response([EMPLOYEE_TABLE_NAME], get_users)
 
 
 @app.route("/get_annotations", methods=["GET"])
 def get_annotations_route():
-    return get_all_annotations()
+    return get_cached_response(
+        [ANNOTATION_TABLE_NAME, EMPLOYEE_TABLE_NAME], get_all_annotations
+    )
+
+
+@app.route("/get_annotation", methods=["GET"])
+def get_annotation_route():
+    return get_cached_response(
+        [ANNOTATION_TABLE_NAME, EMPLOYEE_TABLE_NAME], get_annotation
+    )
+
+
+@app.route("/get_annotation_stats", methods=["GET"])
+def get_annotation_stats_route():
+    return get_cached_response(
+        [ANNOTATION_TABLE_NAME, EMPLOYEE_TABLE_NAME], get_annotation_stats
+    )
+
+
+@app.route("/search_annotations", methods=["GET"])
+def search_annotations_route():
+    return search_annotations()
+
+
+@app.route("/sync_annotations", methods=["GET"])
+def sync_annotations_route():
+    return sync_annotations()
+
+
+@app.route("/annotation_changes", methods=["GET"])
+def annotation_changes_route():
+    return get_annotation_changes()
+
+
+@app.route("/export_annotations", methods=["GET"])
+def export_annotations_route():
+    return export_annotations()
 
 
 @app.route("/add_annotation", methods=["POST"])
@@ -47,15 +101,55 @@ def add_annotation_route():
     return add_annotation_task()
 
 
+@app.route("/add_annotations", methods=["POST"])
+def add_annotations_route():
+    return add_annotation_tasks()
+
+
 @app.route("/update_annotation", methods=["POST"])
 def update_annotation_route():
     return update_annotation_record()
 
 
+@app.route("/update_annotations", methods=["POST"])
+def update_annotations_route():
+    return update_annotation_records()
+
+
+@app.route("/patch_annotation", methods=["POST"])
+def patch_annotation_route():
+    return patch_annotation_record()
+
+
+@app.route("/claim_annotations", methods=["POST"])
+def claim_annotations_route():
+    return claim_annotation_tasks()
+
+
+@app.route("/upload_content", methods=["POST"])
+def upload_content_route():
+    return upload_content()
+
+
+@app.route("/get_content", methods=["GET"])
+def get_content_route():
+    return download_content()
+
+
 @app.route("/delete_annotation", methods=["POST"])
 def delete_annotation_route():
     return delete_annotation_record()
 
 
+@app.route("/delete_annotations", methods=["POST"])
+def delete_annotations_route():
+    return delete_annotation_records()
+
+
+# registered after the routes so each one is timed
+init_metrics(app)
+init_query_profiler(app)
+
+
 if __name__ == "__main__":
     app.run()
@@ -0,0 +1,77 @@
+from quart import Quart
+from quart_cors import cors
+from .modules.async_database_transactions import (
+    open_async_connection_pool,
+    close_async_connection_pool,
+)
+from .modules.async_user_table import (
+    add_user,
+    get_user_password,
+    get_users,
+    get_user_access_level,
+)
+from .modules.async_annotation_table import (
+    get_all_annotations,
+    get_annotation,
+    add_annotation_task,
+    update_annotation_record,
+    delete_annotation_record,
+)
+
+# Async version of the app in src/app.py, run with an ASGI server e.g. `hypercorn src.asgi:app`
+app = cors(Quart(__name__))
+
+
+@app.before_serving
+async def open_connection_pool():
+    await open_async_connection_pool()
+
+
+@app.after_serving
+async def close_connection_pool():
+    await close_async_connection_pool()
+
+
+@app.route("/add_user", methods=["POST"])
+async def add_user_route():
+    return await add_user()
+
+
+@app.route("/get_user_password", methods=["POST"])
+async def get_user_password_route():
+    return await get_user_password()
+
+
+@app.route("/get_user_access_level", methods=["POST"])
+async def get_user_access_route():
+    return await get_user_access_level()
+
+
+@app.route("/get_users", methods=["GET"])
+async def get_users_route():
+    return await get_users()
+
+
+@app.route("/get_annotations", methods=["GET"])
+async def get_annotations_route():
+    return await get_all_annotations()
+
+
+@app.route("/get_annotation", methods=["GET"])
+async def get_annotation_route():
+    return await get_annotation()
+
+
+@app.route("/add_annotation", methods=["POST"])
+async def add_annotation_route():
+    return await add_annotation_task()
+
+
+@app.route("/update_annotation", methods=["POST"])
+async def update_annotation_route():
+    return await update_annotation_record()
+
+
+@app.route("/delete_annotation", methods=["POST"])
+async def delete_annotation_route():
+    return await delete_annotation_record()
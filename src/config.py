@@ -5,6 +5,25 @@ DB_USER = os.environ["DB_USER"]
 DB_PASSWORD = os.environ["DB_PASSWORD"]
 DB_NAME = "annotationtaskdb"
 
+# Connection pool settings, timeouts are in seconds
+DB_POOL_MIN_SIZE = int(os.environ.get("DB_POOL_MIN_SIZE", "1"))
+DB_POOL_MAX_SIZE = int(os.environ.get("DB_POOL_MAX_SIZE", "10"))
+DB_POOL_TIMEOUT = float(os.environ.get("DB_POOL_TIMEOUT", "30"))
+DB_POOL_HEALTH_CHECK_INTERVAL = float(
+    os.environ.get("DB_POOL_HEALTH_CHECK_INTERVAL", "30")
+)
+
+# Parameterised statements are prepared once per pooled connection. Turn this off when connecting
+# through a proxy that doesn't keep sessions, e.g. pgbouncer in transaction pooling mode
+DB_USE_PREPARED_STATEMENTS = os.environ.get("DB_USE_PREPARED_STATEMENTS", "true").lower() == "true"
+DB_MAX_PREPARED_STATEMENTS = int(os.environ.get("DB_MAX_PREPARED_STATEMENTS", "100"))
+
+# Statements slower than this (in seconds) are logged with their plan
+SLOW_QUERY_THRESHOLD = float(os.environ.get("SLOW_QUERY_THRESHOLD", "0.5"))
+# Profiled requests return every statement they ran in the X-Query-Trace header. "off", "header" (only
+# requests sending X-Query-Profile: true) or "all"
+QUERY_PROFILING = os.environ.get("QUERY_PROFILING", "off").lower()
+
 EMPLOYEE_TABLE_NAME = "employee"
 EMPLOYEE_TABLE_ATTRIBUTES = [
     "username",
@@ -15,6 +34,8 @@ EMPLOYEE_TABLE_ATTRIBUTES = [
     "password",
 ]
 
+TABLE_VERSION_TABLE_NAME = "table_version"
+
 ANNOTATION_TABLE_NAME = "annotation"
 ANNOTATION_TABLE_ATTRIBUTES = [
     "username",
@@ -23,3 +44,63 @@ ANNOTATION_TABLE_ATTRIBUTES = [
     "annotateddata",
     "tags",
 ]
+# Ids of uploaded content that can replace originaldata and annotateddata (see migrations/003_annotation_content.sql).
+# They are only read and written by requests that use them, so the other routes work without the migration
+ANNOTATION_CONTENT_ATTRIBUTES = ["originaldataid", "annotateddataid"]
+
+# Annotation counts per user and status, maintained by triggers on the annotation table
+ANNOTATION_STATS_TABLE_NAME = "annotation_stats"
+
+# Log of annotation inserts, updates and deletes read by the change feed, see migrations/006_annotation_changes.sql
+ANNOTATION_CHANGE_TABLE_NAME = "annotation_change"
+
+# Ids of deleted annotations, returned by /sync_annotations, see migrations/007_annotation_sync.sql
+ANNOTATION_TOMBSTONE_TABLE_NAME = "annotation_tombstone"
+
+# Large annotation data can be uploaded separately and is stored once per distinct content, split into
+# chunks of CONTENT_CHUNK_SIZE bytes so ranges can be read without loading the whole document
+CONTENT_TABLE_NAME = "content"
+CONTENT_CHUNK_TABLE_NAME = "content_chunk"
+CONTENT_CHUNK_SIZE = int(os.environ.get("CONTENT_CHUNK_SIZE", str(256 * 1024)))
+
+# Page sizes for paginated listings
+DEFAULT_PAGE_SIZE = int(os.environ.get("DEFAULT_PAGE_SIZE", "100"))
+MAX_PAGE_SIZE = int(os.environ.get("MAX_PAGE_SIZE", "1000"))
+
+# Annotations waiting in the task queue have the claimable status, claiming one assigns it to the
+# annotator and moves it to the claimed status. At most MAX_CLAIM_COUNT are claimed per request. Annotators
+# claim the tasks assigned to the ANNOTATION_POOL_USER if it is set, otherwise the tasks of their own team
+ANNOTATION_CLAIMABLE_STATUS = os.environ.get("ANNOTATION_CLAIMABLE_STATUS", "to do")
+ANNOTATION_CLAIMED_STATUS = os.environ.get("ANNOTATION_CLAIMED_STATUS", "in progress")
+MAX_CLAIM_COUNT = int(os.environ.get("MAX_CLAIM_COUNT", "100"))
+ANNOTATION_POOL_USER = os.environ.get("ANNOTATION_POOL_USER")
+
+# Change feed: the NOTIFY channel written to by the annotation triggers, changes read per query, seconds
+# between checks for changes (also the heartbeat interval), seconds a stream stays open before the client is
+# asked to reconnect and the longest wait of a long poll
+CHANGE_FEED_CHANNEL = "annotation_changes"
+CHANGE_FEED_BATCH_SIZE = int(os.environ.get("CHANGE_FEED_BATCH_SIZE", "500"))
+CHANGE_FEED_POLL_INTERVAL = float(os.environ.get("CHANGE_FEED_POLL_INTERVAL", "5"))
+CHANGE_FEED_STREAM_DURATION = float(os.environ.get("CHANGE_FEED_STREAM_DURATION", "300"))
+CHANGE_FEED_MAX_WAIT = float(os.environ.get("CHANGE_FEED_MAX_WAIT", "30"))
+
+# Full text search: the text search configuration and the characters of each data column that are
+# indexed, both have to match migrations/008_annotation_search.sql
+SEARCH_TEXT_CONFIG = "english"
+SEARCH_DOCUMENT_LENGTH = 100000
+
+# Number of records fetched per round trip when streaming exports
+EXPORT_BATCH_SIZE = int(os.environ.get("EXPORT_BATCH_SIZE", "2000"))
+
+# Number of records sent to the database per INSERT when adding records in bulk
+BULK_INSERT_CHUNK_SIZE = int(os.environ.get("BULK_INSERT_CHUNK_SIZE", "1000"))
+
+# In-process cache of employee details used by login and access checks, TTL is in seconds
+EMPLOYEE_CACHE_SIZE = int(os.environ.get("EMPLOYEE_CACHE_SIZE", "1024"))
+EMPLOYEE_CACHE_TTL = float(os.environ.get("EMPLOYEE_CACHE_TTL", "60"))
+
+# In-process cache of encoded listing responses, TTL is in seconds. Bodies larger than
+# RESPONSE_CACHE_MAX_BODY_SIZE bytes aren't cached, so a worker holds at most SIZE * MAX_BODY_SIZE bytes
+RESPONSE_CACHE_SIZE = int(os.environ.get("RESPONSE_CACHE_SIZE", "64"))
+RESPONSE_CACHE_TTL = float(os.environ.get("RESPONSE_CACHE_TTL", "300"))
+RESPONSE_CACHE_MAX_BODY_SIZE = int(os.environ.get("RESPONSE_CACHE_MAX_BODY_SIZE", str(1024 * 1024)))
@@ -0,0 +1,114 @@
+import html
+import re
+
+import psycopg2
+from flask import request
+
+from .api_response import response_format
+from .annotation_table import ANNOTATION_EMPLOYEE_JOIN, get_annotation_filters, get_where_clause
+from .database_transactions import database_cursor, execute_statement
+from .metrics import record_query_error
+from .pagination import InvalidPageRequest, get_page_size, encode_cursor, decode_cursor
+from ..config import ANNOTATION_TABLE_NAME, SEARCH_TEXT_CONFIG, SEARCH_DOCUMENT_LENGTH
+
+# Full text search over the annotation data. Matches are found with the GIN index on the generated
+# searchvector column (see migrations/008_annotation_search.sql) and ranked in the database, and snippets
+# are only made for the annotations on the returned page, so the data of other matches is never read
+
+# ts_rank_cd returns real, cast to float8 so the rank in the cursor compares equal to the ranks it came from
+SEARCH_RANK = f"ts_rank_cd({ANNOTATION_TABLE_NAME}.searchvector, query)::float8"
+# the text the snippets are taken from, the same columns the search vector is generated from
+SEARCH_DOCUMENT = (
+    f"concat_ws(' ', {ANNOTATION_TABLE_NAME}.tags,"
+    f" left({ANNOTATION_TABLE_NAME}.annotateddata, {SEARCH_DOCUMENT_LENGTH}),"
+    f" left({ANNOTATION_TABLE_NAME}.originaldata, {SEARCH_DOCUMENT_LENGTH}))"
+)
+# matched words are marked with control characters, replaced by <mark> once the snippet is HTML escaped
+SNIPPET_START = "\x02"
+SNIPPET_STOP = "\x03"
+SNIPPET_OPTIONS = f"MaxFragments=2, MaxWords=20, MinWords=5, StartSel={SNIPPET_START}, StopSel={SNIPPET_STOP}"
+
+
+# Turns the q query parameter into a tsquery matching annotations with every word. A word ending with *
+# matches words starting with it, e.g. "anno* cat" becomes "anno:* & cat"
+def get_search_query(text):
+    terms = [f"{word}:*" if prefix else word for word, prefix in re.findall(r"(\w+)(\*?)", text)]
+    if not terms:
+        raise ValueError("The search has to contain at least one word")
+    return " & ".join(terms)
+
+
+def get_search_position(args):
+    if "cursor" not in args:
+        return None
+    try:
+        position = decode_cursor(args["cursor"])
+        return {"rank": float(position["rank"]), "annotationid": int(position["annotationid"])}
+    except (KeyError, TypeError, ValueError):
+        raise InvalidPageRequest("Invalid cursor")
+
+
+# Safe HTML of a snippet with the matched words in <mark> elements
+def format_snippet(snippet):
+    return html.escape(snippet).replace(SNIPPET_START, "<mark>").replace(SNIPPET_STOP, "</mark>")
+
+
+# Returns the ids of the annotations matching the q query parameter, best match first, with a snippet of
+# each around the matched words, e.g. {"records": [{"annotationid": 4, "rank": 0.2, "snippet": "..."}],
+# "next-cursor": "..."}. Takes the filters and paging parameters of /get_annotations
+def search_annotations():
+    try:
+        search_query = get_search_query(request.args["q"])
+    except KeyError:
+        return response_format(400, "Missing q query parameter")
+    except ValueError as error:
+        return response_format(400, f"Invalid search. Error: {error}")
+    try:
+        page_size = get_page_size(request.args)
+        position = get_search_position(request.args)
+    except InvalidPageRequest as error:
+        return response_format(400, f"Invalid paging parameters. Error: {error}")
+
+    conditions, values = get_annotation_filters(request.args)
+    join = f" {ANNOTATION_EMPLOYEE_JOIN}" if "team" in request.args else ""
+    conditions.insert(0, f"{ANNOTATION_TABLE_NAME}.searchvector @@ query")
+    # keyset pagination, the cursor holds the rank and id of the last annotation on the previous page
+    if position is not None:
+        conditions.append(
+            f"({SEARCH_RANK} < %s OR ({SEARCH_RANK} = %s AND {ANNOTATION_TABLE_NAME}.annotationid > %s))"
+        )
+        values += [position["rank"], position["rank"], position["annotationid"]]
+
+    # the page is picked first and the snippets made from the annotations on it, one extra match is read
+    # to know if there is another page
+    sql = (
+        f"SELECT page.annotationid, page.rank, ts_headline(%s::regconfig, {SEARCH_DOCUMENT}, page.query, %s)"
+        f" FROM (SELECT {ANNOTATION_TABLE_NAME}.annotationid, {SEARCH_RANK} AS rank, query"
+        f" FROM {ANNOTATION_TABLE_NAME}{join}, to_tsquery(%s::regconfig, %s) AS query{get_where_clause(conditions)}"
+        f" ORDER BY rank DESC, {ANNOTATION_TABLE_NAME}.annotationid LIMIT %s) AS page"
+        f" INNER JOIN {ANNOTATION_TABLE_NAME} ON {ANNOTATION_TABLE_NAME}.annotationid = page.annotationid"
+        f" ORDER BY page.rank DESC, page.annotationid;"
+    )
+    try:
+        with database_cursor("search_annotations") as db_cursor:
+            execute_statement(
+                db_cursor,
+                sql,
+                [SEARCH_TEXT_CONFIG, SNIPPET_OPTIONS, SEARCH_TEXT_CONFIG, search_query]
+                + values
+                + [page_size + 1],
+            )
+            rows = db_cursor.fetchall()
+    except psycopg2.Error as error:
+        record_query_error("search_annotations")
+        return response_format(500, f"Error with searching the annotations. Error: {error}")
+
+    records = [
+        {"annotationid": annotation_id, "rank": rank, "snippet": format_snippet(snippet)}
+        for annotation_id, rank, snippet in rows[:page_size]
+    ]
+    next_cursor = None
+    if len(rows) > page_size:
+        next_cursor = encode_cursor({"rank": records[-1]["rank"], "annotationid": records[-1]["annotationid"]})
+
+    return response_format(200, {"records": records, "next-cursor": next_cursor})
@@ -0,0 +1,53 @@
+from flask import request
+
+from .api_response import response_format
+from .database_transactions import get_record_field_from_table
+from ..config import ANNOTATION_STATS_TABLE_NAME, EMPLOYEE_TABLE_NAME
+
+# Progress of the annotation work for dashboards. Counts are read from the annotation_stats table, which
+# triggers keep up to date on every annotation write (see migrations/005_annotation_stats.sql), so this reads
+# one row per user and status however many annotations there are
+
+STATS_EMPLOYEE_JOIN = f"INNER JOIN {EMPLOYEE_TABLE_NAME} ON {ANNOTATION_STATS_TABLE_NAME}.username={EMPLOYEE_TABLE_NAME}.username"
+STATS_FIELDS = (
+    f"{EMPLOYEE_TABLE_NAME}.team, {ANNOTATION_STATS_TABLE_NAME}.username, {ANNOTATION_STATS_TABLE_NAME}.annotationstatus,"
+    f" COALESCE(SUM({ANNOTATION_STATS_TABLE_NAME}.annotationcount), 0)::bigint"
+)
+# per user, per team and per status counts plus the total, the total row is returned even without annotations
+STATS_GROUPING = (
+    f"GROUP BY GROUPING SETS (({EMPLOYEE_TABLE_NAME}.team, {ANNOTATION_STATS_TABLE_NAME}.username, {ANNOTATION_STATS_TABLE_NAME}.annotationstatus),"
+    f" ({EMPLOYEE_TABLE_NAME}.team, {ANNOTATION_STATS_TABLE_NAME}.annotationstatus), ({ANNOTATION_STATS_TABLE_NAME}.annotationstatus), ())"
+)
+
+
+# Returns {"total": 10, "by-status": {"done": 4, ...}, "by-team": {"team": {"done": 4, ...}, ...},
+# "by-user": {"user": {"done": 4, ...}, ...}}. The team query parameter limits the counts to one team
+def get_annotation_stats():
+    conditions = [f"{ANNOTATION_STATS_TABLE_NAME}.annotationcount > 0"]
+    values = []
+    if "team" in request.args:
+        conditions.append(f"{EMPLOYEE_TABLE_NAME}.team = %s")
+        values.append(request.args["team"])
+
+    response = get_record_field_from_table(
+        ANNOTATION_STATS_TABLE_NAME,
+        STATS_FIELDS,
+        f"{STATS_EMPLOYEE_JOIN} WHERE {' AND '.join(conditions)} {STATS_GROUPING}",
+        values,
+    )
+    if response["statusCode"] != 200:  # return error
+        return response
+
+    # the columns a row isn't grouped by are null, every stored column is not null
+    stats = {"total": 0, "by-status": {}, "by-team": {}, "by-user": {}}
+    for team, user_name, status, count in response["body"]:
+        if status is None:
+            stats["total"] = count
+        elif team is None:
+            stats["by-status"][status] = count
+        elif user_name is None:
+            stats["by-team"].setdefault(team, {})[status] = count
+        else:
+            stats["by-user"].setdefault(user_name, {})[status] = count
+
+    return response_format(200, stats)
@@ -0,0 +1,108 @@
+import psycopg2
+from flask import request
+
+from .api_response import response_format
+from .annotation_table import ANNOTATION_EMPLOYEE_JOIN, get_listing_fields
+from .change_feed import get_snapshot_xmin
+from .database_transactions import get_record_page_from_table
+from .metrics import record_query_error
+from .pagination import InvalidPageRequest, get_page_size, encode_cursor, decode_cursor
+from ..config import ANNOTATION_TABLE_NAME, ANNOTATION_TOMBSTONE_TABLE_NAME
+
+# Incremental sync for offline clients and ETL jobs. Every annotation records the transaction that last
+# wrote it and deleted annotations leave a tombstone (see migrations/007_annotation_sync.sql), so a sync
+# reads only what changed since the client's watermark. Changes are read in (transaction, annotation id)
+# order and only from transactions below the snapshot xmin, which have all ended
+
+
+def get_sync_position(table_name):
+    return (
+        f"({table_name}.changetransaction, {table_name}.annotationid) > (%s, %s)"
+        f" AND {table_name}.changetransaction < %s"
+        f" ORDER BY {table_name}.changetransaction, {table_name}.annotationid"
+    )
+
+
+def get_watermark():
+    if "since" not in request.args:
+        return {"transaction": 0, "annotation": 0}  # first sync, every annotation
+    try:
+        watermark = decode_cursor(request.args["since"])
+        return {"transaction": int(watermark["transaction"]), "annotation": int(watermark["annotation"])}
+    except (KeyError, TypeError, ValueError):
+        raise InvalidPageRequest("Invalid watermark")
+
+
+# Returns the annotations written, with the time of their last write in updatedat, and the ids of those
+# deleted since the since watermark, at most page-size of them together, e.g. {"records": [...], "deleted": [4, 9], "watermark": "...", "has-more": false}.
+# The next sync passes the returned watermark as since, right away while has-more is true. Takes the fields
+# query parameter of /get_annotations
+def sync_annotations():
+    try:
+        fields = get_listing_fields(request.args)
+    except ValueError as error:
+        return response_format(400, f"Invalid fields parameter. Error: {error}")
+    try:
+        page_size = get_page_size(request.args)
+        watermark = get_watermark()
+    except InvalidPageRequest as error:
+        return response_format(400, f"Invalid sync parameters. Error: {error}")
+
+    try:
+        upper_transaction = get_snapshot_xmin()
+    except psycopg2.Error as error:
+        record_query_error("get_snapshot_xmin")
+        return response_format(500, f"Error with reading from the database: {error}")
+    values = [watermark["transaction"], watermark["annotation"], upper_transaction]
+
+    # one extra change of each kind is read to know if there are more
+    records_response = get_record_page_from_table(
+        ANNOTATION_TABLE_NAME,
+        f"{fields}, {ANNOTATION_TABLE_NAME}.updatedat, {ANNOTATION_TABLE_NAME}.changetransaction AS synctransaction",
+        f"{ANNOTATION_EMPLOYEE_JOIN} WHERE {get_sync_position(ANNOTATION_TABLE_NAME)}",
+        values,
+        page_size + 1,
+        keyed=True,
+    )
+    if records_response["statusCode"] != 200:  # return error
+        return records_response
+    tombstones_response = get_record_page_from_table(
+        ANNOTATION_TOMBSTONE_TABLE_NAME,
+        "annotationid, changetransaction",
+        f"WHERE {get_sync_position(ANNOTATION_TOMBSTONE_TABLE_NAME)}",
+        values,
+        page_size + 1,
+    )
+    if tombstones_response["statusCode"] != 200:  # return error
+        return tombstones_response
+
+    # merges both in change order, deletions after writes made by the same transaction
+    changes = [
+        (record.pop("synctransaction"), record["annotationid"], 0, record)
+        for record in records_response["body"]
+    ] + [
+        (transaction, annotation_id, 1, annotation_id)
+        for annotation_id, transaction in tombstones_response["body"]
+    ]
+    changes.sort(key=lambda change: change[:3])
+    has_more = len(changes) > page_size
+    changes = changes[:page_size]
+
+    if has_more:
+        last_transaction, last_annotation_id = changes[-1][:2]
+        next_watermark = {"transaction": last_transaction, "annotation": last_annotation_id}
+    elif upper_transaction > watermark["transaction"]:
+        # everything before the snapshot xmin has been returned
+        next_watermark = {"transaction": upper_transaction, "annotation": 0}
+    else:
+        next_watermark = watermark
+
+    return response_format(
+        200,
+        {
+            "records": [change[3] for change in changes if change[2] == 0],
+            "deleted": [change[3] for change in changes if change[2] == 1],
+            "watermark": encode_cursor(next_watermark),
+            "has-more": has_more,
+        },
+    )
@@ -1,37 +1,281 @@
-from flask import request
+import itertools
+import json
+
+import psycopg2
+from flask import Response, current_app, request
 
 from .api_response import response_format
 from .database_transactions import (
+    database_cursor,
+    execute_statement,
+    get_keyed_records,
     get_record_field_from_table,
+    get_record_page_from_table,
+    get_record_stream_from_table,
     add_to_table,
-    update_field,
+    add_many_to_table,
+    update_fields,
     delete_record,
 )
-from ..config import ANNOTATION_TABLE_NAME, ANNOTATION_TABLE_ATTRIBUTES, EMPLOYEE_TABLE_NAME
+from .json_patch import JsonPatchError, apply_patch, parse_pointer
+from .metrics import record_query_error
+from .pagination import InvalidPageRequest, get_page_size, encode_cursor, decode_cursor
+from .query_builder import build_select, build_update
+from ..config import (
+    ANNOTATION_TABLE_NAME,
+    ANNOTATION_TABLE_ATTRIBUTES,
+    ANNOTATION_CONTENT_ATTRIBUTES,
+    EMPLOYEE_TABLE_NAME,
+    EXPORT_BATCH_SIZE,
+    BULK_INSERT_CHUNK_SIZE,
+    ANNOTATION_CLAIMABLE_STATUS,
+    ANNOTATION_CLAIMED_STATUS,
+    ANNOTATION_POOL_USER,
+    MAX_CLAIM_COUNT,
+)
+
+
+# annotation fields every listing returns, the version is needed to patch the annotation
+ANNOTATION_KEY_FIELDS = ["annotationid", "version"]
+# every annotation column returned to clients. Columns only used by a single feature, like the content
+# ids, the sync transaction or the search vector, are left out so listings don't depend on those migrations
+ANNOTATION_FIELDS = ", ".join(
+    f"{ANNOTATION_TABLE_NAME}.{field}" for field in ANNOTATION_KEY_FIELDS + ANNOTATION_TABLE_ATTRIBUTES
+)
+# fields and join for listing all annotation table fields and some details about the employee
+ANNOTATION_EMPLOYEE_FIELDS = f"{EMPLOYEE_TABLE_NAME}.firstname, {EMPLOYEE_TABLE_NAME}.lastname, {EMPLOYEE_TABLE_NAME}.team"
+ANNOTATION_LISTING_FIELDS = f"{ANNOTATION_FIELDS}, {ANNOTATION_EMPLOYEE_FIELDS}"
+ANNOTATION_EMPLOYEE_JOIN = f"INNER JOIN {EMPLOYEE_TABLE_NAME} ON {ANNOTATION_TABLE_NAME}.username={EMPLOYEE_TABLE_NAME}.username"
+
+# JSON keys of an annotation in requests, in the same order as ANNOTATION_TABLE_ATTRIBUTES
+ANNOTATION_REQUEST_KEYS = [
+    "user-name",
+    "annotation-status",
+    "original-data",
+    "annotated-data",
+    "tags",
+]
+
+# Inline data keys and the key of the uploaded content (see /upload_content) that can replace them.
+# An annotation needs one or the other, the one left out is stored as null
+ANNOTATION_CONTENT_KEYS = {
+    "original-data": "original-data-id",
+    "annotated-data": "annotated-data-id",
+}
+# JSON keys of the content ids, in the same order as ANNOTATION_CONTENT_ATTRIBUTES
+ANNOTATION_CONTENT_REQUEST_KEYS = list(ANNOTATION_CONTENT_KEYS.values())
+
+# query parameters that filter annotation listings and the condition each one adds
+ANNOTATION_FILTERS = {
+    "user-name": f"{ANNOTATION_TABLE_NAME}.username = %s",
+    "annotation-status": f"{ANNOTATION_TABLE_NAME}.annotationstatus = %s",
+    "team": f"{EMPLOYEE_TABLE_NAME}.team = %s",
+}
+
+
+# Tags are stored comma separated, this splits them into a lowercase array. It is the expression of the
+# GIN index in migrations/009_annotation_tag_index.sql, so filters have to use it unchanged
+ANNOTATION_TAG_ARRAY = f"regexp_split_to_array(lower({ANNOTATION_TABLE_NAME}.tags), '\\s*,\\s*')"
+
+
+# Every tag has to be one of the annotation tags, e.g. cat doesn't match bobcat or category. Tags are
+# matched case insensitively
+def add_tags_condition(conditions, values, tags):
+    tags = [tag.strip().lower() for tag in tags if tag.strip()]
+    if tags:
+        conditions.append(f"{ANNOTATION_TAG_ARRAY} @> %s::text[]")
+        values.append(tags)
+
+
+# Returns the SQL conditions and their values for the filters in the query parameters
+def get_annotation_filters(args):
+    conditions = []
+    values = []
+    for parameter, condition in ANNOTATION_FILTERS.items():
+        if parameter in args:
+            conditions.append(condition)
+            values.append(args[parameter])
+
+    # every tag passed has to be one of the annotation tags
+    add_tags_condition(conditions, values, args.getlist("tags"))
+
+    return conditions, values
+
+
+# Whether an annotation references uploaded content, only then are the content id columns written
+def uses_content(request_data):
+    if not isinstance(request_data, dict):
+        return False
+    return any(key in request_data for key in ANNOTATION_CONTENT_REQUEST_KEYS)
+
+
+# The columns written for annotations with or without content ids
+def get_annotation_attributes(with_content):
+    if with_content:
+        return ANNOTATION_TABLE_ATTRIBUTES + ANNOTATION_CONTENT_ATTRIBUTES
+    return ANNOTATION_TABLE_ATTRIBUTES
+
+
+# Extract the annotation values in the order of get_annotation_attributes(with_content)
+def get_annotation_values(request_data, with_content=False):
+    values = []
+    for key in ANNOTATION_REQUEST_KEYS:
+        if with_content and key in ANNOTATION_CONTENT_KEYS and ANNOTATION_CONTENT_KEYS[key] in request_data:
+            values.append(request_data.get(key))
+        else:
+            values.append(request_data[key])
+    if with_content:
+        values += [request_data.get(key) for key in ANNOTATION_CONTENT_REQUEST_KEYS]
+    return values
+
+
+def get_where_clause(conditions):
+    return f" WHERE {' AND '.join(conditions)}" if conditions else ""
+
+
+# Returns the fields to list. The fields query parameter is a comma separated list of annotation columns
+# to read instead of all of them, so list views can leave out large columns like originaldata or ask for
+# the content ids. annotationid, version and the employee details are always returned
+def get_listing_fields(args):
+    if "fields" not in args:
+        return ANNOTATION_LISTING_FIELDS
+
+    allowed_fields = ANNOTATION_TABLE_ATTRIBUTES + ANNOTATION_CONTENT_ATTRIBUTES
+    fields = []
+    for field in args["fields"].split(","):
+        field = field.strip()
+        if field not in allowed_fields and field not in ANNOTATION_KEY_FIELDS:
+            raise ValueError(f"Unknown field '{field}', fields can be: {', '.join(allowed_fields)}")
+        if field not in ANNOTATION_KEY_FIELDS and field not in fields:
+            fields.append(field)
+
+    annotation_fields = ", ".join(
+        f"{ANNOTATION_TABLE_NAME}.{field}" for field in ANNOTATION_KEY_FIELDS + fields
+    )
+    return f"{annotation_fields}, {ANNOTATION_EMPLOYEE_FIELDS}"
 
 
 def get_all_annotations():
-    # does inner join to get all annotation table fields and some details about the employee
-    fields = f'{ANNOTATION_TABLE_NAME}.*, {EMPLOYEE_TABLE_NAME}.firstname, {EMPLOYEE_TABLE_NAME}.lastname, {EMPLOYEE_TABLE_NAME}.team'
-    condition = f'INNER JOIN {EMPLOYEE_TABLE_NAME} ON {ANNOTATION_TABLE_NAME}.username={EMPLOYEE_TABLE_NAME}.username;'
-    return get_record_field_from_table(ANNOTATION_TABLE_NAME, fields, condition)
+    conditions, values = get_annotation_filters(request.args)
+    try:
+        fields = get_listing_fields(request.args)
+    except ValueError as error:
+        return response_format(400, f"Invalid fields parameter. Error: {error}")
+
+    # requests without paging parameters get every matching annotation
+    if "page-size" not in request.args and "cursor" not in request.args:
+        return get_record_field_from_table(
+            ANNOTATION_TABLE_NAME,
+            fields,
+            f"{ANNOTATION_EMPLOYEE_JOIN}{get_where_clause(conditions)};",
+            values,
+            keyed=True,
+            allow_empty=True,
+        )
+
+    try:
+        page_size = get_page_size(request.args)
+        cursor = request.args.get("cursor")
+        after_annotation_id = decode_cursor(cursor)["annotationid"] if cursor else None
+    except (InvalidPageRequest, KeyError) as error:
+        return response_format(400, f"Invalid paging parameters. Error: {error}")
+
+    # keyset pagination, the cursor holds the id of the last annotation on the previous page
+    if after_annotation_id is not None:
+        conditions.append(f"{ANNOTATION_TABLE_NAME}.annotationid > %s")
+        values.append(after_annotation_id)
+    condition = f"{ANNOTATION_EMPLOYEE_JOIN}{get_where_clause(conditions)} ORDER BY {ANNOTATION_TABLE_NAME}.annotationid"
+
+    # fetch one extra record to know if there is another page
+    response = get_record_page_from_table(
+        ANNOTATION_TABLE_NAME,
+        fields,
+        condition,
+        values,
+        page_size + 1,
+        keyed=True,
+    )
+    if response["statusCode"] != 200:  # return error
+        return response
+
+    records = response["body"][:page_size]
+    next_cursor = None
+    if len(response["body"]) > page_size:
+        next_cursor = encode_cursor({"annotationid": records[-1]["annotationid"]})
+
+    return response_format(200, {"records": records, "next-cursor": next_cursor})
+
+
+# Returns one annotation with all the listing fields, for views that need the data left out of listings.
+# Takes the fields query parameter of /get_annotations, e.g. to read the content ids
+def get_annotation():
+    try:
+        annotation_id = int(request.args["annotation-id"])
+    except KeyError:
+        return response_format(400, "Missing annotation-id query parameter")
+    except ValueError as error:
+        return response_format(400, f"Invalid annotation-id. Error: {error}")
+    try:
+        fields = get_listing_fields(request.args)
+    except ValueError as error:
+        return response_format(400, f"Invalid fields parameter. Error: {error}")
+
+    response = get_record_field_from_table(
+        ANNOTATION_TABLE_NAME,
+        fields,
+        f"{ANNOTATION_EMPLOYEE_JOIN} WHERE {ANNOTATION_TABLE_NAME}.annotationid = %s;",
+        [annotation_id],
+        keyed=True,
+    )
+    if response["statusCode"] != 200:  # return error
+        return response
+
+    return response_format(200, response["body"][0])
+
+
+# Streams every matching annotation as newline delimited JSON, one object per line
+def export_annotations():
+    conditions, values = get_annotation_filters(request.args)
+    try:
+        fields = get_listing_fields(request.args)
+    except ValueError as error:
+        return response_format(400, f"Invalid fields parameter. Error: {error}")
+    condition = f"{ANNOTATION_EMPLOYEE_JOIN}{get_where_clause(conditions)} ORDER BY {ANNOTATION_TABLE_NAME}.annotationid"
+
+    response = get_record_stream_from_table(
+        ANNOTATION_TABLE_NAME, fields, condition, values, EXPORT_BATCH_SIZE
+    )
+    if response["statusCode"] != 200:  # return error
+        return response
+
+    records = response["body"]
+    # the app's encoder, so lines are formatted like /get_annotations records. The body is generated after
+    # the request context is gone so it is looked up here
+    json_provider = current_app.json
+
+    def generate_lines():
+        try:
+            for record in records:
+                yield json_provider.dumps_bytes(record) + b"\n"
+        finally:
+            records.close()
+
+    export_response = Response(generate_lines(), mimetype="application/x-ndjson")
+    # makes sure the connection is released even if the body is never iterated
+    export_response.call_on_close(records.close)
+    return export_response
 
 
 def add_annotation_task():
     try:
         # Extract the values in the JSON request
         request_data = request.get_json()
-        attribute_value_list = [
-            request_data["user-name"],
-            request_data["annotation-status"],
-            request_data["original-data"],
-            request_data["annotated-data"],
-            request_data["tags"],
-        ]
+        with_content = uses_content(request_data)
+        attribute_value_list = get_annotation_values(request_data, with_content)
 
         # Add record to database
         response = add_to_table(
-            ANNOTATION_TABLE_NAME, ANNOTATION_TABLE_ATTRIBUTES, attribute_value_list
+            ANNOTATION_TABLE_NAME, get_annotation_attributes(with_content), attribute_value_list
         )
         return response
     except KeyError as error:
@@ -43,50 +287,247 @@ def add_annotation_task():
         return response_format(400, f"Error: {error}")
 
 
+# Adds many annotations in one transaction. The body is either a JSON array of annotations or, with the
+# application/x-ndjson content type, one annotation per line which is streamed into the database. The
+# content ids are written if any annotation of an array, or the first line of a stream, has one
+def add_annotation_tasks():
+    try:
+        invalid_annotations = []
+        if request.mimetype == "application/x-ndjson":
+            lines = ((number, line) for number, line in enumerate(request.stream, start=1) if line.strip())
+            first_line = next(lines, None)
+            try:
+                with_content = first_line is not None and uses_content(json.loads(first_line[1]))
+            except ValueError:
+                with_content = False  # reported when the line is read below
+
+            def read_rows():
+                for line_number, line in itertools.chain([first_line] if first_line else [], lines):
+                    try:
+                        annotation = json.loads(line)
+                        if not with_content and uses_content(annotation):
+                            raise ValueError("content ids can only be used if the first annotation has one")
+                        yield get_annotation_values(annotation, with_content)
+                    except (KeyError, TypeError, ValueError) as error:
+                        # raising stops the insert and rolls back the annotations already added
+                        invalid_annotations.append(f"line {line_number}: {error}")
+                        raise
+
+            rows = read_rows()
+        else:
+            request_data = request.get_json()
+            if not isinstance(request_data, list):
+                return response_format(400, "Expected a JSON array of annotations")
+            with_content = any(uses_content(annotation) for annotation in request_data)
+
+            # validate every annotation before adding any of them
+            rows = []
+            for index, annotation in enumerate(request_data):
+                try:
+                    rows.append(get_annotation_values(annotation, with_content))
+                except (KeyError, TypeError) as error:
+                    return response_format(
+                        400,
+                        f"Missing or incorrect JSON attributes in annotation {index}. Error related to extracting key value: {error}",
+                    )
+
+        response = add_many_to_table(
+            ANNOTATION_TABLE_NAME,
+            get_annotation_attributes(with_content),
+            rows,
+            "annotationid",
+            BULK_INSERT_CHUNK_SIZE,
+        )
+        if invalid_annotations:
+            return response_format(
+                400, f"Invalid annotation on {invalid_annotations[0]}"
+            )
+        if response["statusCode"] != 200:  # return error
+            return response
+
+        annotation_ids = [record[0] for record in response["body"]]
+        return response_format(200, {"annotation-ids": annotation_ids})
+    except Exception as error:
+        return response_format(400, f"Error: {error}")
+
+
+def get_version_conflict(annotation_id, version):
+    return response_format(
+        409, f"Annotation {annotation_id} has been changed since version {version}, reload it and try again"
+    )
+
+
+# The version the client last read, from the version attribute or the If-Match header. Writes with a
+# version only apply if the annotation is still at that version. None when neither is sent
+def get_expected_version(request_data, if_match):
+    if "version" in request_data:
+        return int(request_data["version"])
+    if not if_match or if_match.star_tag:
+        return None
+    versions = if_match.as_set(include_weak=True)
+    if len(versions) != 1:
+        raise ValueError("If-Match must hold a single version")
+    return int(versions.pop())
+
+
+# Condition, values and returned fields of a write to one annotation, checking the version when given
+def get_write_condition(annotation_id, version):
+    if version is None:
+        return "WHERE annotationid = %s", [annotation_id], "annotationid"
+    return "WHERE annotationid = %s AND version = %s", [annotation_id, version], "version"
+
+
+# Tells apart a write that found no annotation from one that was made with an out of date version.
+# Only called when the write changed nothing, so successful writes need a single statement
+def get_write_failure(annotation_id, version):
+    response = get_record_field_from_table(
+        ANNOTATION_TABLE_NAME, "version", "WHERE annotationid = %s", [annotation_id]
+    )
+    if version is not None and response["statusCode"] == 200:
+        return get_version_conflict(annotation_id, version)
+    return response_format(500, "Error: no records found")
+
+
 def update_annotation_record():
     try:
         request_data = request.get_json()
-        new_field_values = [
-            request_data["user-name"],
-            request_data["annotation-status"],
-            request_data["original-data"],
-            request_data["annotated-data"],
-            request_data["tags"],
-        ]
-        condition = f'WHERE annotationid = {request_data["annotation-id"]}'
-
-        # get the original record to check against
-        original_field_values = get_record_field_from_table(
+        with_content = uses_content(request_data)
+        new_field_values = get_annotation_values(request_data, with_content)
+        annotation_id = request_data["annotation-id"]
+        version = get_expected_version(request_data, request.if_match)
+        condition, condition_values, returning = get_write_condition(annotation_id, version)
+
+        # write every field in a single statement, no rows returned means the record doesn't exist or
+        # has a different version
+        response = update_fields(
             ANNOTATION_TABLE_NAME,
-            ",".join(ANNOTATION_TABLE_ATTRIBUTES),  # getting all fields except the id
+            dict(zip(get_annotation_attributes(with_content), new_field_values)),
             condition,
+            condition_values,
+            returning=returning,
+        )
+        if response["statusCode"] != 200:  # return error
+            return response
+        if not response["body"]:
+            if version is None:
+                return response_format(500, "Error: no records found")
+            return get_write_failure(annotation_id, version)
+
+        if version is None:
+            return response_format(200, "Success updating record")
+        return response_format(200, {"annotation-id": annotation_id, "version": response["body"][0][0]})
+    except KeyError as error:
+        return response_format(
+            400,
+            f"Missing or incorrect JSON attributes. Error related to extracting key value: {error}",
         )
-        if original_field_values["statusCode"] != 200:  # return error
-            return original_field_values
-
-        original_field_values = original_field_values["body"][
-            0
-        ]  # extract all the records
-
-        # check diff between original and new field values
-        for i in range(len(new_field_values)):
-            if new_field_values[i] != original_field_values[i]:
-                # update the record with the new field values
-                response = update_field(
+    except Exception as error:
+        return response_format(400, f"Error: {error}")
+
+
+# The parsed path and from pointers of the patch operations
+def get_patch_pointers(operations):
+    for operation in operations if isinstance(operations, list) else []:
+        for pointer in [operation.get("path"), operation.get("from")] if isinstance(operation, dict) else []:
+            if pointer is not None:
+                yield parse_pointer(pointer)
+
+
+# Data keys that the patch operations reach into, e.g. /annotated-data/labels/0. Their stored text is
+# patched as a JSON document
+def get_patched_data_keys(operations):
+    return {
+        tokens[0]
+        for tokens in get_patch_pointers(operations)
+        if len(tokens) > 1 and tokens[0] in ANNOTATION_CONTENT_KEYS
+    }
+
+
+# Whether the patch operations reach the content ids, only then are they read and written
+def patches_content(operations):
+    return any(
+        tokens and tokens[0] in ANNOTATION_CONTENT_REQUEST_KEYS for tokens in get_patch_pointers(operations)
+    )
+
+
+# Applies a JSON Patch to an annotation, so saves only send what changed. The patch is applied to the
+# annotation as it is sent to /add_annotation, e.g. {"annotation-id": 1, "version": 3, "patch":
+# [{"op": "replace", "path": "/annotation-status", "value": "done"}]}. The version is the one the client
+# last read, the annotation is only written if nobody changed it since and the new version is returned
+def patch_annotation_record():
+    try:
+        request_data = request.get_json()
+        annotation_id = int(request_data["annotation-id"])
+        version = int(request_data["version"])
+        operations = request_data["patch"]
+        data_keys = get_patched_data_keys(operations)
+        with_content = patches_content(operations)
+        request_keys = ANNOTATION_REQUEST_KEYS + (ANNOTATION_CONTENT_REQUEST_KEYS if with_content else [])
+        attributes = dict(zip(request_keys, get_annotation_attributes(with_content)))
+
+        # read, patch and write in one transaction
+        with database_cursor("patch_annotation") as db_cursor:
+            execute_statement(
+                db_cursor,
+                build_select(
                     ANNOTATION_TABLE_NAME,
-                    ANNOTATION_TABLE_ATTRIBUTES[i],
-                    new_field_values[i],
-                    condition,
-                )
-                if response["statusCode"] != 200:  # return error
-                    return response
+                    f"version, {', '.join(attributes.values())}",
+                    "WHERE annotationid = %s",
+                ),
+                [annotation_id],
+            )
+            record = db_cursor.fetchone()
+            if record is None:
+                return response_format(500, "Error: no records found")
+            if record[0] != version:
+                return get_version_conflict(annotation_id, version)
+
+            annotation = dict(zip(request_keys, record[1:]))
+            for key in data_keys:
+                try:
+                    annotation[key] = json.loads(annotation[key])
+                except (TypeError, ValueError):
+                    raise JsonPatchError(f"{key} isn't a JSON document")
 
-        return response_format(200, "Success updating record")
+            patched_annotation = apply_patch(annotation, operations)
+            if not isinstance(patched_annotation, dict) or set(patched_annotation) != set(annotation):
+                patchable_keys = ANNOTATION_REQUEST_KEYS + ANNOTATION_CONTENT_REQUEST_KEYS
+                raise JsonPatchError(f"A patch can only change the values of: {', '.join(patchable_keys)}")
+
+            changes = {
+                attributes[key]: json.dumps(value) if key in data_keys else value
+                for key, value in patched_annotation.items()
+                if value != annotation[key]
+            }
+            if not changes:
+                return response_format(200, {"annotation-id": annotation_id, "version": version})
+
+            # the version condition catches changes made since the annotation was read
+            execute_statement(
+                db_cursor,
+                build_update(
+                    ANNOTATION_TABLE_NAME,
+                    tuple(changes),
+                    "WHERE annotationid = %s AND version = %s",
+                    "version",
+                ),
+                list(changes.values()) + [annotation_id, version],
+            )
+            updated_record = db_cursor.fetchone()
+            if updated_record is None:
+                return get_version_conflict(annotation_id, version)
+
+        return response_format(200, {"annotation-id": annotation_id, "version": updated_record[0]})
+    except JsonPatchError as error:
+        return response_format(400, f"Invalid patch. Error: {error}")
     except KeyError as error:
         return response_format(
             400,
             f"Missing or incorrect JSON attributes. Error related to extracting key value: {error}",
         )
+    except psycopg2.Error as error:
+        record_query_error("patch_annotation")
+        return response_format(500, f"Error with database when updating record. Error: {error}")
     except Exception as error:
         return response_format(400, f"Error: {error}")
 
@@ -95,12 +536,172 @@ def delete_annotation_record():
     try:
         request_data = request.get_json()
         annotation_id = request_data["annotation-id"]
+        version = get_expected_version(request_data, request.if_match)
+        if version is None:
+            return delete_record(
+                ANNOTATION_TABLE_NAME, "WHERE annotationid = %s", [annotation_id]
+            )
 
+        condition, condition_values, returning = get_write_condition(annotation_id, version)
         response = delete_record(
-            ANNOTATION_TABLE_NAME, f"WHERE annotationid = {annotation_id}"
+            ANNOTATION_TABLE_NAME, condition, condition_values, returning=returning
         )
+        if response["statusCode"] != 200:  # return error
+            return response
+        if not response["body"]:
+            return get_write_failure(annotation_id, version)
 
-        return response
+        return response_format(200, "Successfully deleted record")
+    except KeyError as error:
+        return response_format(
+            400,
+            f"Missing or incorrect JSON attributes. Error related to extracting key value: {error}",
+        )
+    except Exception as error:
+        return response_format(400, f"Error: {error}")
+
+
+# Assigns the next annotations waiting in the task queue to an annotator, e.g. {"user-name": "annotator",
+# "count": 5, "tags": ["cat"]}. count (default 1) and tags are optional, tags only pick tasks having those
+# tags. When ANNOTATION_POOL_USER is set annotators claim the tasks assigned to it, otherwise they fall back
+# to the tasks currently assigned to anyone in their own team. The request can name a team, or set
+# "any-team" to true to claim from the whole queue. Tasks locked by another claim are skipped rather than
+# waited for, so concurrent annotators never get the same task.
+# Returns the claimed annotations, fewer than count (or none) when the queue runs out
+def claim_annotation_tasks():
+    try:
+        request_data = request.get_json()
+        user_name = request_data["user-name"]
+        count = int(request_data.get("count", 1))
+        if count < 1:
+            return response_format(400, "count must be at least 1")
+        count = min(count, MAX_CLAIM_COUNT)
+
+        join = ""
+        conditions = [f"{ANNOTATION_TABLE_NAME}.annotationstatus = %s"]
+        values = [ANNOTATION_CLAIMABLE_STATUS]
+        if "team" in request_data:
+            join = f" {ANNOTATION_EMPLOYEE_JOIN}"
+            conditions.append(ANNOTATION_FILTERS["team"])
+            values.append(request_data["team"])
+        elif request_data.get("any-team") is not True:
+            if ANNOTATION_POOL_USER:
+                conditions.append(f"{ANNOTATION_TABLE_NAME}.username = %s")
+                values.append(ANNOTATION_POOL_USER)
+            else:
+                join = f" {ANNOTATION_EMPLOYEE_JOIN}"
+                conditions.append(
+                    f"{EMPLOYEE_TABLE_NAME}.team = (SELECT claimer.team FROM {EMPLOYEE_TABLE_NAME} AS claimer"
+                    f" WHERE claimer.username = %s)"
+                )
+                values.append(user_name)
+        tags = request_data.get("tags", [])
+        add_tags_condition(conditions, values, [tags] if isinstance(tags, str) else tags)
+
+        # selects and assigns the tasks in one statement, locking only the annotation rows
+        sql = (
+            f"WITH claimed AS MATERIALIZED (SELECT {ANNOTATION_TABLE_NAME}.annotationid FROM {ANNOTATION_TABLE_NAME}{join}"
+            f"{get_where_clause(conditions)} ORDER BY {ANNOTATION_TABLE_NAME}.annotationid LIMIT %s"
+            f" FOR UPDATE OF {ANNOTATION_TABLE_NAME} SKIP LOCKED)"
+            f" UPDATE {ANNOTATION_TABLE_NAME} SET username = %s, annotationstatus = %s FROM claimed"
+            f" WHERE {ANNOTATION_TABLE_NAME}.annotationid = claimed.annotationid RETURNING {ANNOTATION_FIELDS};"
+        )
+        with database_cursor("claim_annotation_tasks") as db_cursor:
+            execute_statement(
+                db_cursor, sql, values + [count, user_name, ANNOTATION_CLAIMED_STATUS]
+            )
+            records = get_keyed_records(db_cursor, db_cursor.fetchall())
+
+        return response_format(200, sorted(records, key=lambda record: record["annotationid"]))
+    except KeyError as error:
+        return response_format(
+            400,
+            f"Missing or incorrect JSON attributes. Error related to extracting key value: {error}",
+        )
+    except psycopg2.Error as error:
+        record_query_error("claim_annotation_tasks")
+        return response_format(500, f"Error with database when claiming tasks. Error: {error}")
+    except Exception as error:
+        return response_format(400, f"Error: {error}")
+
+
+# Extract the list of annotation ids for bulk updates and deletes
+def get_annotation_ids(request_data):
+    annotation_ids = request_data["annotation-ids"]
+    if not isinstance(annotation_ids, list) or not annotation_ids:
+        raise ValueError("annotation-ids must be a non empty list")
+    return [int(annotation_id) for annotation_id in annotation_ids]
+
+
+# Reports which of the requested annotations were changed and which don't exist
+def get_bulk_outcome(annotation_ids, response, action):
+    changed_ids = {record[0] for record in response["body"]}
+    return {
+        action: [
+            annotation_id for annotation_id in annotation_ids if annotation_id in changed_ids
+        ],
+        "not-found": [
+            annotation_id for annotation_id in annotation_ids if annotation_id not in changed_ids
+        ],
+    }
+
+
+# Applies the same changes to many annotations in one statement. Changes can contain any of the
+# annotation attributes, e.g. {"user-name": "new-user", "annotation-status": "done"}
+def update_annotation_records():
+    try:
+        request_data = request.get_json()
+        annotation_ids = get_annotation_ids(request_data)
+        changes = request_data["changes"]
+
+        request_keys = ANNOTATION_REQUEST_KEYS + ANNOTATION_CONTENT_REQUEST_KEYS
+        unknown_keys = set(changes) - set(request_keys)
+        if unknown_keys or not changes:
+            return response_format(
+                400, f"Changes must contain some of: {', '.join(request_keys)}"
+            )
+
+        # only the attributes being changed are written
+        field_values = {
+            attribute: changes[key]
+            for key, attribute in zip(request_keys, get_annotation_attributes(True))
+            if key in changes
+        }
+        response = update_fields(
+            ANNOTATION_TABLE_NAME,
+            field_values,
+            "WHERE annotationid = ANY(%s)",
+            [annotation_ids],
+            returning="annotationid",
+        )
+        if response["statusCode"] != 200:  # return error
+            return response
+
+        return response_format(200, get_bulk_outcome(annotation_ids, response, "updated"))
+    except KeyError as error:
+        return response_format(
+            400,
+            f"Missing or incorrect JSON attributes. Error related to extracting key value: {error}",
+        )
+    except Exception as error:
+        return response_format(400, f"Error: {error}")
+
+
+def delete_annotation_records():
+    try:
+        request_data = request.get_json()
+        annotation_ids = get_annotation_ids(request_data)
+
+        response = delete_record(
+            ANNOTATION_TABLE_NAME,
+            "WHERE annotationid = ANY(%s)",
+            [annotation_ids],
+            returning="annotationid",
+        )
+        if response["statusCode"] != 200:  # return error
+            return response
+
+        return response_format(200, get_bulk_outcome(annotation_ids, response, "deleted"))
     except KeyError as error:
         return response_format(
             400,
@@ -0,0 +1,200 @@
+from quart import request
+
+from .api_response import response_format
+from .async_database_transactions import (
+    get_record_field_from_table,
+    get_record_page_from_table,
+    add_to_table,
+    update_fields,
+    delete_record,
+)
+from .annotation_table import (
+    ANNOTATION_EMPLOYEE_JOIN,
+    get_annotation_filters,
+    get_annotation_attributes,
+    get_annotation_values,
+    uses_content,
+    get_where_clause,
+    get_listing_fields,
+    get_expected_version,
+    get_write_condition,
+    get_version_conflict,
+)
+from .pagination import InvalidPageRequest, get_page_size, encode_cursor, decode_cursor
+from ..config import ANNOTATION_TABLE_NAME
+
+# Async versions of the routes in annotation_table, served by the ASGI app
+
+
+async def get_all_annotations():
+    conditions, values = get_annotation_filters(request.args)
+    try:
+        fields = get_listing_fields(request.args)
+    except ValueError as error:
+        return response_format(400, f"Invalid fields parameter. Error: {error}")
+
+    # requests without paging parameters get every matching annotation
+    if "page-size" not in request.args and "cursor" not in request.args:
+        return await get_record_field_from_table(
+            ANNOTATION_TABLE_NAME,
+            fields,
+            f"{ANNOTATION_EMPLOYEE_JOIN}{get_where_clause(conditions)}",
+            values,
+            keyed=True,
+            allow_empty=True,
+        )
+
+    try:
+        page_size = get_page_size(request.args)
+        cursor = request.args.get("cursor")
+        after_annotation_id = decode_cursor(cursor)["annotationid"] if cursor else None
+    except (InvalidPageRequest, KeyError) as error:
+        return response_format(400, f"Invalid paging parameters. Error: {error}")
+
+    # keyset pagination, the cursor holds the id of the last annotation on the previous page
+    if after_annotation_id is not None:
+        conditions.append(f"{ANNOTATION_TABLE_NAME}.annotationid > %s")
+        values.append(after_annotation_id)
+    condition = f"{ANNOTATION_EMPLOYEE_JOIN}{get_where_clause(conditions)} ORDER BY {ANNOTATION_TABLE_NAME}.annotationid"
+
+    # fetch one extra record to know if there is another page
+    response = await get_record_page_from_table(
+        ANNOTATION_TABLE_NAME,
+        fields,
+        condition,
+        values,
+        page_size + 1,
+        keyed=True,
+    )
+    if response["statusCode"] != 200:  # return error
+        return response
+
+    records = response["body"][:page_size]
+    next_cursor = None
+    if len(response["body"]) > page_size:
+        next_cursor = encode_cursor({"annotationid": records[-1]["annotationid"]})
+
+    return response_format(200, {"records": records, "next-cursor": next_cursor})
+
+
+async def get_annotation():
+    try:
+        annotation_id = int(request.args["annotation-id"])
+    except KeyError:
+        return response_format(400, "Missing annotation-id query parameter")
+    except ValueError as error:
+        return response_format(400, f"Invalid annotation-id. Error: {error}")
+    try:
+        fields = get_listing_fields(request.args)
+    except ValueError as error:
+        return response_format(400, f"Invalid fields parameter. Error: {error}")
+
+    response = await get_record_field_from_table(
+        ANNOTATION_TABLE_NAME,
+        fields,
+        f"{ANNOTATION_EMPLOYEE_JOIN} WHERE {ANNOTATION_TABLE_NAME}.annotationid = %s",
+        [annotation_id],
+        keyed=True,
+    )
+    if response["statusCode"] != 200:  # return error
+        return response
+
+    return response_format(200, response["body"][0])
+
+
+async def add_annotation_task():
+    try:
+        # Extract the values in the JSON request
+        request_data = await request.get_json()
+        with_content = uses_content(request_data)
+        attribute_value_list = get_annotation_values(request_data, with_content)
+
+        # Add record to database
+        response = await add_to_table(
+            ANNOTATION_TABLE_NAME, get_annotation_attributes(with_content), attribute_value_list
+        )
+        return response
+    except KeyError as error:
+        return response_format(
+            400,
+            f"Missing or incorrect JSON attributes. Error related to extracting key value: {error}",
+        )
+    except Exception as error:
+        return response_format(400, f"Error: {error}")
+
+
+# Tells apart a write that found no annotation from one made with an out of date version, see
+# get_write_failure in annotation_table
+async def get_write_failure(annotation_id, version):
+    response = await get_record_field_from_table(
+        ANNOTATION_TABLE_NAME, "version", "WHERE annotationid = %s", [annotation_id]
+    )
+    if version is not None and response["statusCode"] == 200:
+        return get_version_conflict(annotation_id, version)
+    return response_format(500, "Error: no records found")
+
+
+async def update_annotation_record():
+    try:
+        request_data = await request.get_json()
+        with_content = uses_content(request_data)
+        new_field_values = get_annotation_values(request_data, with_content)
+        annotation_id = int(request_data["annotation-id"])
+        version = get_expected_version(request_data, request.if_match)
+        condition, condition_values, returning = get_write_condition(annotation_id, version)
+
+        # write every field in a single statement, no rows returned means the record doesn't exist or
+        # has a different version
+        response = await update_fields(
+            ANNOTATION_TABLE_NAME,
+            dict(zip(get_annotation_attributes(with_content), new_field_values)),
+            condition,
+            condition_values,
+            returning=returning,
+        )
+        if response["statusCode"] != 200:  # return error
+            return response
+        if not response["body"]:
+            if version is None:
+                return response_format(500, "Error: no records found")
+            return await get_write_failure(annotation_id, version)
+
+        if version is None:
+            return response_format(200, "Success updating record")
+        return response_format(200, {"annotation-id": annotation_id, "version": response["body"][0][0]})
+    except KeyError as error:
+        return response_format(
+            400,
+            f"Missing or incorrect JSON attributes. Error related to extracting key value: {error}",
+        )
+    except Exception as error:
+        return response_format(400, f"Error: {error}")
+
+
+async def delete_annotation_record():
+    try:
+        request_data = await request.get_json()
+        annotation_id = int(request_data["annotation-id"])
+        version = get_expected_version(request_data, request.if_match)
+        if version is None:
+            return await delete_record(
+                ANNOTATION_TABLE_NAME, "WHERE annotationid = %s", [annotation_id]
+            )
+
+        condition, condition_values, returning = get_write_condition(annotation_id, version)
+        response = await delete_record(
+            ANNOTATION_TABLE_NAME, condition, condition_values, returning=returning
+        )
+        if response["statusCode"] != 200:  # return error
+            return response
+        if not response["body"]:
+            return await get_write_failure(annotation_id, version)
+
+        return response_format(200, "Successfully deleted record")
+    except KeyError as error:
+        return response_format(
+            400,
+            f"Missing or incorrect JSON attributes. Error related to extracting key value: {error}",
+        )
+    except Exception as error:
+        return response_format(400, f"Error: {error}")
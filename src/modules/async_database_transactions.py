@@ -0,0 +1,199 @@
+import asyncpg
+from ..config import (
+    DB_HOST,
+    DB_NAME,
+    DB_USER,
+    DB_PASSWORD,
+    DB_POOL_MIN_SIZE,
+    DB_POOL_MAX_SIZE,
+    DB_POOL_TIMEOUT,
+    DB_POOL_HEALTH_CHECK_INTERVAL,
+    DB_USE_PREPARED_STATEMENTS,
+    DB_MAX_PREPARED_STATEMENTS,
+)
+from .api_response import response_format
+from .query_builder import convert_placeholders
+
+# Async equivalents of the helpers in database_transactions for the ASGI app (src/asgi.py).
+# They take conditions with %s placeholders like the sync helpers and return the same responses
+
+# One pool per worker, created on the worker's event loop when the app starts serving
+async_connection_pool = None
+
+
+async def open_async_connection_pool():
+    global async_connection_pool
+    if async_connection_pool is None:
+        async_connection_pool = await asyncpg.create_pool(
+            host=DB_HOST,
+            database=DB_NAME,
+            user=DB_USER,
+            password=DB_PASSWORD,
+            min_size=DB_POOL_MIN_SIZE,
+            max_size=DB_POOL_MAX_SIZE,
+            # idle connections are closed and replaced rather than health checked
+            max_inactive_connection_lifetime=DB_POOL_HEALTH_CHECK_INTERVAL,
+            # asyncpg keeps its own cache of named prepared statements, turned off with the sync ones so
+            # the app works behind pgbouncer in transaction pooling mode
+            statement_cache_size=DB_MAX_PREPARED_STATEMENTS if DB_USE_PREPARED_STATEMENTS else 0,
+        )
+    return async_connection_pool
+
+
+async def close_async_connection_pool():
+    global async_connection_pool
+    if async_connection_pool is not None:
+        await async_connection_pool.close()
+        async_connection_pool = None
+
+
+def get_async_connection(pool):
+    return pool.acquire(timeout=DB_POOL_TIMEOUT)
+
+
+# Create
+async def add_to_table(table_name, attributes, values):
+    try:
+        attribute_list = ", ".join(
+            attributes
+        )  # creates a string list for the SQL command
+        value_placeholder = ", ".join(
+            f"${number}" for number in range(1, len(attributes) + 1)
+        )  # create string placeholder for SQL command
+        sql = f"INSERT INTO {table_name} ({attribute_list}) VALUES ({value_placeholder});"
+
+        pool = await open_async_connection_pool()
+        async with get_async_connection(pool) as db_connection:
+            await db_connection.execute(sql, *values)
+    except asyncpg.PostgresError as error:
+        return response_format(
+            500, f"Error with adding to the database. Error: {error}"
+        )
+    except Exception as error:
+        return response_format(500, f"Error: {error}")
+    else:
+        return response_format(200, "Data successfully added")
+
+
+# Update. Condition is in the form of 'WHERE something = %s' with values filling in the placeholders
+async def update_field(table_name, field, value, condition, values=()):
+    try:
+        sql = convert_placeholders(
+            f"UPDATE {table_name} SET {field} = %s {condition};"
+        )
+
+        pool = await open_async_connection_pool()
+        async with get_async_connection(pool) as db_connection:
+            await db_connection.execute(sql, value, *values)
+
+        return response_format(200, "Data successfully updated")
+    except asyncpg.PostgresError as error:
+        return response_format(
+            500, f"Error with database when updating record. Error: {error}"
+        )
+    except Exception as error:
+        return response_format(500, f"Error: {error}")
+
+
+# Update several fields in one statement, see update_fields in database_transactions
+async def update_fields(
+    table_name, field_values, condition, condition_values=(), returning=None
+):
+    try:
+        set_list = ", ".join(
+            f"{field} = %s" for field in field_values
+        )  # creates 'field = %s' pairs for the SQL command
+        returning_clause = f" RETURNING {returning}" if returning else ""
+        sql = convert_placeholders(
+            f"UPDATE {table_name} SET {set_list} {condition}{returning_clause};"
+        )
+        values = list(field_values.values()) + list(condition_values)
+
+        pool = await open_async_connection_pool()
+        async with get_async_connection(pool) as db_connection:
+            database_output = await db_connection.fetch(sql, *values)
+
+        if returning is None:
+            return response_format(200, "Data successfully updated")
+        return response_format(200, [tuple(record) for record in database_output])
+    except asyncpg.PostgresError as error:
+        return response_format(
+            500, f"Error with database when updating record. Error: {error}"
+        )
+    except Exception as error:
+        return response_format(500, f"Error: {error}")
+
+
+# Same format as the records returned by the helpers in database_transactions
+def get_records(database_output, keyed):
+    if keyed:
+        return [dict(record) for record in database_output]
+    return [tuple(record) for record in database_output]
+
+
+# Read. Condition can contain %s placeholders that are filled in by values. With keyed the records are
+# dicts keyed by column name instead of tuples. Finding no records is an error unless allow_empty is set
+async def get_record_field_from_table(
+    table_name, field, condition, values=(), keyed=False, allow_empty=False
+):
+    try:
+        sql = convert_placeholders(f"SELECT {field} FROM {table_name} {condition};")
+
+        pool = await open_async_connection_pool()
+        async with get_async_connection(pool) as db_connection:
+            database_output = await db_connection.fetch(sql, *values)
+
+        if not database_output and not allow_empty:
+            return response_format(500, "Error: no records found")
+
+        return response_format(200, get_records(database_output, keyed))
+
+    except asyncpg.PostgresError as error:
+        return response_format(500, f"Error with reading from the database: {error}")
+    except Exception as error:
+        return response_format(500, f"Error: {error}")
+
+
+# Read a bounded page of records, see get_record_page_from_table in database_transactions
+async def get_record_page_from_table(
+    table_name, field, condition, values, page_size, keyed=False
+):
+    try:
+        sql = convert_placeholders(
+            f"SELECT {field} FROM {table_name} {condition} LIMIT %s;"
+        )
+
+        pool = await open_async_connection_pool()
+        async with get_async_connection(pool) as db_connection:
+            database_output = await db_connection.fetch(sql, *values, page_size)
+
+        return response_format(200, get_records(database_output, keyed))
+
+    except asyncpg.PostgresError as error:
+        return response_format(500, f"Error with reading from the database: {error}")
+    except Exception as error:
+        return response_format(500, f"Error: {error}")
+
+
+# Delete. Condition is in the form of 'WHERE something = %s' and helps identify what records is being deleted.
+# When returning is given the deleted rows are returned
+async def delete_record(table_name, condition, values=(), returning=None):
+    try:
+        returning_clause = f" RETURNING {returning}" if returning else ""
+        sql = convert_placeholders(f"DELETE FROM {table_name} {condition}{returning_clause};")
+
+        pool = await open_async_connection_pool()
+        async with get_async_connection(pool) as db_connection:
+            if returning is None:
+                await db_connection.execute(sql, *values)
+            else:
+                database_output = await db_connection.fetch(sql, *values)
+
+        if returning is None:
+            return response_format(200, "Successfully deleted record")
+        return response_format(200, [tuple(record) for record in database_output])
+
+    except asyncpg.PostgresError as error:
+        return response_format(500, f"Error with deleting from the database: {error}")
+    except Exception as error:
+        return response_format(500, f"Error: {error}")
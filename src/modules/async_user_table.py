@@ -0,0 +1,86 @@
+from quart import request
+from .async_database_transactions import add_to_table, get_record_field_from_table
+from .user_table import EMPLOYEE_CACHE_FIELDS, employee_cache
+from ..config import EMPLOYEE_TABLE_NAME, EMPLOYEE_TABLE_ATTRIBUTES
+from .api_response import response_format
+
+# Async versions of the routes in user_table, served by the ASGI app
+
+
+async def add_user():
+    try:
+        # Extract the values in the JSON request
+        request_data = await request.get_json()
+        attribute_value_list = [
+            request_data["user-name"],
+            request_data["first-name"],
+            request_data["last-name"],
+            request_data["team"],
+            request_data["admin"],
+            request_data["password"],
+        ]
+
+        # Add record to database
+        response = await add_to_table(
+            EMPLOYEE_TABLE_NAME, EMPLOYEE_TABLE_ATTRIBUTES, attribute_value_list
+        )
+        employee_cache.invalidate(request_data["user-name"])
+        return response
+
+    except KeyError as error:
+        return response_format(
+            400,
+            f"Missing or incorrect JSON attributes. Error related to extracting key value: {error}",
+        )
+    except Exception as error:
+        return response_format(400, f"Error: {error}")
+
+
+async def get_user_password():
+    try:
+        # Extract user name value
+        request_data = await request.get_json()
+        username = request_data["user-name"]
+
+        # Get password by running query then return response
+        database_output = await get_record_field_from_table(
+            EMPLOYEE_TABLE_NAME, "password", "WHERE username = %s", [username]
+        )
+        return database_output
+    except KeyError:
+        return response_format(400, f"Missing user name in request")
+    except Exception as error:
+        return response_format(400, f"Error: {error}")
+
+
+async def get_users():
+    return await get_record_field_from_table(EMPLOYEE_TABLE_NAME, "username", "")
+
+
+# Return true if the user is admin and false if they are not
+async def get_user_access_level():
+    try:
+        # Extract user name value
+        request_data = await request.get_json()
+        username = request_data["user-name"]
+
+        # Get user admin field value, read through the same cache as the sync routes
+        employee_details = employee_cache.get(username)
+        if employee_details is None:
+            database_output = await get_record_field_from_table(
+                EMPLOYEE_TABLE_NAME,
+                ", ".join(EMPLOYEE_CACHE_FIELDS),
+                "WHERE username = %s",
+                [username],
+            )
+            if database_output["statusCode"] != 200:  # return error
+                return database_output
+
+            employee_details = dict(zip(EMPLOYEE_CACHE_FIELDS, database_output["body"][0]))
+            employee_cache.set(username, employee_details)
+
+        return response_format(200, [(employee_details["admin"],)])
+    except KeyError:
+        return response_format(400, f"Missing user name in request")
+    except Exception as error:
+        return response_format(400, f"Error: {error}")
@@ -0,0 +1,67 @@
+import threading
+import time
+from collections import OrderedDict
+
+from .metrics import record_cache_lookup, record_cache_size
+
+
+# Thread safe in-process cache. Entries expire ttl seconds after being set and the least recently
+# used entry is evicted once the cache holds max_size entries. Caches given a name report their hits,
+# misses and size on /metrics
+class TTLCache:
+    def __init__(self, max_size, ttl, name=None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.name = name
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # key -> (expiry time, value)
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                    self._record_size()
+                self.misses += 1
+                self._record_lookup(False)
+                return default
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            self._record_lookup(True)
+            return entry[1]
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+            self._record_size()
+
+    def invalidate(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+            self._record_size()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+            self._record_size()
+
+    def stats(self):
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self._entries)}
+
+    def _record_lookup(self, hit):
+        if self.name is not None:
+            record_cache_lookup(self.name, hit)
+
+    def _record_size(self):
+        if self.name is not None:
+            record_cache_size(self.name, len(self._entries))
@@ -0,0 +1,246 @@
+import logging
+import math
+import os
+import select
+import threading
+import time
+
+import psycopg2
+from flask import Response, current_app, request
+
+from .api_response import response_format
+from .annotation_table import get_listing_fields
+from .database_transactions import (
+    create_database_connection,
+    database_cursor,
+    execute_statement,
+    get_record_page_from_table,
+)
+from .metrics import record_query_error
+from .pagination import InvalidPageRequest, encode_cursor, decode_cursor
+from ..config import (
+    ANNOTATION_TABLE_NAME,
+    ANNOTATION_CHANGE_TABLE_NAME,
+    EMPLOYEE_TABLE_NAME,
+    CHANGE_FEED_CHANNEL,
+    CHANGE_FEED_BATCH_SIZE,
+    CHANGE_FEED_POLL_INTERVAL,
+    CHANGE_FEED_STREAM_DURATION,
+    CHANGE_FEED_MAX_WAIT,
+)
+
+# Feed of annotation inserts, updates and deletes, so clients load the annotations once and then only
+# receive what changed. Changes are read from the annotation_change log (see migrations/006_annotation_changes.sql)
+# and each one is sent with the annotation as it is now. The event id is the position of the change in the
+# log, so a client that reconnects with the last id it received gets every change it missed
+
+logger = logging.getLogger(__name__)
+
+# every transaction with a lower id has ended, changes logged by them can't be followed by earlier ones
+SNAPSHOT_XMIN = "pg_snapshot_xmin(pg_current_snapshot())::text::bigint"
+CHANGE_FIELDS = (
+    f"{ANNOTATION_CHANGE_TABLE_NAME}.transactionid AS changetransaction, {ANNOTATION_CHANGE_TABLE_NAME}.changeid,"
+    f" {ANNOTATION_CHANGE_TABLE_NAME}.annotationid AS changedannotationid, {ANNOTATION_CHANGE_TABLE_NAME}.operation"
+)
+# deleted annotations have no row, so their fields are null
+CHANGE_ANNOTATION_JOIN = (
+    f"LEFT JOIN {ANNOTATION_TABLE_NAME} ON {ANNOTATION_TABLE_NAME}.annotationid={ANNOTATION_CHANGE_TABLE_NAME}.annotationid"
+    f" LEFT JOIN {EMPLOYEE_TABLE_NAME} ON {ANNOTATION_TABLE_NAME}.username={EMPLOYEE_TABLE_NAME}.username"
+)
+
+
+# Wakes up the feeds of this process when annotations change. One LISTEN connection is shared by every
+# feed, which read the changes with pooled connections
+class ChangeListener:
+    def __init__(self):
+        self.condition = threading.Condition()
+        self.generation = 0
+        self.pid = os.getpid()
+        self.thread = threading.Thread(target=self.run, name="change-listener", daemon=True)
+
+    def start(self):
+        self.thread.start()
+
+    def run(self):
+        while True:
+            try:
+                db_connection = create_database_connection()
+                try:
+                    db_connection.autocommit = True
+                    with db_connection.cursor() as db_cursor:
+                        db_cursor.execute(f"LISTEN {CHANGE_FEED_CHANNEL};")
+                    self.notify()  # changes made while not listening
+                    while True:
+                        if select.select([db_connection], [], [], CHANGE_FEED_POLL_INTERVAL)[0]:
+                            db_connection.poll()
+                            if db_connection.notifies:
+                                db_connection.notifies.clear()
+                                self.notify()
+                finally:
+                    db_connection.close()
+            except (psycopg2.Error, OSError) as error:
+                logger.warning("Change feed listener lost its database connection: %s", error)
+                time.sleep(CHANGE_FEED_POLL_INTERVAL)
+
+    def notify(self):
+        with self.condition:
+            self.generation += 1
+            self.condition.notify_all()
+
+    # Waits at most timeout seconds for a notification newer than generation and returns the latest generation
+    def wait(self, generation, timeout):
+        with self.condition:
+            self.condition.wait_for(lambda: self.generation != generation, timeout)
+            return self.generation
+
+
+# One listener per process, started on first use so each gunicorn worker has its own
+change_listener = None
+change_listener_lock = threading.Lock()
+
+
+def get_change_listener():
+    global change_listener
+    with change_listener_lock:
+        if change_listener is None or change_listener.pid != os.getpid():
+            change_listener = ChangeListener()
+            change_listener.start()
+        return change_listener
+
+
+# Id below which every transaction has ended
+def get_snapshot_xmin():
+    with database_cursor("get_snapshot_xmin") as db_cursor:
+        execute_statement(db_cursor, f"SELECT {SNAPSHOT_XMIN};", [])
+        return db_cursor.fetchone()[0]
+
+
+# Position of the feed for clients that don't resume from an event id: changes from now on
+def get_current_position():
+    return {"transaction": get_snapshot_xmin(), "change": 0}
+
+
+def get_start_position():
+    last_event_id = request.headers.get("Last-Event-ID") or request.args.get("last-event-id")
+    if not last_event_id:
+        return get_current_position()
+    try:
+        position = decode_cursor(last_event_id)
+        return {"transaction": int(position["transaction"]), "change": int(position["change"])}
+    except (KeyError, TypeError, ValueError):
+        raise InvalidPageRequest("Invalid event id")
+
+
+# Reads the changes after position. The body holds the events and the position after the last one
+def read_changes(position, fields):
+    response = get_record_page_from_table(
+        ANNOTATION_CHANGE_TABLE_NAME,
+        f"{fields}, {CHANGE_FIELDS}",
+        f"{CHANGE_ANNOTATION_JOIN} WHERE ({ANNOTATION_CHANGE_TABLE_NAME}.transactionid, {ANNOTATION_CHANGE_TABLE_NAME}.changeid) > (%s, %s)"
+        f" AND {ANNOTATION_CHANGE_TABLE_NAME}.transactionid < {SNAPSHOT_XMIN}"
+        f" ORDER BY {ANNOTATION_CHANGE_TABLE_NAME}.transactionid, {ANNOTATION_CHANGE_TABLE_NAME}.changeid",
+        [position["transaction"], position["change"]],
+        CHANGE_FEED_BATCH_SIZE,
+        keyed=True,
+    )
+    if response["statusCode"] != 200:  # return error
+        return response
+
+    events = []
+    for record in response["body"]:
+        position = {"transaction": record.pop("changetransaction"), "change": record.pop("changeid")}
+        annotation_id = record.pop("changedannotationid")
+        operation = record.pop("operation")
+        events.append(
+            {
+                "id": encode_cursor(position),
+                "operation": operation,
+                "annotation-id": annotation_id,
+                "annotation": record if record["annotationid"] is not None else None,
+            }
+        )
+    return response_format(200, {"events": events, "position": position})
+
+
+# Events are encoded by the app's encoder, so annotations are formatted like /get_annotations records
+def format_event(event, json_provider):
+    return f"id: {event['id']}\nevent: {event['operation']}\ndata: {json_provider.dumps(event)}\n\n"
+
+
+# Server-Sent Events. Changes are sent as they are logged, with a comment line every poll interval so
+# proxies keep the connection open. The stream ends after CHANGE_FEED_STREAM_DURATION seconds and
+# EventSource reconnects with the id of the last event it received
+def stream_changes(position, fields):
+    listener = get_change_listener()
+    json_provider = current_app.json  # the stream is generated after the request context is gone
+
+    def generate_events():
+        current_position = position
+        deadline = time.monotonic() + CHANGE_FEED_STREAM_DURATION
+        yield ": connected\n\n"
+        while time.monotonic() < deadline:
+            generation = listener.generation
+            response = read_changes(current_position, fields)
+            if response["statusCode"] != 200:
+                yield f"event: error\ndata: {json_provider.dumps(response['body'])}\n\n"
+                return
+
+            for event in response["body"]["events"]:
+                yield format_event(event, json_provider)
+            current_position = response["body"]["position"]
+            if len(response["body"]["events"]) < CHANGE_FEED_BATCH_SIZE:
+                if listener.wait(generation, CHANGE_FEED_POLL_INTERVAL) == generation:
+                    yield ": heartbeat\n\n"
+
+    stream_response = Response(generate_events(), mimetype="text/event-stream")
+    stream_response.cache_control.no_cache = True
+    stream_response.headers["X-Accel-Buffering"] = "no"  # stops nginx from buffering the stream
+    return stream_response
+
+
+# Long poll for clients without EventSource. Returns as soon as there are changes, or with no events after
+# waiting wait seconds. The next poll passes last-event-id from the response
+def poll_changes(position, fields, wait):
+    listener = get_change_listener()
+    deadline = time.monotonic() + wait
+    while True:
+        generation = listener.generation
+        response = read_changes(position, fields)
+        if response["statusCode"] != 200:  # return error
+            return response
+
+        events = response["body"]["events"]
+        remaining = deadline - time.monotonic()
+        if events or remaining <= 0:
+            return response_format(
+                200, {"events": events, "last-event-id": encode_cursor(response["body"]["position"])}
+            )
+        listener.wait(generation, min(remaining, CHANGE_FEED_POLL_INTERVAL))
+
+
+# Sends the changes as Server-Sent Events to clients accepting text/event-stream (EventSource), and as a
+# long poll otherwise. Takes the fields query parameter of /get_annotations
+def get_annotation_changes():
+    try:
+        fields = get_listing_fields(request.args)
+    except ValueError as error:
+        return response_format(400, f"Invalid fields parameter. Error: {error}")
+    try:
+        wait = float(request.args.get("wait", CHANGE_FEED_MAX_WAIT))
+        if not math.isfinite(wait):  # a nan wait would never time out
+            raise ValueError(f"wait has to be a finite number of seconds, got {wait}")
+    except ValueError as error:
+        return response_format(400, f"Invalid wait parameter. Error: {error}")
+    wait = min(max(wait, 0), CHANGE_FEED_MAX_WAIT)
+
+    try:
+        position = get_start_position()
+    except InvalidPageRequest as error:
+        return response_format(400, f"Invalid last-event-id. Error: {error}")
+    except psycopg2.Error as error:
+        record_query_error("get_snapshot_xmin")
+        return response_format(500, f"Error with reading from the database: {error}")
+
+    if request.accept_mimetypes.best_match(["application/json", "text/event-stream"]) == "text/event-stream":
+        return stream_changes(position, fields)
+    return poll_changes(position, fields, wait)
@@ -0,0 +1,152 @@
+import os
+import threading
+import time
+
+import psycopg2
+from psycopg2.extensions import TRANSACTION_STATUS_IDLE
+from psycopg2.pool import PoolError
+
+
+class PoolTimeoutError(PoolError):
+    pass
+
+
+# Connection that remembers the statements prepared in its session, so they are only prepared once
+class PooledConnection(psycopg2.extensions.connection):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.prepared_statements = set()  # names of the statements prepared in this session
+
+
+# Thread safe pool of database connections shared by every request handled by the process.
+# Connections are created lazily up to max_size and handed out most recently used first.
+class ConnectionPool:
+    def __init__(
+        self,
+        connection_factory,
+        min_size=1,
+        max_size=10,
+        timeout=30,
+        health_check_interval=30,
+    ):
+        if min_size < 0 or max_size < 1 or min_size > max_size:
+            raise ValueError(
+                f"Invalid pool size. Min size: {min_size}, max size: {max_size}"
+            )
+
+        self.connection_factory = connection_factory
+        self.min_size = min_size
+        self.max_size = max_size
+        self.timeout = timeout
+        # connections idle for longer than this (in seconds) are pinged before being handed out
+        self.health_check_interval = health_check_interval
+        self.pid = os.getpid()  # used to detect the pool being inherited by a forked process
+
+        self._condition = threading.Condition()
+        self._idle_connections = []  # list of (connection, time it was returned)
+        self._open_connections = 0  # idle plus checked out connections
+        self._closed = False
+
+        for _ in range(min_size):
+            self._idle_connections.append((connection_factory(), time.monotonic()))
+            self._open_connections += 1
+
+    def get_connection(self):
+        deadline = time.monotonic() + self.timeout
+        while True:
+            connection, last_used = self._checkout(deadline)
+            if connection is None:
+                return self._create_connection()
+            if self._is_healthy(connection, last_used):
+                return connection
+            self._discard(connection)
+
+    def put_connection(self, connection):
+        if self._closed or os.getpid() != self.pid:
+            # connection belongs to a pool that is closed or owned by the parent process
+            self._discard(connection)
+            return
+
+        if not connection.closed and connection.info.transaction_status != TRANSACTION_STATUS_IDLE:
+            try:
+                connection.rollback()
+            except psycopg2.Error:
+                pass
+
+        if connection.closed or connection.info.transaction_status != TRANSACTION_STATUS_IDLE:
+            self._discard(connection)
+            return
+
+        with self._condition:
+            self._idle_connections.append((connection, time.monotonic()))
+            self._condition.notify()
+
+    def close(self):
+        with self._condition:
+            self._closed = True
+            idle_connections = self._idle_connections
+            self._idle_connections = []
+            self._open_connections -= len(idle_connections)
+            self._condition.notify_all()
+
+        for connection, _ in idle_connections:
+            self._close_connection(connection)
+
+    # Returns an idle connection or (None, None) when the caller has reserved a slot for a new one
+    def _checkout(self, deadline):
+        with self._condition:
+            while True:
+                if self._closed:
+                    raise PoolError("Connection pool is closed")
+                if self._idle_connections:
+                    return self._idle_connections.pop()
+                if self._open_connections < self.max_size:
+                    self._open_connections += 1
+                    return None, None
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise PoolTimeoutError(
+                        f"Timed out after {self.timeout} seconds waiting for a database connection"
+                    )
+                self._condition.wait(remaining)
+
+    def _create_connection(self):
+        try:
+            return self.connection_factory()
+        except Exception:
+            self._release_slot()
+            raise
+
+    def _is_healthy(self, connection, last_used):
+        if connection.closed:
+            return False
+        if time.monotonic() - last_used < self.health_check_interval:
+            return True
+
+        # connection has been idle long enough that the server or a proxy may have dropped it
+        try:
+            with connection.cursor() as db_cursor:
+                db_cursor.execute("SELECT 1;")
+            connection.rollback()
+            return True
+        except psycopg2.Error:
+            return False
+
+    def _discard(self, connection):
+        if os.getpid() == self.pid:
+            self._close_connection(connection)
+            self._release_slot()
+        # connections inherited from the parent process share its socket so they are never closed here
+
+    def _release_slot(self):
+        with self._condition:
+            self._open_connections -= 1
+            self._condition.notify()
+
+    @staticmethod
+    def _close_connection(connection):
+        try:
+            connection.close()
+        except psycopg2.Error:
+            pass
@@ -0,0 +1,194 @@
+import hashlib
+
+import psycopg2
+from flask import Response, request
+
+from .api_response import response_format
+from .database_transactions import (
+    database_cursor,
+    execute_statement,
+    get_record_field_from_table,
+    get_record_stream_from_table,
+)
+from .metrics import record_query_error
+from .query_builder import build_insert, build_select, build_update
+from ..config import CONTENT_TABLE_NAME, CONTENT_CHUNK_TABLE_NAME, CONTENT_CHUNK_SIZE
+
+# Large annotation data is stored once per distinct content (by SHA-256 hash) in chunks of CONTENT_CHUNK_SIZE
+# bytes, see migrations/003_annotation_content.sql. Annotations reference it by content id so listings and
+# edits don't move the whole document, and it is downloaded separately with Range support
+
+# chunks fetched per round trip when downloading
+CONTENT_STREAM_BATCH_SIZE = 4
+
+
+# Raised to roll back an upload whose content is already stored
+class DuplicateContent(Exception):
+    def __init__(self, content_id):
+        super().__init__(content_id)
+        self.content_id = content_id
+
+
+# Yields chunks of exactly chunk_size bytes, only the last one can be shorter. Streams can return fewer
+# bytes than asked for before the end (e.g. with chunked transfer encoding), so reads are repeated until
+# the chunk is full. Downloads compute the offset of a chunk from its index so a short chunk would
+# shift every byte after it
+def read_chunks(stream, chunk_size):
+    while True:
+        chunk = bytearray()
+        while len(chunk) < chunk_size:
+            data = stream.read(chunk_size - len(chunk))
+            if not data:
+                break
+            chunk += data
+        if chunk:
+            yield bytes(chunk)
+        if len(chunk) < chunk_size:
+            return
+
+
+def get_content_id_by_hash(db_cursor, content_hash):
+    execute_statement(
+        db_cursor, build_select(CONTENT_TABLE_NAME, "contentid", "WHERE hash = %s"), [content_hash]
+    )
+    record = db_cursor.fetchone()
+    return record[0] if record else None
+
+
+# Stores the content read from stream one chunk at a time, so the upload is never held in memory. Content
+# that is already stored isn't stored again, the id of the existing copy is returned instead
+def store_content(stream):
+    content_hash = None
+    try:
+        try:
+            with database_cursor("store_content") as db_cursor:
+                execute_statement(
+                    db_cursor,
+                    f"INSERT INTO {CONTENT_TABLE_NAME} DEFAULT VALUES RETURNING contentid;",
+                    [],
+                )
+                content_id = db_cursor.fetchone()[0]
+
+                digest = hashlib.sha256()
+                size = 0
+                chunk_sql = build_insert(CONTENT_CHUNK_TABLE_NAME, ("contentid", "chunkindex", "data"))
+                for chunk_index, chunk in enumerate(read_chunks(stream, CONTENT_CHUNK_SIZE)):
+                    digest.update(chunk)
+                    size += len(chunk)
+                    execute_statement(
+                        db_cursor, chunk_sql, [content_id, chunk_index, psycopg2.Binary(chunk)]
+                    )
+
+                content_hash = digest.hexdigest()
+                existing_content_id = get_content_id_by_hash(db_cursor, content_hash)
+                if existing_content_id is not None:
+                    raise DuplicateContent(existing_content_id)
+
+                execute_statement(
+                    db_cursor,
+                    build_update(CONTENT_TABLE_NAME, ("hash", "size"), "WHERE contentid = %s"),
+                    [content_hash, size, content_id],
+                )
+        except DuplicateContent as duplicate:
+            content_id = duplicate.content_id
+        except psycopg2.IntegrityError:
+            if content_hash is None:
+                raise
+            # the same content was stored by another request at the same time
+            with database_cursor("store_content") as db_cursor:
+                content_id = get_content_id_by_hash(db_cursor, content_hash)
+    except psycopg2.Error as error:
+        record_query_error("store_content")
+        return response_format(500, f"Error with adding to the database. Error: {error}")
+    except Exception as error:
+        record_query_error("store_content")
+        return response_format(500, f"Error: {error}")
+
+    return response_format(200, {"content-id": content_id, "hash": content_hash})
+
+
+def get_content_details(content_id):
+    return get_record_field_from_table(
+        CONTENT_TABLE_NAME,
+        "hash, size",
+        "WHERE contentid = %s AND hash IS NOT NULL",
+        [content_id],
+        keyed=True,
+    )
+
+
+# The request body is the content, it can be sent with chunked transfer encoding
+def upload_content():
+    return store_content(request.stream)
+
+
+# Returns the content, or the single byte range asked for in the Range header. Content never changes
+# so it is served with its hash as ETag and can be cached by clients
+def download_content():
+    try:
+        content_id = int(request.args["content-id"])
+    except KeyError:
+        return response_format(400, "Missing content-id query parameter")
+    except ValueError as error:
+        return response_format(400, f"Invalid content-id. Error: {error}")
+
+    details = get_content_details(content_id)
+    if details["statusCode"] != 200:  # return error
+        return details
+    content_hash = details["body"][0]["hash"]
+    size = details["body"][0]["size"]
+
+    if request.if_none_match.contains(content_hash):
+        response = Response(status=304)
+        response.set_etag(content_hash)
+        return response
+
+    content_range = None
+    # other units and multiple ranges aren't supported, the whole content is sent instead
+    if request.range and request.range.units == "bytes" and len(request.range.ranges) == 1:
+        content_range = request.range.range_for_length(size)
+        if content_range is None:
+            return Response(status=416, headers={"Content-Range": f"bytes */{size}"})
+    start, stop = content_range or (0, size)
+
+    if start < stop:
+        response = get_record_stream_from_table(
+            CONTENT_CHUNK_TABLE_NAME,
+            "chunkindex, data",
+            "WHERE contentid = %s AND chunkindex BETWEEN %s AND %s ORDER BY chunkindex",
+            [content_id, start // CONTENT_CHUNK_SIZE, (stop - 1) // CONTENT_CHUNK_SIZE],
+            CONTENT_STREAM_BATCH_SIZE,
+        )
+        if response["statusCode"] != 200:  # return error
+            return response
+        chunks = response["body"]
+    else:
+        chunks = None
+
+    def generate_bytes():
+        if chunks is None:
+            return
+        try:
+            for chunk in chunks:
+                offset = chunk["chunkindex"] * CONTENT_CHUNK_SIZE
+                data = bytes(chunk["data"])
+                yield data[max(start - offset, 0) : stop - offset]
+        finally:
+            chunks.close()
+
+    content_response = Response(
+        generate_bytes(),
+        status=206 if content_range else 200,
+        mimetype="application/octet-stream",
+    )
+    content_response.content_length = stop - start
+    content_response.accept_ranges = "bytes"
+    if content_range:
+        content_response.headers["Content-Range"] = f"bytes {start}-{stop - 1}/{size}"
+    content_response.set_etag(content_hash)
+    content_response.cache_control.max_age = 31536000
+    content_response.cache_control.immutable = True
+    if chunks is not None:
+        # makes sure the connection is released even if the body is never iterated
+        content_response.call_on_close(chunks.close)
+    return content_response
@@ -1,103 +1,405 @@
+import os
+import threading
+import time
+from contextlib import contextmanager
+from itertools import islice
+
 import psycopg2
-from ..config import DB_HOST, DB_NAME, DB_USER, DB_PASSWORD
+from psycopg2.extras import execute_values
+from ..config import (
+    DB_HOST,
+    DB_NAME,
+    DB_USER,
+    DB_PASSWORD,
+    DB_POOL_MIN_SIZE,
+    DB_POOL_MAX_SIZE,
+    DB_POOL_TIMEOUT,
+    DB_POOL_HEALTH_CHECK_INTERVAL,
+    DB_USE_PREPARED_STATEMENTS,
+    DB_MAX_PREPARED_STATEMENTS,
+)
 from .api_response import response_format
+from .connection_pool import ConnectionPool, PooledConnection
+from .metrics import time_query, record_query_rows, record_query_error
+from .query_profiler import record_statement
+from .query_builder import (
+    build_insert,
+    build_bulk_insert,
+    build_update,
+    build_select,
+    build_page_select,
+    build_delete,
+    convert_placeholders,
+    get_statement_name,
+)
 
+# One pool per process, created on first use so each gunicorn worker opens its own connections
+connection_pool = None
+connection_pool_lock = threading.Lock()
+# Pools inherited through fork share sockets with the parent process. They are kept referenced so the
+# connections are never garbage collected (which would close the parent's database sessions)
+inherited_connection_pools = []
 
-def get_database_connection():
-    db_connection = psycopg2.connect(
-        host=DB_HOST, database=DB_NAME, user=DB_USER, password=DB_PASSWORD
+
+def create_database_connection():
+    return psycopg2.connect(
+        host=DB_HOST,
+        database=DB_NAME,
+        user=DB_USER,
+        password=DB_PASSWORD,
+        connection_factory=PooledConnection,
     )
+
+
+def get_connection_pool():
+    global connection_pool
+    with connection_pool_lock:
+        if connection_pool is not None and connection_pool.pid != os.getpid():
+            inherited_connection_pools.append(connection_pool)
+            connection_pool = None
+
+        if connection_pool is None:
+            connection_pool = ConnectionPool(
+                create_database_connection,
+                min_size=DB_POOL_MIN_SIZE,
+                max_size=DB_POOL_MAX_SIZE,
+                timeout=DB_POOL_TIMEOUT,
+                health_check_interval=DB_POOL_HEALTH_CHECK_INTERVAL,
+            )
+        return connection_pool
+
+
+def close_connection_pool():
+    global connection_pool
+    with connection_pool_lock:
+        if connection_pool is not None and connection_pool.pid == os.getpid():
+            connection_pool.close()
+        connection_pool = None
+
+
+def reset_connection_pool_after_fork():
+    global connection_pool, connection_pool_lock
+    # the lock may have been held by another thread of the parent at the time of the fork
+    connection_pool_lock = threading.Lock()
+    if connection_pool is not None:
+        inherited_connection_pools.append(connection_pool)
+        connection_pool = None
+
+
+os.register_at_fork(after_in_child=reset_connection_pool_after_fork)
+
+
+def get_database_connection():
+    db_connection = get_connection_pool().get_connection()
     db_cursor = db_connection.cursor()
     return db_connection, db_cursor
 
 
+# Commits the transaction and hands the connection back to the pool
 def end_database_connection(db_connection, db_cursor):
-    db_cursor.close()
-    db_connection.commit()
-    db_connection.close()
+    try:
+        db_cursor.close()
+        db_connection.commit()
+    finally:
+        get_connection_pool().put_connection(db_connection)
 
 
-# Create
-def add_to_table(table_name, attributes, values):
+# Rolls back the transaction and hands the connection back to the pool
+def rollback_database_connection(db_connection, db_cursor):
     try:
-        db_connection, db_cursor = get_database_connection()
+        db_cursor.close()
+        db_connection.rollback()
+    except psycopg2.Error:
+        pass  # the pool discards connections that are left broken
+    finally:
+        get_connection_pool().put_connection(db_connection)
 
-        attribute_list = ", ".join(
-            attributes
-        )  # creates a string list for the SQL command
-        value_placeholder = "%s" + ", %s" * (
-            len(attributes) - 1
-        )  # create string placeholder for SQL command
-        sql = (
-            f"INSERT INTO {table_name} ({attribute_list}) VALUES ({value_placeholder});"
-        )
+
+# Runs a statement and records it with the query profiler
+def execute_statement(db_cursor, sql, values=None):
+    start = time.perf_counter()
+    run_statement(db_cursor, sql, values)
+    record_statement(db_cursor, sql, values, time.perf_counter() - start)
+
+
+# Statements with values are prepared on the connection the first time they are seen and run with
+# EXECUTE afterwards, so PostgreSQL doesn't parse and plan them again
+def run_statement(db_cursor, sql, values):
+    db_connection = db_cursor.connection
+    if not DB_USE_PREPARED_STATEMENTS or values is None:
         db_cursor.execute(sql, values)
+        return
 
+    statement_name = get_statement_name(sql)
+    if statement_name not in db_connection.prepared_statements:
+        if len(db_connection.prepared_statements) >= DB_MAX_PREPARED_STATEMENTS:
+            db_cursor.execute(sql, values)  # limit reached, run it unprepared
+            return
+
+        db_cursor.execute(f"PREPARE {statement_name} AS {convert_placeholders(sql)}")
+        # prepared statements outlive the transaction, even when it is rolled back
+        db_connection.prepared_statements.add(statement_name)
+
+    if values:
+        placeholders = ", ".join(["%s"] * len(values))
+        db_cursor.execute(f"EXECUTE {statement_name} ({placeholders});", values)
+    else:
+        db_cursor.execute(f"EXECUTE {statement_name};")
+
+
+# Runs the statements issued in the with block as one transaction on a pooled connection. Getting the
+# connection and committing are timed under operation
+@contextmanager
+def database_cursor(operation):
+    with time_query(operation, "connect"):
+        db_connection, db_cursor = get_database_connection()
+    try:
+        yield db_cursor
+    except BaseException:
+        rollback_database_connection(db_connection, db_cursor)
+        raise
+    with time_query(operation, "commit"):
         end_database_connection(db_connection, db_cursor)
+
+
+# Create
+def add_to_table(table_name, attributes, values):
+    try:
+        sql = build_insert(table_name, tuple(attributes))
+        with database_cursor("add_to_table") as db_cursor:
+            with time_query("add_to_table", "execute"):
+                execute_statement(db_cursor, sql, values)
     except psycopg2.Error as error:
+        record_query_error("add_to_table")
         return response_format(
             500, f"Error with adding to the database. Error: {error}"
         )
     except Exception as error:
+        record_query_error("add_to_table")
         return response_format(500, f"Error: {error}")
     else:
         return response_format(200, "Data successfully added")
 
 
-# Update. Condition is in the form of 'WHERE something = something'
-def update_field(table_name, field, value, condition):
+# Create many records in one transaction. rows is an iterable of value lists, it is read and inserted
+# chunk_size rows at a time so it can be a generator over a large upload. If anything fails nothing is
+# added. Returns the returning field of every added record
+def add_many_to_table(table_name, attributes, rows, returning, chunk_size):
     try:
-        db_connection, db_cursor = get_database_connection()
+        sql = build_bulk_insert(table_name, tuple(attributes), returning)
 
-        sql = f"UPDATE {table_name} SET {field} = '{value}' {condition};"
-        db_cursor.execute(sql)
+        database_output = []
+        rows = iter(rows)
+        with database_cursor("add_many_to_table") as db_cursor:
+            while chunk := list(islice(rows, chunk_size)):
+                start = time.perf_counter()
+                with time_query("add_many_to_table", "execute"):
+                    database_output += execute_values(
+                        db_cursor, sql, chunk, page_size=chunk_size, fetch=True
+                    )
+                # execute_values fills in the rows itself so the statement can't be planned on its own
+                record_statement(
+                    db_cursor, sql, None, time.perf_counter() - start, explain=False
+                )
+        record_query_rows("add_many_to_table", database_output)
+    except psycopg2.Error as error:
+        record_query_error("add_many_to_table")
+        return response_format(
+            500, f"Error with adding to the database. Error: {error}"
+        )
+    except Exception as error:
+        record_query_error("add_many_to_table")
+        return response_format(500, f"Error: {error}")
+    else:
+        return response_format(200, database_output)
 
-        end_database_connection(db_connection, db_cursor)
+
+# Update. Condition is in the form of 'WHERE something = something'
+def update_field(table_name, field, value, condition):
+    try:
+        sql = build_update(table_name, (field,), condition)
+        with database_cursor("update_field") as db_cursor:
+            with time_query("update_field", "execute"):
+                execute_statement(db_cursor, sql, [value])
 
         return response_format(200, "Data successfully updated")
     except psycopg2.Error as error:
+        record_query_error("update_field")
         return response_format(
             500, f"Error with database when updating record. Error: {error}"
         )
     except Exception as error:
+        record_query_error("update_field")
         return response_format(500, f"Error: {error}")
 
 
-# Read
-def get_record_field_from_table(table_name, field, condition):
+# Update several fields in one statement and transaction. field_values maps each field to its new value.
+# Condition is in the form of 'WHERE something = %s' with condition_values filling in the placeholders.
+# When returning is given (e.g. 'annotationid') the updated rows are returned, which allows a
+# compare-and-set style update where an empty list means the condition did not match
+def update_fields(
+    table_name, field_values, condition, condition_values=(), returning=None
+):
     try:
-        db_connection, db_cursor = get_database_connection()
+        sql = build_update(table_name, tuple(field_values), condition, returning)
+        values = list(field_values.values()) + list(condition_values)
 
-        sql = f"SELECT {field} FROM {table_name} {condition};"
-        db_cursor.execute(sql)
-        database_output = db_cursor.fetchall()
+        with database_cursor("update_fields") as db_cursor:
+            with time_query("update_fields", "execute"):
+                execute_statement(db_cursor, sql, values)
+            with time_query("update_fields", "fetch"):
+                database_output = db_cursor.fetchall() if returning else None
+
+        if returning is None:
+            return response_format(200, "Data successfully updated")
+        record_query_rows("update_fields", database_output)
+        return response_format(200, database_output)
+    except psycopg2.Error as error:
+        record_query_error("update_fields")
+        return response_format(
+            500, f"Error with database when updating record. Error: {error}"
+        )
+    except Exception as error:
+        record_query_error("update_fields")
+        return response_format(500, f"Error: {error}")
 
-        end_database_connection(db_connection, db_cursor)
 
-        if not database_output:
+# Turns records into dicts keyed by column name. The names are read from the cursor description once
+def get_keyed_records(db_cursor, records):
+    column_names = [column[0] for column in db_cursor.description]
+    return [dict(zip(column_names, record)) for record in records]
+
+
+# Read. Condition can contain %s placeholders that are filled in by values. With keyed the records are
+# dicts keyed by column name instead of tuples. Finding no records is an error unless allow_empty is set,
+# listings set it as an empty list is a normal result for them
+def get_record_field_from_table(table_name, field, condition, values=None, keyed=False, allow_empty=False):
+    try:
+        sql = build_select(table_name, field, condition)
+        with database_cursor("get_record_field_from_table") as db_cursor:
+            with time_query("get_record_field_from_table", "execute"):
+                execute_statement(db_cursor, sql, values)
+            with time_query("get_record_field_from_table", "fetch"):
+                database_output = db_cursor.fetchall()
+                if keyed:
+                    database_output = get_keyed_records(db_cursor, database_output)
+
+        record_query_rows("get_record_field_from_table", database_output)
+        if not database_output and not allow_empty:
             return response_format(500, "Error: no records found")
 
         return response_format(200, database_output)
 
     except psycopg2.Error as error:
+        record_query_error("get_record_field_from_table")
         return response_format(500, f"Error with reading from the database: {error}")
     except Exception as error:
+        record_query_error("get_record_field_from_table")
         return response_format(500, f"Error: {error}")
 
 
-# Delete. Condition is in the form of 'WHERE something = something' and helps identify what records is being deleted
-def delete_record(table_name, condition):
+# Read a bounded page of records. Condition can contain %s placeholders that are filled in by values
+# and should order the records. At most page_size records are fetched so only one page is held in memory.
+# With keyed the records are dicts keyed by column name instead of tuples
+def get_record_page_from_table(table_name, field, condition, values, page_size, keyed=False):
     try:
-        db_connection, db_cursor = get_database_connection()
+        sql = build_page_select(table_name, field, condition)
+        with database_cursor("get_record_page_from_table") as db_cursor:
+            with time_query("get_record_page_from_table", "execute"):
+                execute_statement(db_cursor, sql, list(values) + [page_size])
+            with time_query("get_record_page_from_table", "fetch"):
+                database_output = db_cursor.fetchmany(page_size)
+                if keyed:
+                    database_output = get_keyed_records(db_cursor, database_output)
 
-        sql = f"DELETE FROM {table_name} {condition};"
-        db_cursor.execute(sql)
+        record_query_rows("get_record_page_from_table", database_output)
+        return response_format(200, database_output)
 
-        end_database_connection(db_connection, db_cursor)
+    except psycopg2.Error as error:
+        record_query_error("get_record_page_from_table")
+        return response_format(500, f"Error with reading from the database: {error}")
+    except Exception as error:
+        record_query_error("get_record_page_from_table")
+        return response_format(500, f"Error: {error}")
+
+
+# Iterates over the records of a server side cursor as dicts keyed by column name. The transaction is
+# ended and the connection returned to the pool once the records run out or the stream is closed
+class RecordStream:
+    def __init__(self, db_connection, db_cursor):
+        self.db_connection = db_connection
+        self.db_cursor = db_cursor
+        self.column_names = None
+        self.closed = False
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self.closed:
+            raise StopIteration
+        try:
+            record = next(self.db_cursor)
+        except BaseException:  # includes StopIteration when there are no records left
+            self.close()
+            raise
+
+        if self.column_names is None:
+            # the description is only available once the first batch has been fetched
+            self.column_names = [column[0] for column in self.db_cursor.description]
+        return dict(zip(self.column_names, record))
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            rollback_database_connection(self.db_connection, self.db_cursor)
+
+
+# Read records through a server side (named) cursor that fetches batch_size records per round trip, so
+# memory use doesn't depend on the number of records. The body of the response is a RecordStream
+def get_record_stream_from_table(table_name, field, condition, values, batch_size):
+    try:
+        sql = build_select(table_name, field, condition)
+        with time_query("get_record_stream_from_table", "connect"):
+            db_connection = get_connection_pool().get_connection()
+        try:
+            db_cursor = db_connection.cursor(name="record_stream")
+            db_cursor.itersize = batch_size
+            with time_query("get_record_stream_from_table", "execute"):
+                db_cursor.execute(sql, values)
+        except BaseException:
+            get_connection_pool().put_connection(db_connection)
+            raise
+
+        return response_format(200, RecordStream(db_connection, db_cursor))
 
-        return response_format(200, "Successfully deleted record")
+    except psycopg2.Error as error:
+        record_query_error("get_record_stream_from_table")
+        return response_format(500, f"Error with reading from the database: {error}")
+    except Exception as error:
+        record_query_error("get_record_stream_from_table")
+        return response_format(500, f"Error: {error}")
+
+
+# Delete. Condition is in the form of 'WHERE something = something' and helps identify what records is being deleted.
+# Condition can contain %s placeholders that are filled in by values. When returning is given the deleted rows are returned
+def delete_record(table_name, condition, values=None, returning=None):
+    try:
+        sql = build_delete(table_name, condition, returning)
+        with database_cursor("delete_record") as db_cursor:
+            with time_query("delete_record", "execute"):
+                execute_statement(db_cursor, sql, values)
+            with time_query("delete_record", "fetch"):
+                database_output = db_cursor.fetchall() if returning else None
+
+        if returning is None:
+            return response_format(200, "Successfully deleted record")
+        record_query_rows("delete_record", database_output)
+        return response_format(200, database_output)
 
     except psycopg2.Error as error:
+        record_query_error("delete_record")
         return response_format(500, f"Error with deleting from the database: {error}")
     except Exception as error:
+        record_query_error("delete_record")
         return response_format(500, f"Error: {error}")
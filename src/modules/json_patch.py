@@ -0,0 +1,132 @@
+import copy
+
+# Applies JSON Patch (RFC 6902) documents, e.g.
+#   [{"op": "replace", "path": "/annotation-status", "value": "done"},
+#    {"op": "add", "path": "/annotated-data/labels/-", "value": {"start": 4, "end": 9}}]
+# Paths are JSON Pointers (RFC 6901) where ~1 stands for / and ~0 for ~ in a key
+
+
+class JsonPatchError(ValueError):
+    pass
+
+
+def parse_pointer(pointer):
+    if not isinstance(pointer, str) or (pointer and not pointer.startswith("/")):
+        raise JsonPatchError(f"Invalid path '{pointer}'")
+    if not pointer:
+        return []
+    return [token.replace("~1", "/").replace("~0", "~") for token in pointer[1:].split("/")]
+
+
+def get_list_index(container, token, pointer, allow_end=False):
+    if allow_end and token == "-":
+        return len(container)
+    if not token.isdigit() or (token != "0" and token.startswith("0")):
+        raise JsonPatchError(f"Invalid list index '{token}' in path '{pointer}'")
+    index = int(token)
+    if index > len(container) or (index == len(container) and not allow_end):
+        raise JsonPatchError(f"List index '{token}' out of range in path '{pointer}'")
+    return index
+
+
+# Returns the container holding the last token of the pointer and that token
+def get_parent(document, tokens, pointer):
+    container = document
+    for token in tokens[:-1]:
+        if isinstance(container, dict) and token in container:
+            container = container[token]
+        elif isinstance(container, list):
+            container = container[get_list_index(container, token, pointer)]
+        else:
+            raise JsonPatchError(f"Path '{pointer}' doesn't exist")
+    return container, tokens[-1]
+
+
+def get_value(document, pointer):
+    tokens = parse_pointer(pointer)
+    if not tokens:
+        return document
+    container, token = get_parent(document, tokens, pointer)
+    if isinstance(container, dict) and token in container:
+        return container[token]
+    if isinstance(container, list):
+        return container[get_list_index(container, token, pointer)]
+    raise JsonPatchError(f"Path '{pointer}' doesn't exist")
+
+
+def add_value(document, pointer, value):
+    tokens = parse_pointer(pointer)
+    if not tokens:
+        return value
+    container, token = get_parent(document, tokens, pointer)
+    if isinstance(container, dict):
+        container[token] = value
+    elif isinstance(container, list):
+        container.insert(get_list_index(container, token, pointer, allow_end=True), value)
+    else:
+        raise JsonPatchError(f"Path '{pointer}' doesn't exist")
+    return document
+
+
+def replace_value(document, pointer, value):
+    tokens = parse_pointer(pointer)
+    if not tokens:
+        return value
+    container, token = get_parent(document, tokens, pointer)
+    if isinstance(container, dict) and token in container:
+        container[token] = value
+    elif isinstance(container, list):
+        container[get_list_index(container, token, pointer)] = value
+    else:
+        raise JsonPatchError(f"Path '{pointer}' doesn't exist")
+    return document
+
+
+def remove_value(document, pointer):
+    tokens = parse_pointer(pointer)
+    if not tokens:
+        raise JsonPatchError("The whole document can't be removed")
+    container, token = get_parent(document, tokens, pointer)
+    if isinstance(container, dict) and token in container:
+        return container.pop(token)
+    if isinstance(container, list):
+        return container.pop(get_list_index(container, token, pointer))
+    raise JsonPatchError(f"Path '{pointer}' doesn't exist")
+
+
+# Returns the patched copy of document, document itself is left unchanged. Raises JsonPatchError when
+# an operation is invalid or a test operation fails, in which case none of the operations apply
+def apply_patch(document, operations):
+    if not isinstance(operations, list):
+        raise JsonPatchError("A patch must be a list of operations")
+
+    document = copy.deepcopy(document)
+    for operation in operations:
+        try:
+            op = operation["op"]
+            path = operation["path"]
+            if op == "add":
+                document = add_value(document, path, copy.deepcopy(operation["value"]))
+            elif op == "remove":
+                remove_value(document, path)
+            elif op == "replace":
+                document = replace_value(document, path, copy.deepcopy(operation["value"]))
+            elif op == "move":
+                from_path = operation["from"]
+                if path != from_path and path.startswith(from_path + "/"):
+                    raise JsonPatchError(f"Can't move '{from_path}' into itself")
+                value = get_value(document, from_path)
+                if parse_pointer(from_path):
+                    remove_value(document, from_path)
+                document = add_value(document, path, value)
+            elif op == "copy":
+                value = copy.deepcopy(get_value(document, operation["from"]))
+                document = add_value(document, path, value)
+            elif op == "test":
+                if get_value(document, path) != operation["value"]:
+                    raise JsonPatchError(f"Test of '{path}' failed")
+            else:
+                raise JsonPatchError(f"Unknown operation '{op}'")
+        except (KeyError, TypeError) as error:
+            raise JsonPatchError(f"Invalid operation {operation}. Error related to: {error}")
+    return document
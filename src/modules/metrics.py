@@ -0,0 +1,145 @@
+import os
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+from flask import Response, g, request
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+# Metrics are aggregated in process by prometheus_client. Under gunicorn set PROMETHEUS_MULTIPROC_DIR to an
+# empty directory shared by the workers, each worker then writes its values there and /metrics adds them up
+# (gunicorn.conf.py cleans up after workers that exit)
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "Time taken to handle a request",
+    ["route", "method", "status"],
+)
+RESPONSE_SIZE = Histogram(
+    "http_response_size_bytes",
+    "Size of the response body",
+    ["route"],
+    buckets=[100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000],
+)
+REQUEST_ERRORS = Counter(
+    "http_request_errors_total",
+    "Requests answered with an error status",
+    ["route", "status"],
+)
+QUERY_LATENCY = Histogram(
+    "db_query_duration_seconds",
+    "Time taken by each phase (connect, execute, fetch, commit) of a database operation",
+    ["operation", "phase"],
+    buckets=[0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5],
+)
+QUERY_ROWS = Histogram(
+    "db_query_rows",
+    "Rows returned by a database operation",
+    ["operation"],
+    buckets=[0, 1, 10, 100, 1_000, 10_000, 100_000],
+)
+QUERY_ERRORS = Counter(
+    "db_query_errors_total",
+    "Database operations that failed",
+    ["operation"],
+)
+
+# Lookups and entries of the named in-process caches (see cache.py). The entries of each worker are added up
+CACHE_LOOKUPS = Counter(
+    "cache_lookups_total",
+    "Lookups in an in-process cache, by result (hit or miss)",
+    ["cache", "result"],
+)
+CACHE_ENTRIES = Gauge(
+    "cache_entries",
+    "Entries held by an in-process cache",
+    ["cache"],
+    multiprocess_mode="livesum",
+)
+
+
+@contextmanager
+def time_query(operation, phase):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        QUERY_LATENCY.labels(operation, phase).observe(time.perf_counter() - start)
+
+
+def record_query_rows(operation, rows):
+    QUERY_ROWS.labels(operation).observe(len(rows) if rows else 0)
+
+
+def record_query_error(operation):
+    QUERY_ERRORS.labels(operation).inc()
+
+
+def record_cache_lookup(cache_name, hit):
+    CACHE_LOOKUPS.labels(cache_name, "hit" if hit else "miss").inc()
+
+
+def record_cache_size(cache_name, size):
+    CACHE_ENTRIES.labels(cache_name).set(size)
+
+
+# The handlers answer errors with a 200 response whose body holds the status code, so the status is
+# taken from the body before it is encoded
+def record_route_status(view_function):
+    @wraps(view_function)
+    def wrapper(*args, **kwargs):
+        response = view_function(*args, **kwargs)
+        if isinstance(response, dict) and "statusCode" in response:
+            g.response_status = response["statusCode"]
+        return response
+
+    return wrapper
+
+
+def start_request_timer():
+    g.request_start = time.perf_counter()
+
+
+def record_request(response):
+    if "request_start" not in g:
+        return response
+
+    route = request.url_rule.rule if request.url_rule else "unmatched"
+    status = str(g.get("response_status", response.status_code))
+    REQUEST_LATENCY.labels(route, request.method, status).observe(
+        time.perf_counter() - g.request_start
+    )
+    if not response.is_streamed:  # streamed bodies aren't read here so the size is unknown
+        RESPONSE_SIZE.labels(route).observe(response.calculate_content_length() or 0)
+    if int(status) >= 400:
+        REQUEST_ERRORS.labels(route, status).inc()
+    return response
+
+
+def get_metrics():
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return Response(generate_latest(registry), content_type=CONTENT_TYPE_LATEST)
+
+
+# Times every route registered so far and serves the metrics on /metrics
+def init_metrics(app):
+    for endpoint, view_function in app.view_functions.items():
+        if endpoint != "static":
+            app.view_functions[endpoint] = record_route_status(view_function)
+
+    app.before_request(start_request_timer)
+    app.after_request(record_request)
+    app.add_url_rule("/metrics", "metrics", get_metrics, methods=["GET"])
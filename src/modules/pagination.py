@@ -0,0 +1,35 @@
+import base64
+import binascii
+import json
+
+from ..config import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+
+
+class InvalidPageRequest(ValueError):
+    pass
+
+
+# Reads the page size from the query parameters, capped at MAX_PAGE_SIZE
+def get_page_size(args):
+    try:
+        page_size = int(args.get("page-size", DEFAULT_PAGE_SIZE))
+    except ValueError:
+        raise InvalidPageRequest("Page size must be a whole number")
+    if page_size < 1:
+        raise InvalidPageRequest("Page size must be at least 1")
+    return min(page_size, MAX_PAGE_SIZE)
+
+
+# Cursors are opaque to clients, they hold the keyset position of the last record on the page
+def encode_cursor(position):
+    return base64.urlsafe_b64encode(json.dumps(position).encode()).decode()
+
+
+def decode_cursor(cursor):
+    try:
+        position = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise InvalidPageRequest("Invalid cursor")
+    if not isinstance(position, dict):
+        raise InvalidPageRequest("Invalid cursor")
+    return position
@@ -0,0 +1,66 @@
+import hashlib
+import re
+from functools import lru_cache
+
+# Builds the SQL text of the statements run by the data layer. Statements are cached per table, columns
+# and condition so hot paths don't rebuild them, and values are always passed separately as %s
+# placeholders so the same text can be prepared once per connection and executed many times
+
+STATEMENT_CACHE_SIZE = 512
+
+
+# Create. attributes is a tuple of field names
+@lru_cache(maxsize=STATEMENT_CACHE_SIZE)
+def build_insert(table_name, attributes):
+    attribute_list = ", ".join(attributes)  # creates a string list for the SQL command
+    value_placeholder = ", ".join(
+        ["%s"] * len(attributes)
+    )  # create string placeholder for SQL command
+    return f"INSERT INTO {table_name} ({attribute_list}) VALUES ({value_placeholder});"
+
+
+# Create many records with psycopg2.extras.execute_values, which fills in the single %s
+@lru_cache(maxsize=STATEMENT_CACHE_SIZE)
+def build_bulk_insert(table_name, attributes, returning):
+    attribute_list = ", ".join(attributes)
+    return f"INSERT INTO {table_name} ({attribute_list}) VALUES %s RETURNING {returning};"
+
+
+# Update. fields is a tuple of field names that are each set from a placeholder
+@lru_cache(maxsize=STATEMENT_CACHE_SIZE)
+def build_update(table_name, fields, condition, returning=None):
+    set_list = ", ".join(f"{field} = %s" for field in fields)
+    returning_clause = f" RETURNING {returning}" if returning else ""
+    return f"UPDATE {table_name} SET {set_list} {condition}{returning_clause};"
+
+
+# Read
+@lru_cache(maxsize=STATEMENT_CACHE_SIZE)
+def build_select(table_name, field, condition):
+    return f"SELECT {field} FROM {table_name} {condition};"
+
+
+# Read a bounded page, the last placeholder is the page size
+@lru_cache(maxsize=STATEMENT_CACHE_SIZE)
+def build_page_select(table_name, field, condition):
+    return f"SELECT {field} FROM {table_name} {condition} LIMIT %s;"
+
+
+# Delete
+@lru_cache(maxsize=STATEMENT_CACHE_SIZE)
+def build_delete(table_name, condition, returning=None):
+    returning_clause = f" RETURNING {returning}" if returning else ""
+    return f"DELETE FROM {table_name} {condition}{returning_clause};"
+
+
+# Server side prepared statements use numbered $1, $2 placeholders instead of %s
+@lru_cache(maxsize=STATEMENT_CACHE_SIZE)
+def convert_placeholders(sql):
+    placeholder_numbers = iter(range(1, sql.count("%s") + 1))
+    return re.sub("%s", lambda _: f"${next(placeholder_numbers)}", sql)
+
+
+# Name used to prepare the statement, the same SQL text always gets the same name
+@lru_cache(maxsize=STATEMENT_CACHE_SIZE)
+def get_statement_name(sql):
+    return f"statement_{hashlib.sha1(sql.encode()).hexdigest()[:24]}"
@@ -0,0 +1,83 @@
+import json
+import logging
+
+import psycopg2
+from flask import g, has_request_context, request
+
+from ..config import SLOW_QUERY_THRESHOLD, QUERY_PROFILING
+
+logger = logging.getLogger(__name__)
+
+PROFILE_REQUEST_HEADER = "X-Query-Profile"
+TRACE_RESPONSE_HEADER = "X-Query-Trace"
+
+
+def is_request_profiled():
+    if QUERY_PROFILING == "all":
+        return True
+    return (
+        QUERY_PROFILING == "header"
+        and request.headers.get(PROFILE_REQUEST_HEADER, "").lower() == "true"
+    )
+
+
+# Called by database_transactions after each statement it runs. Adds the statement to the trace of a
+# profiled request and logs it with its plan when it is slow
+def record_statement(db_cursor, sql, values, duration, explain=True):
+    if has_request_context() and g.get("query_trace") is not None:
+        g.query_trace.append(
+            {
+                "sql": sql,
+                "duration-ms": round(duration * 1000, 3),
+                "rows": get_row_count(db_cursor),
+            }
+        )
+
+    if duration >= SLOW_QUERY_THRESHOLD:
+        rows = get_row_count(db_cursor)
+        plan = get_query_plan(db_cursor, sql, values) if explain else None
+        logger.warning(
+            "Slow query took %.3fs and returned %d rows: %s\n%s",
+            duration,
+            rows,
+            sql,
+            plan or "Plan unavailable",
+        )
+
+
+def get_row_count(db_cursor):
+    return max(db_cursor.rowcount, 0)  # -1 when the statement doesn't report a row count
+
+
+# Plans the statement on a separate cursor in the same transaction, so the results of db_cursor are kept.
+# The savepoint stops a failed EXPLAIN from aborting the transaction
+def get_query_plan(db_cursor, sql, values):
+    try:
+        with db_cursor.connection.cursor() as explain_cursor:
+            explain_cursor.execute("SAVEPOINT query_plan;")
+            try:
+                explain_cursor.execute(f"EXPLAIN {sql}", values)
+                plan = "\n".join(row[0] for row in explain_cursor.fetchall())
+            except psycopg2.Error:
+                explain_cursor.execute("ROLLBACK TO SAVEPOINT query_plan;")
+                return None
+            explain_cursor.execute("RELEASE SAVEPOINT query_plan;")
+            return plan
+    except psycopg2.Error:
+        return None
+
+
+def start_query_trace():
+    g.query_trace = [] if is_request_profiled() else None
+
+
+def add_query_trace_header(response):
+    query_trace = g.get("query_trace")
+    if query_trace is not None:
+        response.headers[TRACE_RESPONSE_HEADER] = json.dumps(query_trace)
+    return response
+
+
+def init_query_profiler(app):
+    app.before_request(start_query_trace)
+    app.after_request(add_query_trace_header)
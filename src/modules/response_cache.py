@@ -0,0 +1,54 @@
+import hashlib
+
+from flask import Response, current_app, request
+
+from .cache import TTLCache
+from .database_transactions import get_record_field_from_table
+from ..config import (
+    TABLE_VERSION_TABLE_NAME,
+    RESPONSE_CACHE_SIZE,
+    RESPONSE_CACHE_TTL,
+    RESPONSE_CACHE_MAX_BODY_SIZE,
+)
+
+# encoded response bodies keyed by their ETag
+response_cache = TTLCache(RESPONSE_CACHE_SIZE, RESPONSE_CACHE_TTL, name="response")
+
+
+# Versions are bumped by a trigger on every write to the table (see migrations/002_table_versions.sql)
+# so they are shared by all workers. Writes bump one of several rows per table, which are added up here
+def get_table_versions(table_names):
+    return get_record_field_from_table(
+        TABLE_VERSION_TABLE_NAME,
+        "tablename, sum(version)::bigint",
+        "WHERE tablename = ANY(%s) GROUP BY tablename ORDER BY tablename",
+        [list(table_names)],
+    )
+
+
+# Serves the response built by build_response, which reads from table_names. The ETag is made from the
+# request and the table versions so unchanged polls get a 304, or the encoded body from a previous request
+def get_cached_response(table_names, build_response):
+    versions = get_table_versions(table_names)
+    if versions["statusCode"] != 200:
+        return build_response()  # without versions there is no way to tell if a cached body is current
+
+    query = sorted(request.args.items(multi=True))
+    etag = hashlib.sha1(f"{request.path}|{query}|{versions['body']}".encode()).hexdigest()
+
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    else:
+        body = response_cache.get(etag)
+        if body is None:
+            body_response = build_response()
+            if body_response["statusCode"] != 200:  # errors aren't cached
+                return body_response
+            body = current_app.json.dumps_bytes(body_response)
+            if len(body) <= RESPONSE_CACHE_MAX_BODY_SIZE:  # e.g. unpaged listings are rebuilt every time
+                response_cache.set(etag, body)
+        response = Response(body, mimetype="application/json")
+
+    response.set_etag(etag)
+    response.cache_control.no_cache = True  # browsers have to revalidate with the ETag
+    return response
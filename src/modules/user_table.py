@@ -1,7 +1,17 @@
 from flask import request
 from .database_transactions import add_to_table, get_record_field_from_table
-from ..config import EMPLOYEE_TABLE_NAME, EMPLOYEE_TABLE_ATTRIBUTES
+from ..config import (
+    EMPLOYEE_TABLE_NAME,
+    EMPLOYEE_TABLE_ATTRIBUTES,
+    EMPLOYEE_CACHE_SIZE,
+    EMPLOYEE_CACHE_TTL,
+)
 from .api_response import response_format
+from .cache import TTLCache
+
+# employee fields kept in the cache, the password is always read from the database
+EMPLOYEE_CACHE_FIELDS = ["admin", "team", "firstname", "lastname"]
+employee_cache = TTLCache(EMPLOYEE_CACHE_SIZE, EMPLOYEE_CACHE_TTL, name="employee")
 
 
 def add_user():
@@ -21,6 +31,7 @@ def add_user():
         response = add_to_table(
             EMPLOYEE_TABLE_NAME, EMPLOYEE_TABLE_ATTRIBUTES, attribute_value_list
         )
+        employee_cache.invalidate(request_data["user-name"])
         return response
 
     except KeyError as error:
@@ -40,7 +51,7 @@ def get_user_password():
 
         # Get password by running query then return response
         database_output = get_record_field_from_table(
-            EMPLOYEE_TABLE_NAME, "password", f"WHERE username = '{username}'"
+            EMPLOYEE_TABLE_NAME, "password", "WHERE username = %s", [username]
         )
         return database_output
     except KeyError:
@@ -49,6 +60,26 @@ def get_user_password():
         return response_format(400, f"Error: {error}")
 
 
+# Read through the cache for the employee details in EMPLOYEE_CACHE_FIELDS, returned as a dict
+def get_employee_details(username):
+    employee_details = employee_cache.get(username)
+    if employee_details is not None:
+        return response_format(200, employee_details)
+
+    database_output = get_record_field_from_table(
+        EMPLOYEE_TABLE_NAME,
+        ", ".join(EMPLOYEE_CACHE_FIELDS),
+        "WHERE username = %s",
+        [username],
+    )
+    if database_output["statusCode"] != 200:  # return error, missing users aren't cached
+        return database_output
+
+    employee_details = dict(zip(EMPLOYEE_CACHE_FIELDS, database_output["body"][0]))
+    employee_cache.set(username, employee_details)
+    return response_format(200, employee_details)
+
+
 def get_users():
     return get_record_field_from_table(EMPLOYEE_TABLE_NAME, "username", "")
 
@@ -61,11 +92,12 @@ def get_user_access_level():
         username = request_data["user-name"]
 
         # Get user admin field value
-        database_output = get_record_field_from_table(
-            EMPLOYEE_TABLE_NAME, "admin", f"WHERE username = '{username}'"
-        )
+        employee_details = get_employee_details(username)
+        if employee_details["statusCode"] != 200:  # return error
+            return employee_details
 
-        return database_output
+        # same format as reading the admin field from the database
+        return response_format(200, [(employee_details["body"]["admin"],)])
     except KeyError:
         return response_format(400, f"Missing user name in request")
     except Exception as error:
@@ -0,0 +1,120 @@
+import pytest
+import psycopg2
+from unittest.mock import patch
+from src.modules.annotation_search import get_search_query, format_snippet
+from src.modules.pagination import encode_cursor
+from src.app import app
+
+
+class TestGetSearchQuery:
+    @pytest.mark.parametrize(
+        "text, expected_query",
+        [
+            ("cat", "cat"),
+            ("anno* cat", "anno:* & cat"),
+            ("cat's & (dog | !car)", "cat & s & dog & car"),
+        ],
+    )
+    def test_search_query(self, text, expected_query):
+        # Act
+        actual_query = get_search_query(text)
+
+        # Assert
+        assert actual_query == expected_query
+
+    def test_no_words(self):
+        # Act / Assert
+        with pytest.raises(ValueError):
+            get_search_query(" *&! ")
+
+
+class TestFormatSnippet:
+    def test_snippet_is_escaped(self):
+        # Act
+        actual_snippet = format_snippet("<b>a</b> \x02cat\x03 & dog")
+
+        # Assert
+        assert actual_snippet == "&lt;b&gt;a&lt;/b&gt; <mark>cat</mark> &amp; dog"
+
+
+class TestSearchAnnotations:
+    @patch("src.modules.database_transactions.DB_USE_PREPARED_STATEMENTS", False)
+    @patch("src.modules.database_transactions.psycopg2.connect")
+    def test_search(self, mock_connect):
+        # Arrange
+        mock_cursor_obj = mock_connect.return_value.cursor.return_value
+        mock_cursor_obj.fetchall.return_value = [(4, 0.5, "a \x02cat\x03"), (9, 0.25, "\x02cats\x03")]
+
+        # Act
+        response = app.test_client().get("/search_annotations?q=cat*")
+
+        # Assert
+        assert response.get_json() == {
+            "statusCode": 200,
+            "body": {
+                "records": [
+                    {"annotationid": 4, "rank": 0.5, "snippet": "a <mark>cat</mark>"},
+                    {"annotationid": 9, "rank": 0.25, "snippet": "<mark>cats</mark>"},
+                ],
+                "next-cursor": None,
+            },
+        }
+        sql, values = mock_cursor_obj.execute.call_args.args
+        assert "SELECT annotation.annotationid, ts_rank_cd(annotation.searchvector, query)::float8 AS rank" in sql
+        assert (
+            " FROM annotation, to_tsquery(%s::regconfig, %s) AS query WHERE annotation.searchvector @@ query"
+            " ORDER BY rank DESC, annotation.annotationid LIMIT %s) AS page"
+        ) in sql
+        assert values[2:] == ["english", "cat:*", 101]
+        mock_connect.return_value.commit.assert_called()
+
+    @patch("src.modules.database_transactions.DB_USE_PREPARED_STATEMENTS", False)
+    @patch("src.modules.database_transactions.psycopg2.connect")
+    def test_search_page_with_filters(self, mock_connect):
+        # Arrange
+        mock_cursor_obj = mock_connect.return_value.cursor.return_value
+        mock_cursor_obj.fetchall.return_value = [(4, 0.5, "a"), (9, 0.25, "b"), (12, 0.25, "c")]
+        cursor = encode_cursor({"rank": 0.75, "annotationid": 2})
+
+        # Act
+        response = app.test_client().get(
+            f"/search_annotations?q=cat&team=fake-team&page-size=2&cursor={cursor}"
+        )
+
+        # Assert
+        body = response.get_json()["body"]
+        assert [record["annotationid"] for record in body["records"]] == [4, 9]
+        assert body["next-cursor"] == encode_cursor({"rank": 0.25, "annotationid": 9})
+        sql, values = mock_cursor_obj.execute.call_args.args
+        assert "INNER JOIN employee ON annotation.username=employee.username" in sql
+        assert (
+            " WHERE annotation.searchvector @@ query AND employee.team = %s"
+            " AND (ts_rank_cd(annotation.searchvector, query)::float8 < %s"
+            " OR (ts_rank_cd(annotation.searchvector, query)::float8 = %s AND annotation.annotationid > %s))"
+        ) in sql
+        assert values[2:] == ["english", "cat", "fake-team", 0.75, 0.75, 2, 3]
+
+    @pytest.mark.parametrize(
+        "query_string",
+        ["", "?q=*", "?q=cat&page-size=0", "?q=cat&cursor=invalid", f"?q=cat&cursor={encode_cursor({'rank': 1})}"],
+    )
+    def test_invalid_parameters(self, query_string):
+        # Act
+        response = app.test_client().get(f"/search_annotations{query_string}")
+
+        # Assert
+        assert response.get_json()["statusCode"] == 400
+
+    @patch("src.modules.database_transactions.DB_USE_PREPARED_STATEMENTS", False)
+    @patch("src.modules.database_transactions.psycopg2.connect")
+    def test_database_error(self, mock_connect):
+        # Arrange
+        mock_cursor_obj = mock_connect.return_value.cursor.return_value
+        mock_cursor_obj.execute.side_effect = psycopg2.Error("fake error")
+
+        # Act
+        response = app.test_client().get("/search_annotations?q=cat")
+
+        # Assert
+        assert response.get_json()["statusCode"] == 500
+        mock_connect.return_value.rollback.assert_called()
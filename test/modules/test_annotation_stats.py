@@ -0,0 +1,72 @@
+from unittest.mock import patch
+from src.modules.annotation_stats import get_annotation_stats
+from src.app import app
+
+
+class TestGetAnnotationStats:
+    @patch("src.modules.annotation_stats.get_record_field_from_table")
+    def test_grouped_counts(self, mock_get_fields):
+        # Arrange
+        mock_get_fields.return_value = {
+            "statusCode": 200,
+            "body": [
+                ("team-a", "user1", "done", 2),
+                ("team-a", "user2", "done", 1),
+                ("team-a", "user2", "to do", 3),
+                ("team-a", None, "done", 3),
+                ("team-a", None, "to do", 3),
+                (None, None, "done", 3),
+                (None, None, "to do", 3),
+                (None, None, None, 6),
+            ],
+        }
+        expected_response = {
+            "statusCode": 200,
+            "body": {
+                "total": 6,
+                "by-status": {"done": 3, "to do": 3},
+                "by-team": {"team-a": {"done": 3, "to do": 3}},
+                "by-user": {"user1": {"done": 2}, "user2": {"done": 1, "to do": 3}},
+            },
+        }
+
+        # Act
+        with app.test_request_context(method="GET"):
+            actual_response = get_annotation_stats()
+
+        # Assert
+        assert expected_response == actual_response
+        table_name, fields, condition, values = mock_get_fields.call_args.args
+        assert table_name == "annotation_stats"
+        assert condition.startswith(
+            "INNER JOIN employee ON annotation_stats.username=employee.username"
+            " WHERE annotation_stats.annotationcount > 0 GROUP BY GROUPING SETS"
+        )
+        assert values == []
+
+    @patch("src.modules.annotation_stats.get_record_field_from_table")
+    def test_team_stats(self, mock_get_fields):
+        # Arrange
+        mock_get_fields.return_value = {"statusCode": 200, "body": [(None, None, None, 0)]}
+
+        # Act
+        with app.test_request_context(method="GET", query_string={"team": "team-a"}):
+            actual_response = get_annotation_stats()
+
+        # Assert
+        assert actual_response["body"] == {"total": 0, "by-status": {}, "by-team": {}, "by-user": {}}
+        condition, values = mock_get_fields.call_args.args[2:]
+        assert " WHERE annotation_stats.annotationcount > 0 AND employee.team = %s " in condition
+        assert values == ["team-a"]
+
+    @patch("src.modules.annotation_stats.get_record_field_from_table")
+    def test_read_error(self, mock_get_fields):
+        # Arrange
+        mock_get_fields.return_value = {"statusCode": 500, "body": "Error: test-error"}
+
+        # Act
+        with app.test_request_context(method="GET"):
+            actual_response = get_annotation_stats()
+
+        # Assert
+        assert mock_get_fields.return_value == actual_response
@@ -0,0 +1,108 @@
+import pytest
+from unittest.mock import patch
+from src.modules.annotation_sync import sync_annotations
+from src.modules.pagination import encode_cursor
+from src.app import app
+
+
+@pytest.fixture
+def snapshot_xmin():
+    with patch("src.modules.annotation_sync.get_snapshot_xmin", return_value=900) as mock_get_xmin:
+        yield mock_get_xmin
+
+
+def get_records(*records):
+    return {
+        "statusCode": 200,
+        "body": [
+            {"annotationid": annotation_id, "tags": "cat", "synctransaction": transaction}
+            for transaction, annotation_id in records
+        ],
+    }
+
+
+class TestSyncAnnotations:
+    @patch("src.modules.annotation_sync.get_record_page_from_table")
+    def test_changes_since_watermark(self, mock_get_page, snapshot_xmin):
+        # Arrange
+        mock_get_page.side_effect = [
+            get_records((700, 4), (650, 9)),
+            {"statusCode": 200, "body": [(5, 660)]},
+        ]
+        query_string = {"since": encode_cursor({"transaction": 600, "annotation": 2}), "fields": "tags"}
+
+        # Act
+        with app.test_request_context(method="GET", query_string=query_string):
+            actual_response = sync_annotations()
+
+        # Assert
+        assert actual_response == {
+            "statusCode": 200,
+            "body": {
+                "records": [{"annotationid": 9, "tags": "cat"}, {"annotationid": 4, "tags": "cat"}],
+                "deleted": [5],
+                "watermark": encode_cursor({"transaction": 900, "annotation": 0}),
+                "has-more": False,
+            },
+        }
+        records_call, tombstones_call = mock_get_page.call_args_list
+        assert records_call.args[0] == "annotation"
+        assert records_call.args[1].endswith(
+            ", annotation.updatedat, annotation.changetransaction AS synctransaction"
+        )
+        assert records_call.args[2].endswith(
+            " WHERE (annotation.changetransaction, annotation.annotationid) > (%s, %s)"
+            " AND annotation.changetransaction < %s"
+            " ORDER BY annotation.changetransaction, annotation.annotationid"
+        )
+        assert records_call.args[3] == [600, 2, 900]
+        assert tombstones_call.args[0] == "annotation_tombstone"
+        assert tombstones_call.args[3] == [600, 2, 900]
+
+    @patch("src.modules.annotation_sync.get_record_page_from_table")
+    def test_more_changes(self, mock_get_page, snapshot_xmin):
+        # Arrange
+        mock_get_page.side_effect = [
+            get_records((650, 9), (700, 4), (710, 1)),
+            {"statusCode": 200, "body": [(5, 660)]},
+        ]
+
+        # Act
+        with app.test_request_context(method="GET", query_string={"page-size": 2}):
+            actual_response = sync_annotations()
+
+        # Assert
+        assert actual_response["body"] == {
+            "records": [{"annotationid": 9, "tags": "cat"}],
+            "deleted": [5],
+            "watermark": encode_cursor({"transaction": 660, "annotation": 5}),
+            "has-more": True,
+        }
+        assert mock_get_page.call_args_list[0].args[3] == [0, 0, 900]  # first sync
+        assert mock_get_page.call_args_list[0].args[4] == 3
+
+    @pytest.mark.parametrize(
+        "query_string",
+        [{"since": "invalid"}, {"since": encode_cursor({"transaction": 1})}, {"fields": "password"}, {"page-size": 0}],
+    )
+    @patch("src.modules.annotation_sync.get_record_page_from_table")
+    def test_invalid_parameters(self, mock_get_page, snapshot_xmin, query_string):
+        # Act
+        with app.test_request_context(method="GET", query_string=query_string):
+            actual_response = sync_annotations()
+
+        # Assert
+        assert actual_response["statusCode"] == 400
+        mock_get_page.assert_not_called()
+
+    @patch("src.modules.annotation_sync.get_record_page_from_table")
+    def test_read_error(self, mock_get_page, snapshot_xmin):
+        # Arrange
+        mock_get_page.return_value = {"statusCode": 500, "body": "Error: test-error"}
+
+        # Act
+        with app.test_request_context(method="GET"):
+            actual_response = sync_annotations()
+
+        # Assert
+        assert mock_get_page.return_value == actual_response
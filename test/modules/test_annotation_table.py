@@ -1,14 +1,35 @@
+import json
+import pytest
+from datetime import datetime, timezone
 from unittest.mock import patch
+from src.modules.pagination import encode_cursor
 from src.modules.annotation_table import (
     get_all_annotations,
+    get_annotation,
+    export_annotations,
     add_annotation_task,
+    add_annotation_tasks,
     update_annotation_record,
     delete_annotation_record,
+    update_annotation_records,
+    delete_annotation_records,
+    patch_annotation_record,
+    claim_annotation_tasks,
 )
 from src.app import app
 
+# annotation columns returned to clients
+ANNOTATION_FIELDS = (
+    "annotation.annotationid, annotation.version, annotation.username, annotation.annotationstatus,"
+    " annotation.originaldata, annotation.annotateddata, annotation.tags"
+)
+LISTING_FIELDS = f"{ANNOTATION_FIELDS}, employee.firstname, employee.lastname, employee.team"
+
 
 class TestGetAllAnnotations:
+    fields = LISTING_FIELDS
+    join = "INNER JOIN employee ON annotation.username=employee.username"
+
     @patch("src.modules.annotation_table.get_record_field_from_table")
     def test_get_all_annotations(self, mock_get_fields):
         # Arrange
@@ -16,16 +37,333 @@ class TestGetAllAnnotations:
         expected_response = {"statusCode": 200, "body": "fields"}
 
         # Act
-        actual_response = get_all_annotations()
+        with app.test_request_context(method="GET"):
+            actual_response = get_all_annotations()
 
         # Assert
         assert expected_response == actual_response
         mock_get_fields.assert_called_with(
             "annotation",
-            "annotation.*, employee.firstname, employee.lastname, employee.team",
-            "INNER JOIN employee ON annotation.username=employee.username;"
+            LISTING_FIELDS,
+            "INNER JOIN employee ON annotation.username=employee.username;",
+            [],
+            keyed=True,
+            allow_empty=True,
+        )
+
+    @patch("src.modules.annotation_table.get_record_field_from_table")
+    def test_filtered_annotations(self, mock_get_fields):
+        # Arrange
+        mock_get_fields.return_value = {"statusCode": 200, "body": "fields"}
+        query_string = [
+            ("user-name", "test-user"),
+            ("annotation-status", "test-status"),
+            ("team", "test-team"),
+            ("tags", "First "),
+            ("tags", "50%_off"),
+        ]
+
+        # Act
+        with app.test_request_context(method="GET", query_string=query_string):
+            get_all_annotations()
+
+        # Assert
+        mock_get_fields.assert_called_with(
+            "annotation",
+            self.fields,
+            f"{self.join} WHERE annotation.username = %s AND annotation.annotationstatus = %s"
+            " AND employee.team = %s AND regexp_split_to_array(lower(annotation.tags), '\\s*,\\s*') @> %s::text[];",
+            ["test-user", "test-status", "test-team", ["first", "50%_off"]],
+            keyed=True,
+            allow_empty=True,
+        )
+
+    @patch("src.modules.database_transactions.DB_USE_PREPARED_STATEMENTS", False)
+    @patch("src.modules.database_transactions.psycopg2.connect")
+    def test_filter_without_matches(self, mock_connect):
+        # Arrange
+        mock_connect.return_value.cursor.return_value.fetchall.return_value = []
+
+        # Act
+        with app.test_request_context(method="GET", query_string={"team": "empty-team"}):
+            actual_response = get_all_annotations()
+
+        # Assert
+        assert {"statusCode": 200, "body": []} == actual_response
+
+    @pytest.mark.parametrize("tag", ["cat", "bobcat", "category"])
+    @patch("src.modules.annotation_table.get_record_field_from_table")
+    def test_tags_match_whole_tags(self, mock_get_fields, tag):
+        # Arrange
+        mock_get_fields.return_value = {"statusCode": 200, "body": []}
+
+        # Act
+        with app.test_request_context(method="GET", query_string={"tags": tag}):
+            get_all_annotations()
+
+        # Assert
+        condition, values = mock_get_fields.call_args.args[2:4]
+        assert "ILIKE" not in condition
+        assert condition.endswith(
+            " WHERE regexp_split_to_array(lower(annotation.tags), '\\s*,\\s*') @> %s::text[];"
+        )
+        assert values == [[tag]]
+
+    @patch("src.modules.annotation_table.get_record_page_from_table")
+    def test_filtered_page(self, mock_get_page):
+        # Arrange
+        mock_get_page.return_value = {"statusCode": 200, "body": []}
+        cursor = encode_cursor({"annotationid": 2})
+        query_string = {"team": "test-team", "page-size": 2, "cursor": cursor}
+
+        # Act
+        with app.test_request_context(method="GET", query_string=query_string):
+            get_all_annotations()
+
+        # Assert
+        mock_get_page.assert_called_with(
+            "annotation",
+            self.fields,
+            f"{self.join} WHERE employee.team = %s AND annotation.annotationid > %s"
+            " ORDER BY annotation.annotationid",
+            ["test-team", 2],
+            3,
+            keyed=True,
+        )
+
+    @patch("src.modules.annotation_table.get_record_page_from_table")
+    def test_first_page(self, mock_get_page):
+        # Arrange
+        mock_get_page.return_value = {
+            "statusCode": 200,
+            "body": [{"annotationid": 1}, {"annotationid": 2}, {"annotationid": 3}],
+        }
+        expected_response = {
+            "statusCode": 200,
+            "body": {
+                "records": [{"annotationid": 1}, {"annotationid": 2}],
+                "next-cursor": encode_cursor({"annotationid": 2}),
+            },
+        }
+
+        # Act
+        with app.test_request_context(method="GET", query_string={"page-size": 2}):
+            actual_response = get_all_annotations()
+
+        # Assert
+        assert expected_response == actual_response
+        mock_get_page.assert_called_with(
+            "annotation",
+            self.fields,
+            f"{self.join} ORDER BY annotation.annotationid",
+            [],
+            3,
+            keyed=True,
+        )
+
+    @patch("src.modules.annotation_table.get_record_page_from_table")
+    def test_last_page(self, mock_get_page):
+        # Arrange
+        mock_get_page.return_value = {"statusCode": 200, "body": [{"annotationid": 3}]}
+        cursor = encode_cursor({"annotationid": 2})
+        expected_response = {
+            "statusCode": 200,
+            "body": {"records": [{"annotationid": 3}], "next-cursor": None},
+        }
+
+        # Act
+        with app.test_request_context(
+            method="GET", query_string={"page-size": 2, "cursor": cursor}
+        ):
+            actual_response = get_all_annotations()
+
+        # Assert
+        assert expected_response == actual_response
+        mock_get_page.assert_called_with(
+            "annotation",
+            self.fields,
+            f"{self.join} WHERE annotation.annotationid > %s ORDER BY annotation.annotationid",
+            [2],
+            3,
+            keyed=True,
+        )
+
+    @patch("src.modules.annotation_table.get_record_page_from_table")
+    def test_projected_page(self, mock_get_page):
+        # Arrange
+        mock_get_page.return_value = {"statusCode": 200, "body": []}
+        query_string = {"page-size": 2, "fields": "tags, annotationstatus,tags"}
+
+        # Act
+        with app.test_request_context(method="GET", query_string=query_string):
+            get_all_annotations()
+
+        # Assert
+        mock_get_page.assert_called_with(
+            "annotation",
+            "annotation.annotationid, annotation.version, annotation.tags, annotation.annotationstatus,"
+            " employee.firstname, employee.lastname, employee.team",
+            f"{self.join} ORDER BY annotation.annotationid",
+            [],
+            3,
+            keyed=True,
+        )
+
+    @pytest.mark.parametrize("fields", ["password", "tags;DROP TABLE annotation", ""])
+    @patch("src.modules.annotation_table.get_record_field_from_table")
+    def test_invalid_fields(self, mock_get_fields, fields):
+        # Act
+        with app.test_request_context(method="GET", query_string={"fields": fields}):
+            actual_response = get_all_annotations()
+
+        # Assert
+        assert actual_response["statusCode"] == 400
+        mock_get_fields.assert_not_called()
+
+    @pytest.mark.parametrize(
+        "query_string",
+        [{"page-size": "abc"}, {"page-size": 0}, {"cursor": "not-a-cursor"}],
+    )
+    @patch("src.modules.annotation_table.get_record_page_from_table")
+    def test_invalid_paging_parameters(self, mock_get_page, query_string):
+        # Act
+        with app.test_request_context(method="GET", query_string=query_string):
+            actual_response = get_all_annotations()
+
+        # Assert
+        assert actual_response["statusCode"] == 400
+        mock_get_page.assert_not_called()
+
+    @patch("src.modules.annotation_table.get_record_page_from_table")
+    def test_page_error(self, mock_get_page):
+        # Arrange
+        mock_get_page.return_value = {"statusCode": 500, "body": "Error: test-error"}
+
+        # Act
+        with app.test_request_context(method="GET", query_string={"page-size": 2}):
+            actual_response = get_all_annotations()
+
+        # Assert
+        assert mock_get_page.return_value == actual_response
+
+
+
+class TestGetAnnotation:
+    @patch("src.modules.annotation_table.get_record_field_from_table")
+    def test_get_annotation(self, mock_get_fields):
+        # Arrange
+        mock_get_fields.return_value = {"statusCode": 200, "body": [{"annotationid": 5}]}
+
+        # Act
+        with app.test_request_context(method="GET", query_string={"annotation-id": "5"}):
+            actual_response = get_annotation()
+
+        # Assert
+        assert {"statusCode": 200, "body": {"annotationid": 5}} == actual_response
+        mock_get_fields.assert_called_with(
+            "annotation",
+            LISTING_FIELDS,
+            "INNER JOIN employee ON annotation.username=employee.username"
+            " WHERE annotation.annotationid = %s;",
+            [5],
+            keyed=True,
+        )
+
+    @patch("src.modules.annotation_table.get_record_field_from_table")
+    def test_get_annotation_content_ids(self, mock_get_fields):
+        # Arrange
+        mock_get_fields.return_value = {"statusCode": 200, "body": [{"annotationid": 5}]}
+
+        # Act
+        with app.test_request_context(
+            method="GET", query_string={"annotation-id": "5", "fields": "originaldataid,annotateddataid"}
+        ):
+            get_annotation()
+
+        # Assert
+        assert mock_get_fields.call_args.args[1] == (
+            "annotation.annotationid, annotation.version, annotation.originaldataid, annotation.annotateddataid,"
+            " employee.firstname, employee.lastname, employee.team"
+        )
+
+    @patch("src.modules.annotation_table.get_record_field_from_table")
+    def test_annotation_not_found(self, mock_get_fields):
+        # Arrange
+        mock_get_fields.return_value = {"statusCode": 500, "body": "Error: no records found"}
+
+        # Act
+        with app.test_request_context(method="GET", query_string={"annotation-id": "5"}):
+            actual_response = get_annotation()
+
+        # Assert
+        assert mock_get_fields.return_value == actual_response
+
+    @pytest.mark.parametrize("query_string", [{}, {"annotation-id": "abc"}])
+    @patch("src.modules.annotation_table.get_record_field_from_table")
+    def test_invalid_input(self, mock_get_fields, query_string):
+        # Act
+        with app.test_request_context(method="GET", query_string=query_string):
+            actual_response = get_annotation()
+
+        # Assert
+        assert actual_response["statusCode"] == 400
+        mock_get_fields.assert_not_called()
+
+class TestExportAnnotations:
+    class FakeRecordStream:
+        def __init__(self, records):
+            self.records = iter(records)
+            self.closed = False
+
+        def __iter__(self):
+            return self.records
+
+        def close(self):
+            self.closed = True
+
+    @patch("src.modules.annotation_table.get_record_stream_from_table")
+    def test_export_annotations(self, mock_get_stream):
+        # Arrange
+        updated_at = datetime(2026, 10, 18, 10, 0, tzinfo=timezone.utc)
+        records = self.FakeRecordStream(
+            [{"annotationid": 1, "updatedat": updated_at}, {"annotationid": 2, "updatedat": None}]
+        )
+        mock_get_stream.return_value = {"statusCode": 200, "body": records}
+
+        # Act
+        with app.test_request_context(method="GET"):
+            response = export_annotations()
+        body = response.get_data()  # streamed after the request context has ended
+
+        # Assert
+        assert response.mimetype == "application/x-ndjson"
+        # dates are written by the app's encoder, the same as in /get_annotations
+        lines = body.decode().splitlines()
+        assert [json.loads(line) for line in lines] == [
+            {"annotationid": 1, "updatedat": "Sun, 18 Oct 2026 10:00:00 GMT"},
+            {"annotationid": 2, "updatedat": None},
+        ]
+        assert records.closed
+        mock_get_stream.assert_called_with(
+            "annotation",
+            LISTING_FIELDS,
+            "INNER JOIN employee ON annotation.username=employee.username ORDER BY annotation.annotationid",
+            [],
+            2000,
         )
 
+    @patch("src.modules.annotation_table.get_record_stream_from_table")
+    def test_export_error(self, mock_get_stream):
+        # Arrange
+        mock_get_stream.return_value = {"statusCode": 500, "body": "Error: test-error"}
+
+        # Act
+        with app.test_request_context(method="GET"):
+            actual_response = export_annotations()
+
+        # Assert
+        assert {"statusCode": 500, "body": "Error: test-error"} == actual_response
+
 
 class TestAddAnnotation:
     json_input = {
@@ -60,6 +398,27 @@ class TestAddAnnotation:
                 ["fake-username", "fake-status", "fake-data", "fake-data", "fake-tags"],
             )
 
+    @patch("src.modules.annotation_table.add_to_table")
+    def test_add_annotation_with_content(self, mock_add_record):
+        # Arrange
+        json_input = {
+            "user-name": "fake-username",
+            "annotation-status": "fake-status",
+            "original-data-id": 3,
+            "annotated-data": "fake-data",
+            "tags": "fake-tags",
+        }
+
+        # Act
+        with app.test_request_context(method="POST", json=json_input):
+            add_annotation_task()
+
+            # Assert
+            assert mock_add_record.call_args.args[1][5:] == ["originaldataid", "annotateddataid"]
+            assert mock_add_record.call_args.args[2] == [
+                "fake-username", "fake-status", None, "fake-data", "fake-tags", 3, None
+            ]
+
     @patch("src.modules.annotation_table.add_to_table")
     def test_fail_add_annotation(self, mock_add_record):
         # Arrange
@@ -91,6 +450,161 @@ class TestAddAnnotation:
             assert expected_response == actual_response
 
 
+class TestAddAnnotations:
+    annotation = {
+        "user-name": "fake-username",
+        "annotation-status": "fake-status",
+        "original-data": "fake-data",
+        "annotated-data": "fake-data",
+        "tags": "fake-tags",
+    }
+    annotation_values = ["fake-username", "fake-status", "fake-data", "fake-data", "fake-tags"]
+    attributes = ["username", "annotationstatus", "originaldata", "annotateddata", "tags"]
+
+    @patch("src.modules.annotation_table.add_many_to_table")
+    def test_add_json_array(self, mock_add_many):
+        # Arrange
+        mock_add_many.return_value = {"statusCode": 200, "body": [(1,), (2,)]}
+        expected_response = {"statusCode": 200, "body": {"annotation-ids": [1, 2]}}
+
+        # Act
+        with app.test_request_context(method="POST", json=[self.annotation] * 2):
+            actual_response = add_annotation_tasks()
+
+        # Assert
+        assert expected_response == actual_response
+        mock_add_many.assert_called_with(
+            "annotation", self.attributes, [self.annotation_values] * 2, "annotationid", 1000
+        )
+
+    @patch("src.modules.annotation_table.add_many_to_table")
+    def test_add_ndjson(self, mock_add_many):
+        # Arrange
+        added_rows = []
+
+        def add_many(table_name, attributes, rows, returning, chunk_size):
+            added_rows.extend(rows)
+            return {"statusCode": 200, "body": [(1,), (2,)]}
+
+        mock_add_many.side_effect = add_many
+        body = json.dumps(self.annotation) + "\n\n" + json.dumps(self.annotation) + "\n"
+
+        # Act
+        with app.test_request_context(
+            method="POST", data=body, content_type="application/x-ndjson"
+        ):
+            actual_response = add_annotation_tasks()
+
+        # Assert
+        assert {"statusCode": 200, "body": {"annotation-ids": [1, 2]}} == actual_response
+        assert added_rows == [self.annotation_values] * 2
+
+    @patch("src.modules.annotation_table.add_many_to_table")
+    def test_add_json_array_with_content(self, mock_add_many):
+        # Arrange
+        mock_add_many.return_value = {"statusCode": 200, "body": [(1,), (2,)]}
+        annotation_with_content = dict(self.annotation, **{"original-data-id": 3})
+        del annotation_with_content["original-data"]
+
+        # Act
+        with app.test_request_context(method="POST", json=[self.annotation, annotation_with_content]):
+            add_annotation_tasks()
+
+        # Assert
+        mock_add_many.assert_called_with(
+            "annotation",
+            self.attributes + ["originaldataid", "annotateddataid"],
+            [
+                self.annotation_values + [None, None],
+                ["fake-username", "fake-status", None, "fake-data", "fake-tags", 3, None],
+            ],
+            "annotationid",
+            1000,
+        )
+
+    @patch("src.modules.annotation_table.add_many_to_table")
+    def test_ndjson_content_after_first_line(self, mock_add_many):
+        # Arrange
+        def add_many(table_name, attributes, rows, returning, chunk_size):
+            try:
+                list(rows)
+            except Exception as error:
+                return {"statusCode": 500, "body": f"Error: {error}"}
+
+        mock_add_many.side_effect = add_many
+        body = json.dumps(self.annotation) + "\n" + json.dumps(dict(self.annotation, **{"original-data-id": 3})) + "\n"
+
+        # Act
+        with app.test_request_context(
+            method="POST", data=body, content_type="application/x-ndjson"
+        ):
+            actual_response = add_annotation_tasks()
+
+        # Assert
+        assert actual_response == {
+            "statusCode": 400,
+            "body": "Invalid annotation on line 2: content ids can only be used if the first annotation has one",
+        }
+        assert mock_add_many.call_args.args[1] == self.attributes
+
+    @patch("src.modules.annotation_table.add_many_to_table")
+    def test_invalid_ndjson_line(self, mock_add_many):
+        # Arrange
+        def add_many(table_name, attributes, rows, returning, chunk_size):
+            try:
+                list(rows)
+            except Exception as error:
+                return {"statusCode": 500, "body": f"Error: {error}"}
+
+        mock_add_many.side_effect = add_many
+        body = json.dumps(self.annotation) + "\n" + json.dumps({"user-name": "a"}) + "\n"
+        expected_response = {
+            "statusCode": 400,
+            "body": "Invalid annotation on line 2: 'annotation-status'",
+        }
+
+        # Act
+        with app.test_request_context(
+            method="POST", data=body, content_type="application/x-ndjson"
+        ):
+            actual_response = add_annotation_tasks()
+
+        # Assert
+        assert expected_response == actual_response
+
+    @pytest.mark.parametrize(
+        "json_input,expected_body",
+        [
+            ({"user-name": "a"}, "Expected a JSON array of annotations"),
+            (
+                [annotation, {}],
+                "Missing or incorrect JSON attributes in annotation 1. Error related to extracting key value: 'user-name'",
+            ),
+        ],
+    )
+    @patch("src.modules.annotation_table.add_many_to_table")
+    def test_invalid_json(self, mock_add_many, json_input, expected_body):
+        # Act
+        with app.test_request_context(method="POST", json=json_input):
+            actual_response = add_annotation_tasks()
+
+        # Assert
+        assert {"statusCode": 400, "body": expected_body} == actual_response
+        mock_add_many.assert_not_called()
+
+    @patch("src.modules.annotation_table.add_many_to_table")
+    def test_add_error(self, mock_add_many):
+        # Arrange
+        mock_add_many.return_value = {"statusCode": 500, "body": "Error: test-error"}
+
+        # Act
+        with app.test_request_context(method="POST", json=[self.annotation]):
+            actual_response = add_annotation_tasks()
+
+        # Assert
+        assert mock_add_many.return_value == actual_response
+
+
 class TestUpdateAnnotationRecord:
     json_input = {
         "annotation-id": "fake-id",
@@ -100,14 +614,13 @@ class TestUpdateAnnotationRecord:
         "annotated-data": "fake-text",
         "tags": "fake-tags",
     }
-    condition = "WHERE annotationid = fake-id"
     annotation_table_name = "annotation"
-    annotation_table_fields = (
-        "username,annotationstatus,originaldata,annotateddata,tags"
-    )
-    mock_get_records_response = {
-        "statusCode": 200,
-        "body": [("fake-name", "fake-status", "fake-text", "fake-text", "fake-tags")],
+    expected_field_values = {
+        "username": "fake-name",
+        "annotationstatus": "fake-status",
+        "originaldata": "fake-text",
+        "annotateddata": "fake-text",
+        "tags": "fake-tags",
     }
 
     def test_invalid_input(self):
@@ -125,13 +638,10 @@ class TestUpdateAnnotationRecord:
             # Assert
             assert expected_response == actual_response
 
-    @patch("src.modules.annotation_table.get_record_field_from_table")
-    def test_get_record_error(self, mock_get_record):
+    @patch("src.modules.annotation_table.update_fields")
+    def test_record_not_found(self, mock_update_fields):
         # Arrange
-        mock_get_record.return_value = {
-            "statusCode": 500,
-            "body": "Error: no records found",
-        }
+        mock_update_fields.return_value = {"statusCode": 200, "body": []}
         expected_response = {"statusCode": 500, "body": "Error: no records found"}
 
         # Act
@@ -140,16 +650,15 @@ class TestUpdateAnnotationRecord:
 
             # Assert
             assert expected_response == actual_response
-            mock_get_record.assert_called_with(
-                self.annotation_table_name, self.annotation_table_fields, self.condition
-            )
 
-    @patch("src.modules.annotation_table.get_record_field_from_table")
-    @patch("src.modules.annotation_table.update_field")
-    def test_no_updates_done(self, mock_update_field, mock_get_record):
+    @patch("src.modules.annotation_table.update_fields")
+    def test_update_fields_error(self, mock_update_fields):
         # Arrange
-        mock_get_record.return_value = self.mock_get_records_response
-        expected_response = {"statusCode": 200, "body": "Success updating record"}
+        mock_update_fields.return_value = {
+            "statusCode": 500,
+            "body": "Error with updating record",
+        }
+        expected_response = {"statusCode": 500, "body": "Error with updating record"}
 
         # Act
         with app.test_request_context(method="POST", json=self.json_input):
@@ -157,22 +666,12 @@ class TestUpdateAnnotationRecord:
 
             # Assert
             assert expected_response == actual_response
-            mock_get_record.assert_called_with(
-                self.annotation_table_name, self.annotation_table_fields, self.condition
-            )
-            mock_update_field.assert_not_called()
 
-    @patch("src.modules.annotation_table.get_record_field_from_table")
-    @patch("src.modules.annotation_table.update_field")
-    def test_update_field_error(self, mock_update_field, mock_get_record):
+    @patch("src.modules.annotation_table.update_fields")
+    def test_success_update_record(self, mock_update_fields):
         # Arrange
-        mock_get_record.return_value = self.mock_get_records_response
-        self.json_input["user-name"] = "new-name"
-        mock_update_field.return_value = {
-            "statusCode": 500,
-            "body": "Error with updating record",
-        }
-        expected_response = {"statusCode": 500, "body": "Error with updating record"}
+        mock_update_fields.return_value = {"statusCode": 200, "body": [("fake-id",)]}
+        expected_response = {"statusCode": 200, "body": "Success updating record"}
 
         # Act
         with app.test_request_context(method="POST", json=self.json_input):
@@ -180,34 +679,323 @@ class TestUpdateAnnotationRecord:
 
             # Assert
             assert expected_response == actual_response
-            mock_get_record.assert_called_with(
-                self.annotation_table_name, self.annotation_table_fields, self.condition
-            )
-            mock_update_field.assert_called_with(
-                self.annotation_table_name, "username", "new-name", self.condition
+            mock_update_fields.assert_called_once_with(
+                self.annotation_table_name,
+                self.expected_field_values,
+                "WHERE annotationid = %s",
+                ["fake-id"],
+                returning="annotationid",
             )
 
+
+    @patch("src.modules.annotation_table.update_fields")
+    def test_update_with_if_match(self, mock_update_fields):
+        # Arrange
+        mock_update_fields.return_value = {"statusCode": 200, "body": [(4,)]}
+        expected_response = {"statusCode": 200, "body": {"annotation-id": "fake-id", "version": 4}}
+
+        # Act
+        with app.test_request_context(
+            method="POST", json=self.json_input, headers={"If-Match": '"3"'}
+        ):
+            actual_response = update_annotation_record()
+
+        # Assert
+        assert expected_response == actual_response
+        mock_update_fields.assert_called_once_with(
+            self.annotation_table_name,
+            self.expected_field_values,
+            "WHERE annotationid = %s AND version = %s",
+            ["fake-id", 3],
+            returning="version",
+        )
+
+    @pytest.mark.parametrize(
+        "current_version, expected_status_code",
+        [({"statusCode": 200, "body": [(5,)]}, 409), ({"statusCode": 500, "body": "Error: no records found"}, 500)],
+    )
     @patch("src.modules.annotation_table.get_record_field_from_table")
-    @patch("src.modules.annotation_table.update_field")
-    def test_success_update_record(self, mock_update_field, mock_get_record):
+    @patch("src.modules.annotation_table.update_fields")
+    def test_update_with_outdated_version(
+        self, mock_update_fields, mock_get_fields, current_version, expected_status_code
+    ):
         # Arrange
-        mock_get_record.return_value = self.mock_get_records_response
-        self.json_input["user-name"] = "new-name"
-        mock_update_field.return_value = {"statusCode": 200, "body": "Success"}
-        expected_response = {"statusCode": 200, "body": "Success updating record"}
+        mock_update_fields.return_value = {"statusCode": 200, "body": []}
+        mock_get_fields.return_value = current_version
 
         # Act
-        with app.test_request_context(method="POST", json=self.json_input):
+        with app.test_request_context(method="POST", json=dict(self.json_input, version=3)):
             actual_response = update_annotation_record()
 
-            # Assert
-            assert expected_response == actual_response
-            mock_get_record.assert_called_with(
-                self.annotation_table_name, self.annotation_table_fields, self.condition
-            )
-            mock_update_field.assert_called_with(
-                self.annotation_table_name, "username", "new-name", self.condition
-            )
+        # Assert
+        assert actual_response["statusCode"] == expected_status_code
+
+    def test_invalid_if_match(self):
+        # Act
+        with app.test_request_context(
+            method="POST", json=self.json_input, headers={"If-Match": '"3", "4"'}
+        ):
+            actual_response = update_annotation_record()
+
+        # Assert
+        assert actual_response == {"statusCode": 400, "body": "Error: If-Match must hold a single version"}
+
+
+class TestPatchAnnotationRecord:
+    stored_record = (
+        3,
+        "fake-name",
+        "to do",
+        "fake-text",
+        '{"labels": [{"start": 0, "end": 4}]}',
+        "cat",
+    )
+
+    @patch("src.modules.database_transactions.DB_USE_PREPARED_STATEMENTS", False)
+    @patch("src.modules.database_transactions.psycopg2.connect")
+    def test_patch_applied(self, mock_connect):
+        # Arrange
+        mock_cursor_obj = mock_connect.return_value.cursor.return_value
+        mock_cursor_obj.fetchone.side_effect = [self.stored_record, (4,)]
+        json_input = {
+            "annotation-id": 1,
+            "version": 3,
+            "patch": [
+                {"op": "replace", "path": "/annotation-status", "value": "done"},
+                {"op": "add", "path": "/annotated-data/labels/-", "value": {"start": 5, "end": 9}},
+            ],
+        }
+
+        # Act
+        with app.test_request_context(method="POST", json=json_input):
+            actual_response = patch_annotation_record()
+
+        # Assert
+        assert {"statusCode": 200, "body": {"annotation-id": 1, "version": 4}} == actual_response
+        sql, values = mock_cursor_obj.execute.call_args.args
+        assert sql == (
+            "UPDATE annotation SET annotationstatus = %s, annotateddata = %s"
+            " WHERE annotationid = %s AND version = %s RETURNING version;"
+        )
+        assert values[0] == "done"
+        assert json.loads(values[1]) == {"labels": [{"start": 0, "end": 4}, {"start": 5, "end": 9}]}
+        assert values[2:] == [1, 3]
+
+    @patch("src.modules.database_transactions.DB_USE_PREPARED_STATEMENTS", False)
+    @patch("src.modules.database_transactions.psycopg2.connect")
+    def test_patch_content_id(self, mock_connect):
+        # Arrange
+        mock_cursor_obj = mock_connect.return_value.cursor.return_value
+        mock_cursor_obj.fetchone.side_effect = [self.stored_record + (None, None), (4,)]
+        json_input = {
+            "annotation-id": 1,
+            "version": 3,
+            "patch": [{"op": "replace", "path": "/original-data-id", "value": 7}],
+        }
+
+        # Act
+        with app.test_request_context(method="POST", json=json_input):
+            actual_response = patch_annotation_record()
+
+        # Assert
+        assert {"statusCode": 200, "body": {"annotation-id": 1, "version": 4}} == actual_response
+        select_sql = mock_cursor_obj.execute.call_args_list[0].args[0]
+        assert select_sql.startswith(
+            "SELECT version, username, annotationstatus, originaldata, annotateddata, tags,"
+            " originaldataid, annotateddataid FROM annotation"
+        )
+        assert mock_cursor_obj.execute.call_args.args == (
+            "UPDATE annotation SET originaldataid = %s WHERE annotationid = %s AND version = %s RETURNING version;",
+            [7, 1, 3],
+        )
+
+    @pytest.mark.parametrize("version", [2, 3])
+    @patch("src.modules.database_transactions.DB_USE_PREPARED_STATEMENTS", False)
+    @patch("src.modules.database_transactions.psycopg2.connect")
+    def test_version_conflict(self, mock_connect, version):
+        # Arrange
+        # version 2 is out of date when read, version 3 is changed by someone else before the write
+        mock_cursor_obj = mock_connect.return_value.cursor.return_value
+        mock_cursor_obj.fetchone.side_effect = [self.stored_record, None]
+        json_input = {
+            "annotation-id": 1,
+            "version": version,
+            "patch": [{"op": "replace", "path": "/tags", "value": "dog"}],
+        }
+
+        # Act
+        with app.test_request_context(method="POST", json=json_input):
+            actual_response = patch_annotation_record()
+
+        # Assert
+        assert actual_response["statusCode"] == 409
+
+    @pytest.mark.parametrize(
+        "operations",
+        [
+            [{"op": "add", "path": "/version", "value": 10}],
+            [{"op": "add", "path": "/original-data/labels", "value": []}],  # not JSON
+            [{"op": "remove", "path": "/annotated-data/labels/5"}],
+        ],
+    )
+    @patch("src.modules.database_transactions.DB_USE_PREPARED_STATEMENTS", False)
+    @patch("src.modules.database_transactions.psycopg2.connect")
+    def test_invalid_patch(self, mock_connect, operations):
+        # Arrange
+        mock_cursor_obj = mock_connect.return_value.cursor.return_value
+        mock_cursor_obj.fetchone.side_effect = [self.stored_record]
+        json_input = {"annotation-id": 1, "version": 3, "patch": operations}
+
+        # Act
+        with app.test_request_context(method="POST", json=json_input):
+            actual_response = patch_annotation_record()
+
+        # Assert
+        assert actual_response["statusCode"] == 400
+        assert mock_cursor_obj.execute.call_count == 1  # nothing is written
+        mock_connect.return_value.rollback.assert_called()
+
+    @patch("src.modules.database_transactions.DB_USE_PREPARED_STATEMENTS", False)
+    @patch("src.modules.database_transactions.psycopg2.connect")
+    def test_unchanged_annotation(self, mock_connect):
+        # Arrange
+        mock_cursor_obj = mock_connect.return_value.cursor.return_value
+        mock_cursor_obj.fetchone.side_effect = [self.stored_record]
+        json_input = {
+            "annotation-id": 1,
+            "version": 3,
+            "patch": [{"op": "replace", "path": "/tags", "value": "cat"}],
+        }
+
+        # Act
+        with app.test_request_context(method="POST", json=json_input):
+            actual_response = patch_annotation_record()
+
+        # Assert
+        assert {"statusCode": 200, "body": {"annotation-id": 1, "version": 3}} == actual_response
+        assert mock_cursor_obj.execute.call_count == 1
+
+    def test_missing_version(self):
+        # Act
+        with app.test_request_context(method="POST", json={"annotation-id": 1, "patch": []}):
+            actual_response = patch_annotation_record()
+
+        # Assert
+        assert actual_response == {
+            "statusCode": 400,
+            "body": "Missing or incorrect JSON attributes. Error related to extracting key value: 'version'",
+        }
+
+
+class TestClaimAnnotationTasks:
+    @patch("src.modules.database_transactions.DB_USE_PREPARED_STATEMENTS", False)
+    @patch("src.modules.database_transactions.psycopg2.connect")
+    def test_claim_next_task(self, mock_connect):
+        # Arrange
+        mock_cursor_obj = mock_connect.return_value.cursor.return_value
+        mock_cursor_obj.description = [("annotationid",), ("username",), ("annotationstatus",)]
+        mock_cursor_obj.fetchall.return_value = [(9, "fake-name", "in progress"), (4, "fake-name", "in progress")]
+
+        # Act
+        with app.test_request_context(method="POST", json={"user-name": "fake-name", "count": 2}):
+            actual_response = claim_annotation_tasks()
+
+        # Assert
+        assert actual_response == {
+            "statusCode": 200,
+            "body": [
+                {"annotationid": 4, "username": "fake-name", "annotationstatus": "in progress"},
+                {"annotationid": 9, "username": "fake-name", "annotationstatus": "in progress"},
+            ],
+        }
+        mock_cursor_obj.execute.assert_called_with(
+            "WITH claimed AS MATERIALIZED (SELECT annotation.annotationid FROM annotation"
+            " INNER JOIN employee ON annotation.username=employee.username"
+            " WHERE annotation.annotationstatus = %s"
+            " AND employee.team = (SELECT claimer.team FROM employee AS claimer WHERE claimer.username = %s)"
+            " ORDER BY annotation.annotationid LIMIT %s"
+            " FOR UPDATE OF annotation SKIP LOCKED)"
+            " UPDATE annotation SET username = %s, annotationstatus = %s FROM claimed"
+            f" WHERE annotation.annotationid = claimed.annotationid RETURNING {ANNOTATION_FIELDS};",
+            ["to do", "fake-name", 2, "fake-name", "in progress"],
+        )
+        mock_connect.return_value.commit.assert_called()
+
+    @patch("src.modules.annotation_table.ANNOTATION_POOL_USER", "fake-pool")
+    @patch("src.modules.database_transactions.DB_USE_PREPARED_STATEMENTS", False)
+    @patch("src.modules.database_transactions.psycopg2.connect")
+    def test_claim_from_pool(self, mock_connect):
+        # Arrange
+        mock_cursor_obj = mock_connect.return_value.cursor.return_value
+        mock_cursor_obj.fetchall.return_value = []
+
+        # Act
+        with app.test_request_context(method="POST", json={"user-name": "fake-name"}):
+            actual_response = claim_annotation_tasks()
+
+        # Assert
+        assert {"statusCode": 200, "body": []} == actual_response
+        sql, values = mock_cursor_obj.execute.call_args.args
+        assert (
+            " FROM annotation WHERE annotation.annotationstatus = %s AND annotation.username = %s ORDER BY"
+        ) in sql
+        assert values == ["to do", "fake-pool", 1, "fake-name", "in progress"]
+
+    @patch("src.modules.database_transactions.DB_USE_PREPARED_STATEMENTS", False)
+    @patch("src.modules.database_transactions.psycopg2.connect")
+    def test_claim_from_any_team(self, mock_connect):
+        # Arrange
+        mock_cursor_obj = mock_connect.return_value.cursor.return_value
+        mock_cursor_obj.fetchall.return_value = []
+
+        # Act
+        with app.test_request_context(method="POST", json={"user-name": "fake-name", "any-team": True}):
+            actual_response = claim_annotation_tasks()
+
+        # Assert
+        assert {"statusCode": 200, "body": []} == actual_response
+        sql, values = mock_cursor_obj.execute.call_args.args
+        assert " FROM annotation WHERE annotation.annotationstatus = %s ORDER BY" in sql
+        assert values == ["to do", 1, "fake-name", "in progress"]
+
+    @patch("src.modules.database_transactions.DB_USE_PREPARED_STATEMENTS", False)
+    @patch("src.modules.database_transactions.psycopg2.connect")
+    def test_claim_filtered_by_team_and_tags(self, mock_connect):
+        # Arrange
+        mock_cursor_obj = mock_connect.return_value.cursor.return_value
+        mock_cursor_obj.fetchall.return_value = []
+        json_input = {"user-name": "fake-name", "count": 500, "team": "fake-team", "tags": "cat"}
+
+        # Act
+        with app.test_request_context(method="POST", json=json_input):
+            actual_response = claim_annotation_tasks()
+
+        # Assert
+        assert {"statusCode": 200, "body": []} == actual_response
+        sql, values = mock_cursor_obj.execute.call_args.args
+        assert (
+            " FROM annotation INNER JOIN employee ON annotation.username=employee.username"
+            " WHERE annotation.annotationstatus = %s AND employee.team = %s"
+            " AND regexp_split_to_array(lower(annotation.tags), '\\s*,\\s*') @> %s::text[]"
+        ) in sql
+        assert values == ["to do", "fake-team", ["cat"], 100, "fake-name", "in progress"]
+
+    @pytest.mark.parametrize(
+        "json_input, expected_body",
+        [
+            ({}, "Missing or incorrect JSON attributes. Error related to extracting key value: 'user-name'"),
+            ({"user-name": "fake-name", "count": 0}, "count must be at least 1"),
+        ],
+    )
+    @patch("src.modules.annotation_table.database_cursor")
+    def test_invalid_input(self, mock_database_cursor, json_input, expected_body):
+        # Act
+        with app.test_request_context(method="POST", json=json_input):
+            actual_response = claim_annotation_tasks()
+
+        # Assert
+        assert {"statusCode": 400, "body": expected_body} == actual_response
+        mock_database_cursor.assert_not_called()
 
 
 class TestDeleteAnnotationRecord:
@@ -253,3 +1041,159 @@ class TestDeleteAnnotationRecord:
 
             # Assert
             assert expected_response == actual_response
+            mock_delete_record.assert_called_with(
+                "annotation", "WHERE annotationid = %s", [self.valid_json["annotation-id"]]
+            )
+
+
+    @patch("src.modules.annotation_table.get_record_field_from_table")
+    @patch("src.modules.annotation_table.delete_record")
+    def test_deletion_with_version(self, mock_delete_record, mock_get_fields):
+        # Arrange
+        mock_delete_record.return_value = {"statusCode": 200, "body": [(3,)]}
+
+        # Act
+        with app.test_request_context(method="POST", json=dict(self.valid_json, version=3)):
+            actual_response = delete_annotation_record()
+
+        # Assert
+        assert {"statusCode": 200, "body": "Successfully deleted record"} == actual_response
+        mock_delete_record.assert_called_with(
+            "annotation",
+            "WHERE annotationid = %s AND version = %s",
+            ["fake-id", 3],
+            returning="version",
+        )
+        mock_get_fields.assert_not_called()
+
+    @patch("src.modules.annotation_table.get_record_field_from_table")
+    @patch("src.modules.annotation_table.delete_record")
+    def test_deletion_version_conflict(self, mock_delete_record, mock_get_fields):
+        # Arrange
+        mock_delete_record.return_value = {"statusCode": 200, "body": []}
+        mock_get_fields.return_value = {"statusCode": 200, "body": [(4,)]}
+
+        # Act
+        with app.test_request_context(
+            method="POST", json=self.valid_json, headers={"If-Match": 'W/"3"'}
+        ):
+            actual_response = delete_annotation_record()
+
+        # Assert
+        assert actual_response["statusCode"] == 409
+
+
+class TestUpdateAnnotationRecords:
+    valid_json = {
+        "annotation-ids": [1, "2", 3],
+        "changes": {"user-name": "new-user", "annotation-status": "done"},
+    }
+
+    @patch("src.modules.annotation_table.update_fields")
+    def test_success_update_records(self, mock_update_fields):
+        # Arrange
+        mock_update_fields.return_value = {"statusCode": 200, "body": [(1,), (3,)]}
+        expected_response = {
+            "statusCode": 200,
+            "body": {"updated": [1, 3], "not-found": [2]},
+        }
+
+        # Act
+        with app.test_request_context(method="POST", json=self.valid_json):
+            actual_response = update_annotation_records()
+
+        # Assert
+        assert expected_response == actual_response
+        mock_update_fields.assert_called_once_with(
+            "annotation",
+            {"username": "new-user", "annotationstatus": "done"},
+            "WHERE annotationid = ANY(%s)",
+            [[1, 2, 3]],
+            returning="annotationid",
+        )
+
+    @pytest.mark.parametrize(
+        "json_input,expected_status_code",
+        [
+            ({}, 400),
+            ({"annotation-ids": [], "changes": {"tags": "a"}}, 400),
+            ({"annotation-ids": ["abc"], "changes": {"tags": "a"}}, 400),
+            ({"annotation-ids": [1], "changes": {}}, 400),
+            ({"annotation-ids": [1], "changes": {"annotationid": 5}}, 400),
+        ],
+    )
+    @patch("src.modules.annotation_table.update_fields")
+    def test_invalid_input(self, mock_update_fields, json_input, expected_status_code):
+        # Act
+        with app.test_request_context(method="POST", json=json_input):
+            actual_response = update_annotation_records()
+
+        # Assert
+        assert actual_response["statusCode"] == expected_status_code
+        mock_update_fields.assert_not_called()
+
+    @patch("src.modules.annotation_table.update_fields")
+    def test_update_error(self, mock_update_fields):
+        # Arrange
+        mock_update_fields.return_value = {"statusCode": 500, "body": "Error: test-error"}
+
+        # Act
+        with app.test_request_context(method="POST", json=self.valid_json):
+            actual_response = update_annotation_records()
+
+        # Assert
+        assert mock_update_fields.return_value == actual_response
+
+
+class TestDeleteAnnotationRecords:
+    valid_json = {"annotation-ids": [1, 2]}
+
+    @patch("src.modules.annotation_table.delete_record")
+    def test_success_delete_records(self, mock_delete_record):
+        # Arrange
+        mock_delete_record.return_value = {"statusCode": 200, "body": [(2,)]}
+        expected_response = {
+            "statusCode": 200,
+            "body": {"deleted": [2], "not-found": [1]},
+        }
+
+        # Act
+        with app.test_request_context(method="POST", json=self.valid_json):
+            actual_response = delete_annotation_records()
+
+        # Assert
+        assert expected_response == actual_response
+        mock_delete_record.assert_called_once_with(
+            "annotation",
+            "WHERE annotationid = ANY(%s)",
+            [[1, 2]],
+            returning="annotationid",
+        )
+
+    @patch("src.modules.annotation_table.delete_record")
+    def test_invalid_input(self, mock_delete_record):
+        # Arrange
+        expected_response = {
+            "statusCode": 400,
+            "body": "Missing or incorrect JSON attributes. Error related to extracting key value: 'annotation-ids'",
+        }
+
+        # Act
+        with app.test_request_context(method="POST", json={}):
+            actual_response = delete_annotation_records()
+
+        # Assert
+        assert expected_response == actual_response
+        mock_delete_record.assert_not_called()
+
+    @patch("src.modules.annotation_table.delete_record")
+    def test_delete_error(self, mock_delete_record):
+        # Arrange
+        mock_delete_record.return_value = {"statusCode": 500, "body": "Error: test-error"}
+
+        # Act
+        with app.test_request_context(method="POST", json=self.valid_json):
+            actual_response = delete_annotation_records()
+
+        # Assert
+        assert mock_delete_record.return_value == actual_response
@@ -0,0 +1,167 @@
+import asyncio
+from unittest.mock import AsyncMock, patch
+from src.modules.async_annotation_table import (
+    get_all_annotations,
+    get_annotation,
+    update_annotation_record,
+    delete_annotation_record,
+)
+from src.modules.pagination import encode_cursor
+from src.asgi import app
+
+LISTING_FIELDS = (
+    "annotation.annotationid, annotation.version, annotation.username, annotation.annotationstatus,"
+    " annotation.originaldata, annotation.annotateddata, annotation.tags,"
+    " employee.firstname, employee.lastname, employee.team"
+)
+
+
+# Runs the handler inside a Quart request context
+def run_handler(handler, method="GET", **kwargs):
+    async def run():
+        async with app.test_request_context("/", method=method, **kwargs):
+            return await handler()
+
+    return asyncio.run(run())
+
+
+class TestGetAllAnnotations:
+    @patch("src.modules.async_annotation_table.get_record_field_from_table", new_callable=AsyncMock)
+    def test_filtered_annotations(self, mock_get_fields):
+        # Arrange
+        mock_get_fields.return_value = {"statusCode": 200, "body": [{"annotationid": 1}]}
+
+        # Act
+        actual_response = run_handler(get_all_annotations, query_string={"team": "a"})
+
+        # Assert
+        assert mock_get_fields.return_value == actual_response
+        mock_get_fields.assert_awaited_with(
+            "annotation",
+            LISTING_FIELDS,
+            "INNER JOIN employee ON annotation.username=employee.username WHERE employee.team = %s",
+            ["a"],
+            keyed=True,
+            allow_empty=True,
+        )
+
+    @patch("src.modules.async_annotation_table.get_record_page_from_table", new_callable=AsyncMock)
+    def test_page(self, mock_get_page):
+        # Arrange
+        mock_get_page.return_value = {
+            "statusCode": 200,
+            "body": [{"annotationid": 1}, {"annotationid": 2}],
+        }
+
+        # Act
+        actual_response = run_handler(get_all_annotations, query_string={"page-size": 1})
+
+        # Assert
+        assert actual_response["body"]["records"] == [{"annotationid": 1}]
+        assert actual_response["body"]["next-cursor"] == encode_cursor({"annotationid": 1})
+
+
+class TestGetAnnotation:
+    @patch("src.modules.async_annotation_table.get_record_field_from_table", new_callable=AsyncMock)
+    def test_get_annotation(self, mock_get_fields):
+        # Arrange
+        mock_get_fields.return_value = {"statusCode": 200, "body": [{"annotationid": 5}]}
+
+        # Act
+        actual_response = run_handler(get_annotation, query_string={"annotation-id": "5"})
+
+        # Assert
+        assert {"statusCode": 200, "body": {"annotationid": 5}} == actual_response
+        assert mock_get_fields.await_args.args[3] == [5]
+
+    @patch("src.modules.async_annotation_table.get_record_field_from_table", new_callable=AsyncMock)
+    def test_invalid_input(self, mock_get_fields):
+        # Act
+        actual_response = run_handler(get_annotation, query_string={"annotation-id": "abc"})
+
+        # Assert
+        assert actual_response["statusCode"] == 400
+        mock_get_fields.assert_not_awaited()
+
+
+class TestUpdateAnnotationRecord:
+    json_input = {
+        "annotation-id": "5",
+        "user-name": "fake-name",
+        "annotation-status": "fake-status",
+        "original-data": "fake-text",
+        "annotated-data": "fake-text",
+        "tags": "fake-tags",
+    }
+
+    @patch("src.modules.async_annotation_table.update_fields", new_callable=AsyncMock)
+    def test_success_update_record(self, mock_update_fields):
+        # Arrange
+        mock_update_fields.return_value = {"statusCode": 200, "body": [(5,)]}
+
+        # Act
+        actual_response = run_handler(update_annotation_record, "POST", json=self.json_input)
+
+        # Assert
+        assert {"statusCode": 200, "body": "Success updating record"} == actual_response
+        mock_update_fields.assert_awaited_once()
+
+    @patch("src.modules.async_annotation_table.update_fields", new_callable=AsyncMock)
+    def test_record_not_found(self, mock_update_fields):
+        # Arrange
+        mock_update_fields.return_value = {"statusCode": 200, "body": []}
+
+        # Act
+        actual_response = run_handler(update_annotation_record, "POST", json=self.json_input)
+
+        # Assert
+        assert {"statusCode": 500, "body": "Error: no records found"} == actual_response
+
+
+    @patch("src.modules.async_annotation_table.get_record_field_from_table", new_callable=AsyncMock)
+    @patch("src.modules.async_annotation_table.update_fields", new_callable=AsyncMock)
+    def test_version_conflict(self, mock_update_fields, mock_get_fields):
+        # Arrange
+        mock_update_fields.return_value = {"statusCode": 200, "body": []}
+        mock_get_fields.return_value = {"statusCode": 200, "body": [(4,)]}
+
+        # Act
+        actual_response = run_handler(
+            update_annotation_record, "POST", json=self.json_input, headers={"If-Match": '"3"'}
+        )
+
+        # Assert
+        assert actual_response["statusCode"] == 409
+        assert mock_update_fields.await_args.args[2:] == (
+            "WHERE annotationid = %s AND version = %s",
+            [5, 3],
+        )
+
+
+class TestDeleteAnnotationRecord:
+    @patch("src.modules.async_annotation_table.delete_record", new_callable=AsyncMock)
+    def test_successful_deletion(self, mock_delete_record):
+        # Arrange
+        mock_delete_record.return_value = {"statusCode": 200, "body": "Success"}
+
+        # Act
+        actual_response = run_handler(
+            delete_annotation_record, "POST", json={"annotation-id": 3}
+        )
+
+        # Assert
+        assert {"statusCode": 200, "body": "Success"} == actual_response
+        mock_delete_record.assert_awaited_with("annotation", "WHERE annotationid = %s", [3])
+
+    def test_invalid_input(self):
+        # Arrange
+        expected_response = {
+            "statusCode": 400,
+            "body": "Missing or incorrect JSON attributes. Error related to extracting key value: 'annotation-id'",
+        }
+
+        # Act
+        actual_response = run_handler(delete_annotation_record, "POST", json={})
+
+        # Assert
+        assert expected_response == actual_response
@@ -0,0 +1,253 @@
+import asyncio
+import asyncpg
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from src.modules.async_database_transactions import (
+    convert_placeholders,
+    open_async_connection_pool,
+    add_to_table,
+    update_field,
+    update_fields,
+    get_record_field_from_table,
+    get_record_page_from_table,
+    delete_record,
+)
+
+
+# Pool whose acquire() hands out the same mock connection
+def create_mock_pool():
+    mock_connection = MagicMock()
+    mock_connection.execute = AsyncMock()
+    mock_connection.fetch = AsyncMock()
+    mock_pool = MagicMock()
+    mock_pool.acquire.return_value.__aenter__ = AsyncMock(return_value=mock_connection)
+    mock_pool.acquire.return_value.__aexit__ = AsyncMock(return_value=False)
+    return mock_pool, mock_connection
+
+
+@pytest.fixture()
+def mock_connection():
+    mock_pool, mock_connection = create_mock_pool()
+    with patch(
+        "src.modules.async_database_transactions.open_async_connection_pool",
+        AsyncMock(return_value=mock_pool),
+    ):
+        yield mock_connection
+
+
+@pytest.mark.parametrize("use_prepared_statements, expected_cache_size", [(True, 100), (False, 0)])
+def test_pool_statement_cache(use_prepared_statements, expected_cache_size):
+    # Arrange
+    mock_create_pool = AsyncMock()
+
+    # Act
+    with (
+        patch("src.modules.async_database_transactions.asyncpg.create_pool", mock_create_pool),
+        patch("src.modules.async_database_transactions.DB_USE_PREPARED_STATEMENTS", use_prepared_statements),
+        patch("src.modules.async_database_transactions.DB_MAX_PREPARED_STATEMENTS", 100),
+        patch("src.modules.async_database_transactions.async_connection_pool", None),
+    ):
+        asyncio.run(open_async_connection_pool())
+
+    # Assert
+    assert mock_create_pool.call_args.kwargs["statement_cache_size"] == expected_cache_size
+
+
+def test_convert_placeholders():
+    # Act
+    actual_sql = convert_placeholders("SELECT a FROM b WHERE c = %s AND d = ANY(%s);")
+
+    # Assert
+    assert actual_sql == "SELECT a FROM b WHERE c = $1 AND d = ANY($2);"
+
+
+class TestAddToTable:
+    def test_successful_add_to_table(self, mock_connection):
+        # Arrange
+        expected_sql = "INSERT INTO test-table (first-attribute, second-attribute) VALUES ($1, $2);"
+
+        # Act
+        actual_response = asyncio.run(
+            add_to_table("test-table", ["first-attribute", "second-attribute"], ["a", "b"])
+        )
+
+        # Assert
+        mock_connection.execute.assert_awaited_with(expected_sql, "a", "b")
+        assert {"statusCode": 200, "body": "Data successfully added"} == actual_response
+
+    @pytest.mark.parametrize(
+        "expected_response,mock_side_effect",
+        [
+            ({"statusCode": 500, "body": "Error: test-error"}, Exception("test-error")),
+            (
+                {
+                    "statusCode": 500,
+                    "body": "Error with adding to the database. Error: test-error",
+                },
+                asyncpg.PostgresError("test-error"),
+            ),
+        ],
+    )
+    def test_fail_add_to_table(self, mock_connection, expected_response, mock_side_effect):
+        # Arrange
+        mock_connection.execute.side_effect = mock_side_effect
+
+        # Act
+        actual_response = asyncio.run(add_to_table("test-table", ["a"], ["b"]))
+
+        # Assert
+        assert expected_response == actual_response
+
+
+class TestUpdate:
+    def test_update_field(self, mock_connection):
+        # Act
+        actual_response = asyncio.run(
+            update_field("test-table", "test-field", "test-value", "WHERE id = %s", [1])
+        )
+
+        # Assert
+        mock_connection.execute.assert_awaited_with(
+            "UPDATE test-table SET test-field = $1 WHERE id = $2;", "test-value", 1
+        )
+        assert {"statusCode": 200, "body": "Data successfully updated"} == actual_response
+
+    def test_update_fields_returning(self, mock_connection):
+        # Arrange
+        mock_connection.fetch.return_value = [(1,)]
+
+        # Act
+        actual_response = asyncio.run(
+            update_fields(
+                "test-table", {"a": 1, "b": 2}, "WHERE id = %s", [3], returning="id"
+            )
+        )
+
+        # Assert
+        mock_connection.fetch.assert_awaited_with(
+            "UPDATE test-table SET a = $1, b = $2 WHERE id = $3 RETURNING id;", 1, 2, 3
+        )
+        assert {"statusCode": 200, "body": [(1,)]} == actual_response
+
+    def test_fail_update_field(self, mock_connection):
+        # Arrange
+        mock_connection.execute.side_effect = asyncpg.PostgresError("test-error")
+        expected_response = {
+            "statusCode": 500,
+            "body": "Error with database when updating record. Error: test-error",
+        }
+
+        # Act
+        actual_response = asyncio.run(update_field("", "", "", ""))
+
+        # Assert
+        assert expected_response == actual_response
+
+
+class TestRead:
+    def test_get_field(self, mock_connection):
+        # Arrange
+        mock_connection.fetch.return_value = [("first", 1), ("second", 2)]
+
+        # Act
+        actual_response = asyncio.run(
+            get_record_field_from_table("test-table", "a, b", "WHERE c = %s", ["d"])
+        )
+
+        # Assert
+        mock_connection.fetch.assert_awaited_with(
+            "SELECT a, b FROM test-table WHERE c = $1;", "d"
+        )
+        assert {"statusCode": 200, "body": [("first", 1), ("second", 2)]} == actual_response
+
+    def test_get_keyed_field(self, mock_connection):
+        # Arrange
+        mock_connection.fetch.return_value = [{"a": "first", "b": 1}]  # asyncpg records are mappings
+
+        # Act
+        actual_response = asyncio.run(
+            get_record_field_from_table("test-table", "a, b", "", keyed=True)
+        )
+
+        # Assert
+        assert {"statusCode": 200, "body": [{"a": "first", "b": 1}]} == actual_response
+
+    def test_no_field_found(self, mock_connection):
+        # Arrange
+        mock_connection.fetch.return_value = []
+
+        # Act
+        actual_response = asyncio.run(get_record_field_from_table("test-table", "a", ""))
+
+        # Assert
+        assert {"statusCode": 500, "body": "Error: no records found"} == actual_response
+
+    def test_no_field_found_allowed(self, mock_connection):
+        # Arrange
+        mock_connection.fetch.return_value = []
+
+        # Act
+        actual_response = asyncio.run(
+            get_record_field_from_table("test-table", "a", "", allow_empty=True)
+        )
+
+        # Assert
+        assert {"statusCode": 200, "body": []} == actual_response
+
+    def test_get_page(self, mock_connection):
+        # Arrange
+        mock_connection.fetch.return_value = []
+
+        # Act
+        actual_response = asyncio.run(
+            get_record_page_from_table("test-table", "a", "WHERE b > %s ORDER BY b", [5], 10)
+        )
+
+        # Assert
+        mock_connection.fetch.assert_awaited_with(
+            "SELECT a FROM test-table WHERE b > $1 ORDER BY b LIMIT $2;", 5, 10
+        )
+        assert {"statusCode": 200, "body": []} == actual_response
+
+
+class TestDeleteRecord:
+    def test_successful_delete(self, mock_connection):
+        # Act
+        actual_response = asyncio.run(
+            delete_record("test-table", "WHERE id = %s", [1])
+        )
+
+        # Assert
+        mock_connection.execute.assert_awaited_with(
+            "DELETE FROM test-table WHERE id = $1;", 1
+        )
+        assert {"statusCode": 200, "body": "Successfully deleted record"} == actual_response
+
+    def test_delete_returning(self, mock_connection):
+        # Arrange
+        mock_connection.fetch.return_value = [(3,)]
+
+        # Act
+        actual_response = asyncio.run(
+            delete_record("test-table", "WHERE id = %s", [1], returning="version")
+        )
+
+        # Assert
+        mock_connection.fetch.assert_awaited_with(
+            "DELETE FROM test-table WHERE id = $1 RETURNING version;", 1
+        )
+        assert {"statusCode": 200, "body": [(3,)]} == actual_response
+
+    def test_fail_delete(self, mock_connection):
+        # Arrange
+        mock_connection.execute.side_effect = asyncpg.PostgresError("test-error")
+        expected_response = {
+            "statusCode": 500,
+            "body": "Error with deleting from the database: test-error",
+        }
+
+        # Act
+        actual_response = asyncio.run(delete_record("", ""))
+
+        # Assert
+        assert expected_response == actual_response
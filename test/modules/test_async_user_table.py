@@ -0,0 +1,63 @@
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, patch
+from src.modules.async_user_table import get_user_password, get_user_access_level
+from src.modules.user_table import employee_cache
+from src.asgi import app
+
+
+@pytest.fixture(autouse=True)
+def clear_employee_cache():
+    employee_cache.clear()
+    yield
+    employee_cache.clear()
+
+
+# Runs the handler inside a Quart request context
+def run_handler(handler, json_input):
+    async def run():
+        async with app.test_request_context("/", method="POST", json=json_input):
+            return await handler()
+
+    return asyncio.run(run())
+
+
+class TestGetUserPassword:
+    @patch("src.modules.async_user_table.get_record_field_from_table", new_callable=AsyncMock)
+    def test_return_user_password(self, mock_get_field):
+        # Arrange
+        mock_get_field.return_value = {"statusCode": 200, "body": [("fake-password",)]}
+
+        # Act
+        actual_response = run_handler(get_user_password, {"user-name": "test-user"})
+
+        # Assert
+        assert mock_get_field.return_value == actual_response
+        mock_get_field.assert_awaited_with(
+            "employee", "password", "WHERE username = %s", ["test-user"]
+        )
+
+    def test_invalid_input(self):
+        # Act
+        actual_response = run_handler(get_user_password, {})
+
+        # Assert
+        assert {"statusCode": 400, "body": "Missing user name in request"} == actual_response
+
+
+class TestGetUserAccessLevel:
+    @patch("src.modules.async_user_table.get_record_field_from_table", new_callable=AsyncMock)
+    def test_access_level_cached(self, mock_get_field):
+        # Arrange
+        mock_get_field.return_value = {
+            "statusCode": 200,
+            "body": [(True, "test-team", "test-first", "test-last")],
+        }
+
+        # Act
+        run_handler(get_user_access_level, {"user-name": "test-user"})
+        actual_response = run_handler(get_user_access_level, {"user-name": "test-user"})
+
+        # Assert
+        assert {"statusCode": 200, "body": [(True,)]} == actual_response
+        mock_get_field.assert_awaited_once()
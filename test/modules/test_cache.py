@@ -0,0 +1,83 @@
+from unittest.mock import patch
+from prometheus_client import REGISTRY
+from src.modules.cache import TTLCache
+
+
+def get_sample(name, labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+class TestTTLCache:
+    def test_get_and_set(self):
+        # Arrange
+        cache = TTLCache(max_size=2, ttl=60)
+
+        # Act
+        cache.set("key", "value")
+
+        # Assert
+        assert cache.get("key") == "value"
+        assert cache.get("missing-key") is None
+        assert cache.stats() == {"hits": 1, "misses": 1, "size": 1}
+
+    def test_entry_expires(self):
+        # Arrange
+        cache = TTLCache(max_size=2, ttl=60)
+        with patch("src.modules.cache.time.monotonic", return_value=100):
+            cache.set("key", "value")
+
+        # Act
+        with patch("src.modules.cache.time.monotonic", return_value=161):
+            value = cache.get("key")
+
+        # Assert
+        assert value is None
+        assert cache.stats()["size"] == 0
+
+    def test_least_recently_used_evicted(self):
+        # Arrange
+        cache = TTLCache(max_size=2, ttl=60)
+        cache.set("first-key", 1)
+        cache.set("second-key", 2)
+        cache.get("first-key")
+
+        # Act
+        cache.set("third-key", 3)
+
+        # Assert
+        assert cache.get("first-key") == 1
+        assert cache.get("second-key") is None
+        assert cache.get("third-key") == 3
+
+    def test_invalidate(self):
+        # Arrange
+        cache = TTLCache(max_size=2, ttl=60)
+        cache.set("key", "value")
+
+        # Act
+        cache.invalidate("key")
+        cache.invalidate("missing-key")
+
+        # Assert
+        assert cache.get("key") is None
+
+    def test_named_cache_metrics(self):
+        # Arrange
+        cache = TTLCache(max_size=2, ttl=60, name="fake-cache")
+        hits_before = get_sample("cache_lookups_total", {"cache": "fake-cache", "result": "hit"})
+        misses_before = get_sample("cache_lookups_total", {"cache": "fake-cache", "result": "miss"})
+
+        # Act
+        cache.set("first-key", 1)
+        cache.set("second-key", 2)
+        cache.set("third-key", 3)
+        cache.get("third-key")
+        cache.get("first-key")
+        cache.get("missing-key")
+
+        # Assert
+        assert get_sample("cache_lookups_total", {"cache": "fake-cache", "result": "hit"}) - hits_before == 1
+        assert get_sample("cache_lookups_total", {"cache": "fake-cache", "result": "miss"}) - misses_before == 2
+        assert get_sample("cache_entries", {"cache": "fake-cache"}) == 2
+        cache.invalidate("third-key")
+        assert get_sample("cache_entries", {"cache": "fake-cache"}) == 1
@@ -0,0 +1,202 @@
+import json
+import pytest
+from unittest.mock import patch
+from datetime import datetime, timezone
+from src.modules.change_feed import ChangeListener, format_event, read_changes
+from src.modules.pagination import encode_cursor
+from src.app import app
+
+
+# Listener that never receives notifications
+class FakeListener:
+    generation = 0
+
+    def __init__(self):
+        self.waits = []
+
+    def wait(self, generation, timeout):
+        self.waits.append(timeout)
+        return generation
+
+
+@pytest.fixture
+def listener():
+    fake_listener = FakeListener()
+    with patch("src.modules.change_feed.get_change_listener", return_value=fake_listener):
+        yield fake_listener
+
+
+def get_change_records(*records):
+    return {
+        "statusCode": 200,
+        "body": [
+            {
+                "annotationid": annotation_id,
+                "tags": tags,
+                "changetransaction": 700,
+                "changeid": change_id,
+                "changedannotationid": changed_annotation_id,
+                "operation": operation,
+            }
+            for annotation_id, tags, change_id, changed_annotation_id, operation in records
+        ],
+    }
+
+
+class TestReadChanges:
+    @patch("src.modules.change_feed.get_record_page_from_table")
+    def test_events(self, mock_get_page):
+        # Arrange
+        mock_get_page.return_value = get_change_records(
+            (4, "cat", 10, 4, "update"), (None, None, 11, 5, "delete")
+        )
+
+        # Act
+        actual_response = read_changes({"transaction": 650, "change": 3}, "annotation.annotationid, annotation.tags")
+
+        # Assert
+        assert actual_response == {
+            "statusCode": 200,
+            "body": {
+                "events": [
+                    {
+                        "id": encode_cursor({"transaction": 700, "change": 10}),
+                        "operation": "update",
+                        "annotation-id": 4,
+                        "annotation": {"annotationid": 4, "tags": "cat"},
+                    },
+                    {
+                        "id": encode_cursor({"transaction": 700, "change": 11}),
+                        "operation": "delete",
+                        "annotation-id": 5,
+                        "annotation": None,
+                    },
+                ],
+                "position": {"transaction": 700, "change": 11},
+            },
+        }
+        table_name, fields, condition, values, page_size = mock_get_page.call_args.args
+        assert table_name == "annotation_change"
+        assert (
+            " WHERE (annotation_change.transactionid, annotation_change.changeid) > (%s, %s)"
+            " AND annotation_change.transactionid < pg_snapshot_xmin(pg_current_snapshot())::text::bigint"
+            " ORDER BY annotation_change.transactionid, annotation_change.changeid"
+        ) in condition
+        assert values == [650, 3]
+
+    @patch("src.modules.change_feed.get_record_page_from_table")
+    def test_no_events(self, mock_get_page):
+        # Arrange
+        mock_get_page.return_value = {"statusCode": 200, "body": []}
+
+        # Act
+        actual_response = read_changes({"transaction": 650, "change": 3}, "annotation.*")
+
+        # Assert
+        assert actual_response["body"] == {"events": [], "position": {"transaction": 650, "change": 3}}
+
+
+class TestFormatEvent:
+    def test_dates_formatted_like_listings(self):
+        # Arrange
+        event = {
+            "id": "a",
+            "operation": "update",
+            "annotation-id": 4,
+            "annotation": {"annotationid": 4, "updatedat": datetime(2026, 10, 18, 10, 0, tzinfo=timezone.utc)},
+        }
+
+        # Act
+        lines = format_event(event, app.json).split("\n")
+
+        # Assert
+        assert lines[:2] == ["id: a", "event: update"]
+        data = json.loads(lines[2][len("data: "):])
+        assert data["annotation"]["updatedat"] == "Sun, 18 Oct 2026 10:00:00 GMT"
+
+
+class TestGetAnnotationChanges:
+    last_event_id = encode_cursor({"transaction": 650, "change": 3})
+
+    @patch("src.modules.change_feed.get_record_page_from_table")
+    def test_long_poll_with_changes(self, mock_get_page, listener):
+        # Arrange
+        mock_get_page.return_value = get_change_records((4, "cat", 10, 4, "insert"))
+
+        # Act
+        response = app.test_client().get(f"/annotation_changes?last-event-id={self.last_event_id}")
+
+        # Assert
+        body = response.get_json()["body"]
+        assert [event["annotation-id"] for event in body["events"]] == [4]
+        assert body["last-event-id"] == encode_cursor({"transaction": 700, "change": 10})
+        assert listener.waits == []
+
+    @patch("src.modules.change_feed.CHANGE_FEED_POLL_INTERVAL", 0)
+    @patch("src.modules.change_feed.get_record_page_from_table")
+    def test_long_poll_timeout(self, mock_get_page, listener):
+        # Arrange
+        mock_get_page.return_value = {"statusCode": 200, "body": []}
+
+        # Act
+        response = app.test_client().get(
+            "/annotation_changes?wait=0.01", headers={"Last-Event-ID": self.last_event_id}
+        )
+
+        # Assert
+        assert response.get_json()["body"] == {"events": [], "last-event-id": self.last_event_id}
+        assert listener.waits
+
+    @patch("src.modules.change_feed.get_current_position")
+    @patch("src.modules.change_feed.CHANGE_FEED_STREAM_DURATION", 0.05)
+    @patch("src.modules.change_feed.CHANGE_FEED_POLL_INTERVAL", 0)
+    @patch("src.modules.change_feed.get_record_page_from_table")
+    def test_event_stream(self, mock_get_page, mock_get_position, listener):
+        # Arrange
+        mock_get_position.return_value = {"transaction": 650, "change": 0}
+        pages = iter([get_change_records((4, "cat", 10, 4, "update"))])
+        mock_get_page.side_effect = lambda *args, **kwargs: next(
+            pages, {"statusCode": 200, "body": []}
+        )
+
+        # Act
+        response = app.test_client().get(
+            "/annotation_changes?fields=tags", headers={"Accept": "text/event-stream"}
+        )
+        body = response.get_data(as_text=True)
+
+        # Assert
+        assert response.mimetype == "text/event-stream"
+        first_event = body.split("\n\n")[1].split("\n")
+        assert first_event[0] == f"id: {encode_cursor({'transaction': 700, 'change': 10})}"
+        assert first_event[1] == "event: update"
+        assert json.loads(first_event[2][len("data: "):])["annotation"] == {"annotationid": 4, "tags": "cat"}
+        assert ": heartbeat" in body
+        # the next read starts after the event that was sent
+        assert mock_get_page.call_args_list[1].args[3] == [700, 10]
+
+    @pytest.mark.parametrize(
+        "query_string",
+        ["?last-event-id=invalid", "?fields=password", "?wait=soon", "?wait=nan", "?wait=inf"],
+    )
+    def test_invalid_parameters(self, query_string, listener):
+        # Act
+        response = app.test_client().get(f"/annotation_changes{query_string}")
+
+        # Assert
+        assert response.get_json()["statusCode"] == 400
+
+
+class TestChangeListener:
+    def test_wait_for_notification(self):
+        # Arrange
+        change_listener = ChangeListener()
+        change_listener.notify()
+
+        # Act
+        latest_generation = change_listener.wait(0, 1)
+        unchanged_generation = change_listener.wait(latest_generation, 0.01)
+
+        # Assert
+        assert latest_generation == 1
+        assert unchanged_generation == 1
@@ -0,0 +1,165 @@
+import threading
+from unittest.mock import MagicMock, patch
+
+import psycopg2
+import pytest
+from psycopg2.pool import PoolError
+from src.modules.connection_pool import ConnectionPool, PoolTimeoutError
+
+
+def create_mock_connection():
+    mock_connection = MagicMock()
+    mock_connection.closed = 0  # 0 indicates connection is open
+    mock_connection.info.transaction_status = 0  # 0 indicates no transaction in progress
+    return mock_connection
+
+
+class TestConnectionPool:
+    def test_min_size_connections_created(self):
+        # Arrange
+        mock_factory = MagicMock(side_effect=create_mock_connection)
+
+        # Act
+        ConnectionPool(mock_factory, min_size=3, max_size=5)
+
+        # Assert
+        assert mock_factory.call_count == 3
+
+    @pytest.mark.parametrize("min_size,max_size", [(-1, 5), (2, 0), (6, 5)])
+    def test_invalid_pool_size(self, min_size, max_size):
+        # Act & Assert
+        with pytest.raises(ValueError):
+            ConnectionPool(create_mock_connection, min_size=min_size, max_size=max_size)
+
+    def test_connection_reused(self):
+        # Arrange
+        mock_factory = MagicMock(side_effect=create_mock_connection)
+        pool = ConnectionPool(mock_factory, min_size=0, max_size=5)
+
+        # Act
+        first_connection = pool.get_connection()
+        pool.put_connection(first_connection)
+        second_connection = pool.get_connection()
+
+        # Assert
+        assert first_connection is second_connection
+        mock_factory.assert_called_once()
+
+    def test_timeout_when_exhausted(self):
+        # Arrange
+        pool = ConnectionPool(create_mock_connection, min_size=0, max_size=1, timeout=0.01)
+        pool.get_connection()
+
+        # Act & Assert
+        with pytest.raises(PoolTimeoutError):
+            pool.get_connection()
+
+    def test_waits_for_returned_connection(self):
+        # Arrange
+        pool = ConnectionPool(create_mock_connection, min_size=0, max_size=1, timeout=5)
+        connection = pool.get_connection()
+        threading.Timer(0.05, pool.put_connection, [connection]).start()
+
+        # Act
+        returned_connection = pool.get_connection()
+
+        # Assert
+        assert returned_connection is connection
+
+    def test_closed_connection_replaced(self):
+        # Arrange
+        mock_factory = MagicMock(side_effect=create_mock_connection)
+        pool = ConnectionPool(mock_factory, min_size=1, max_size=1)
+        pool._idle_connections[0][0].closed = 1
+
+        # Act
+        connection = pool.get_connection()
+
+        # Assert
+        assert connection.closed == 0
+        assert mock_factory.call_count == 2
+
+    def test_stale_connection_health_checked(self):
+        # Arrange
+        mock_factory = MagicMock(side_effect=create_mock_connection)
+        pool = ConnectionPool(mock_factory, min_size=1, max_size=1, health_check_interval=0)
+        stale_connection = pool._idle_connections[0][0]
+        stale_cursor = stale_connection.cursor.return_value.__enter__.return_value
+        stale_cursor.execute.side_effect = psycopg2.OperationalError("server closed")
+
+        # Act
+        connection = pool.get_connection()
+
+        # Assert
+        stale_cursor.execute.assert_called_with("SELECT 1;")
+        stale_connection.close.assert_called()
+        assert connection is not stale_connection
+
+    def test_recently_used_connection_not_health_checked(self):
+        # Arrange
+        pool = ConnectionPool(create_mock_connection, min_size=1, max_size=1)
+
+        # Act
+        connection = pool.get_connection()
+
+        # Assert
+        connection.cursor.assert_not_called()
+
+    def test_connection_in_transaction_rolled_back(self):
+        # Arrange
+        pool = ConnectionPool(create_mock_connection, min_size=0, max_size=1)
+        connection = pool.get_connection()
+        connection.info.transaction_status = 2  # 2 indicates inside a transaction block
+
+        def rollback():
+            connection.info.transaction_status = 0
+
+        connection.rollback.side_effect = rollback
+
+        # Act
+        pool.put_connection(connection)
+
+        # Assert
+        connection.rollback.assert_called_once()
+        assert pool.get_connection() is connection
+
+    def test_failed_connect_frees_slot(self):
+        # Arrange
+        mock_factory = MagicMock(
+            side_effect=[psycopg2.OperationalError("error"), create_mock_connection()]
+        )
+        pool = ConnectionPool(mock_factory, min_size=0, max_size=1, timeout=0.01)
+
+        # Act
+        with pytest.raises(psycopg2.OperationalError):
+            pool.get_connection()
+        connection = pool.get_connection()
+
+        # Assert
+        assert connection.closed == 0
+
+    def test_close_pool(self):
+        # Arrange
+        pool = ConnectionPool(create_mock_connection, min_size=2, max_size=2)
+        idle_connections = [connection for connection, _ in pool._idle_connections]
+
+        # Act
+        pool.close()
+
+        # Assert
+        for connection in idle_connections:
+            connection.close.assert_called_once()
+        with pytest.raises(PoolError):
+            pool.get_connection()
+
+    def test_connections_not_closed_in_forked_process(self):
+        # Arrange
+        pool = ConnectionPool(create_mock_connection, min_size=0, max_size=1)
+        connection = pool.get_connection()
+
+        # Act
+        with patch("src.modules.connection_pool.os.getpid", return_value=pool.pid + 1):
+            pool.put_connection(connection)
+
+        # Assert
+        connection.close.assert_not_called()
@@ -0,0 +1,198 @@
+import hashlib
+import io
+import pytest
+from unittest.mock import patch
+from src.modules.content_storage import store_content
+from src.modules.database_transactions import close_connection_pool
+from src.app import app
+
+
+@pytest.fixture(autouse=True)
+def small_chunks():
+    close_connection_pool()
+    with patch("src.modules.content_storage.CONTENT_CHUNK_SIZE", 4), patch(
+        "src.modules.database_transactions.DB_USE_PREPARED_STATEMENTS", False
+    ):
+        yield
+    close_connection_pool()
+
+
+# Chunks returned by get_record_stream_from_table
+class FakeChunkStream:
+    def __init__(self, chunks):
+        self.chunks = iter(chunks)
+        self.closed = False
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return next(self.chunks)
+
+    def close(self):
+        self.closed = True
+
+
+# Stream returning at most the next of its reads at a time, like a socket
+class ShortReadStream:
+    def __init__(self, reads):
+        self.reads = list(reads)
+
+    def read(self, size):
+        if not self.reads:
+            return b""
+        data = self.reads.pop(0)
+        if len(data) > size:
+            self.reads.insert(0, data[size:])
+        return data[:size]
+
+
+class TestStoreContent:
+    @patch("src.modules.database_transactions.psycopg2.connect")
+    def test_content_stored_in_chunks(self, mock_connect):
+        # Arrange
+        mock_cursor_obj = mock_connect.return_value.cursor.return_value
+        mock_cursor_obj.fetchone.side_effect = [(7,), None]  # new content id, no existing copy
+        content_hash = hashlib.sha256(b"abcdefghij").hexdigest()
+
+        # Act
+        actual_response = store_content(io.BytesIO(b"abcdefghij"))
+
+        # Assert
+        assert {"statusCode": 200, "body": {"content-id": 7, "hash": content_hash}} == actual_response
+        chunk_inserts = [
+            call.args[1]
+            for call in mock_cursor_obj.execute.call_args_list
+            if call.args[0].startswith("INSERT INTO content_chunk")
+        ]
+        assert [(values[1], bytes(values[2].adapted)) for values in chunk_inserts] == [
+            (0, b"abcd"),
+            (1, b"efgh"),
+            (2, b"ij"),
+        ]
+        mock_cursor_obj.execute.assert_called_with(
+            "UPDATE content SET hash = %s, size = %s WHERE contentid = %s;",
+            [content_hash, 10, 7],
+        )
+        mock_connect.return_value.commit.assert_called()
+
+    @patch("src.modules.database_transactions.psycopg2.connect")
+    def test_short_reads_fill_chunks(self, mock_connect):
+        # Arrange
+        mock_cursor_obj = mock_connect.return_value.cursor.return_value
+        mock_cursor_obj.fetchone.side_effect = [(7,), None]
+        stream = ShortReadStream([b"ab", b"c", b"defg", b"h", b"ij"])
+
+        # Act
+        store_content(stream)
+
+        # Assert
+        chunk_inserts = [
+            call.args[1]
+            for call in mock_cursor_obj.execute.call_args_list
+            if call.args[0].startswith("INSERT INTO content_chunk")
+        ]
+        assert [(values[1], bytes(values[2].adapted)) for values in chunk_inserts] == [
+            (0, b"abcd"),
+            (1, b"efgh"),
+            (2, b"ij"),
+        ]
+        mock_cursor_obj.execute.assert_called_with(
+            "UPDATE content SET hash = %s, size = %s WHERE contentid = %s;",
+            [hashlib.sha256(b"abcdefghij").hexdigest(), 10, 7],
+        )
+
+    @patch("src.modules.database_transactions.psycopg2.connect")
+    def test_duplicate_content_rolled_back(self, mock_connect):
+        # Arrange
+        mock_cursor_obj = mock_connect.return_value.cursor.return_value
+        mock_cursor_obj.fetchone.side_effect = [(7,), (3,)]  # content is already stored as 3
+
+        # Act
+        actual_response = store_content(io.BytesIO(b"abc"))
+
+        # Assert
+        assert actual_response["body"]["content-id"] == 3
+        mock_connect.return_value.rollback.assert_called()
+        mock_connect.return_value.commit.assert_not_called()
+
+
+class TestDownloadContent:
+    details = {"statusCode": 200, "body": [{"hash": "content-hash", "size": 10}]}
+    chunks = [{"chunkindex": 0, "data": b"abcd"}, {"chunkindex": 1, "data": b"efgh"}]
+
+    @patch("src.modules.content_storage.get_record_stream_from_table")
+    @patch("src.modules.content_storage.get_content_details")
+    def test_download_range(self, mock_get_details, mock_get_stream):
+        # Arrange
+        mock_get_details.return_value = self.details
+        chunk_stream = FakeChunkStream(self.chunks)
+        mock_get_stream.return_value = {"statusCode": 200, "body": chunk_stream}
+
+        # Act
+        response = app.test_client().get(
+            "/get_content?content-id=1", headers={"Range": "bytes=3-6"}
+        )
+
+        # Assert
+        assert response.status_code == 206
+        assert response.get_data() == b"defg"
+        assert response.headers["Content-Range"] == "bytes 3-6/10"
+        assert response.headers["ETag"] == '"content-hash"'
+        assert mock_get_stream.call_args.args[3] == [1, 0, 1]  # only chunks 0 and 1 are read
+        assert chunk_stream.closed
+
+    @patch("src.modules.content_storage.get_record_stream_from_table")
+    @patch("src.modules.content_storage.get_content_details")
+    def test_download_whole_content(self, mock_get_details, mock_get_stream):
+        # Arrange
+        mock_get_details.return_value = self.details
+        chunks = self.chunks + [{"chunkindex": 2, "data": b"ij"}]
+        mock_get_stream.return_value = {"statusCode": 200, "body": FakeChunkStream(chunks)}
+
+        # Act
+        response = app.test_client().get("/get_content?content-id=1")
+
+        # Assert
+        assert response.status_code == 200
+        assert response.get_data() == b"abcdefghij"
+        assert response.headers["Accept-Ranges"] == "bytes"
+
+    @patch("src.modules.content_storage.get_record_stream_from_table")
+    @patch("src.modules.content_storage.get_content_details")
+    def test_unsatisfiable_range(self, mock_get_details, mock_get_stream):
+        # Arrange
+        mock_get_details.return_value = self.details
+
+        # Act
+        response = app.test_client().get(
+            "/get_content?content-id=1", headers={"Range": "bytes=20-30"}
+        )
+
+        # Assert
+        assert response.status_code == 416
+        assert response.headers["Content-Range"] == "bytes */10"
+        mock_get_stream.assert_not_called()
+
+    @patch("src.modules.content_storage.get_record_stream_from_table")
+    @patch("src.modules.content_storage.get_content_details")
+    def test_not_modified(self, mock_get_details, mock_get_stream):
+        # Arrange
+        mock_get_details.return_value = self.details
+
+        # Act
+        response = app.test_client().get(
+            "/get_content?content-id=1", headers={"If-None-Match": '"content-hash"'}
+        )
+
+        # Assert
+        assert response.status_code == 304
+        mock_get_stream.assert_not_called()
+
+    @pytest.mark.parametrize("query_string", ["", "?content-id=abc"])
+    def test_invalid_content_id(self, query_string):
+        # Act
+        response = app.test_client().get(f"/get_content{query_string}")
+
+        # Assert
+        assert response.get_json()["statusCode"] == 400
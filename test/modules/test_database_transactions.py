@@ -3,13 +3,89 @@ from src.config import DB_NAME, DB_HOST, DB_USER, DB_PASSWORD
 from src.modules.database_transactions import (
     get_database_connection,
     end_database_connection,
+    get_connection_pool,
+    close_connection_pool,
+    reset_connection_pool_after_fork,
     add_to_table,
+    add_many_to_table,
     get_record_field_from_table,
+    get_record_page_from_table,
+    get_record_stream_from_table,
     update_field,
+    update_fields,
     delete_record,
+    execute_statement,
 )
 import psycopg2
-from unittest.mock import patch
+from unittest.mock import MagicMock, patch
+
+
+# The connection pool is process wide so each test starts with a fresh one
+@pytest.fixture(autouse=True)
+def reset_connection_pool():
+    close_connection_pool()
+    yield
+    close_connection_pool()
+
+
+# Statements are run directly so tests can check the SQL text, TestExecuteStatement covers preparing them
+@pytest.fixture(autouse=True)
+def disable_prepared_statements():
+    with patch("src.modules.database_transactions.DB_USE_PREPARED_STATEMENTS", False):
+        yield
+
+
+class TestConnectionPool:
+    @patch("src.modules.database_transactions.psycopg2.connect")
+    def test_pool_shared_between_calls(self, mock_connect):
+        # Act
+        first_pool = get_connection_pool()
+        second_pool = get_connection_pool()
+
+        # Assert
+        assert first_pool is second_pool
+        mock_connect.assert_called_once()
+
+    @patch("src.modules.database_transactions.psycopg2.connect")
+    def test_connections_reused(self, mock_connect):
+        # Arrange
+        mock_connect.return_value.closed = 0
+        mock_connect.return_value.info.transaction_status = 0
+
+        # Act
+        add_to_table("test-table", ["attribute"], ["value"])
+        delete_record("test-table", "")
+
+        # Assert
+        mock_connect.assert_called_once()
+
+    @patch("src.modules.database_transactions.psycopg2.connect")
+    def test_connection_returned_after_error(self, mock_connect):
+        # Arrange
+        mock_connect.return_value.closed = 0
+        mock_connect.return_value.info.transaction_status = 0
+        mock_cursor_obj = mock_connect.return_value.cursor.return_value
+        mock_cursor_obj.execute.side_effect = psycopg2.Error("test-error")
+
+        # Act
+        delete_record("test-table", "")
+
+        # Assert
+        mock_connect.return_value.rollback.assert_called()
+        assert get_connection_pool()._idle_connections[0][0] == mock_connect.return_value
+
+    @patch("src.modules.database_transactions.psycopg2.connect")
+    def test_new_pool_after_fork(self, mock_connect):
+        # Arrange
+        parent_pool = get_connection_pool()
+
+        # Act
+        reset_connection_pool_after_fork()
+        child_pool = get_connection_pool()
+
+        # Assert
+        assert parent_pool is not child_pool
+        mock_connect.return_value.close.assert_not_called()
 
 
 class TestGetDatabaseConnection:
@@ -126,6 +202,80 @@ class TestAddToTable:
             assert expected_response == actual_response
 
 
+class TestAddManyToTable:
+    expected_sql = "INSERT INTO test-table (first-attribute, second-attribute) VALUES %s RETURNING id;"
+
+    @patch("src.modules.database_transactions.execute_values")
+    def test_rows_added_in_chunks(self, mock_execute_values):
+        # Arrange
+        with patch(
+            "src.modules.database_transactions.psycopg2.connect"
+        ) as mock_connect:
+            mock_connection_obj = (
+                mock_connect.return_value
+            )  # connection object returned from psycopg2.connect
+            mock_cursor_obj = (
+                mock_connection_obj.cursor.return_value
+            )  # cursor object returned from connection obj
+            mock_execute_values.side_effect = [[(1,), (2,)], [(3,)]]
+            rows = (row for row in [["a", "b"], ["c", "d"], ["e", "f"]])
+            expected_response = {"statusCode": 200, "body": [(1,), (2,), (3,)]}
+
+            # Act
+            actual_response = add_many_to_table(
+                "test-table", ["first-attribute", "second-attribute"], rows, "id", 2
+            )
+
+            # Assert
+            assert expected_response == actual_response
+            assert mock_execute_values.call_count == 2
+            mock_execute_values.assert_any_call(
+                mock_cursor_obj, self.expected_sql, [["a", "b"], ["c", "d"]], page_size=2, fetch=True
+            )
+            mock_execute_values.assert_called_with(
+                mock_cursor_obj, self.expected_sql, [["e", "f"]], page_size=2, fetch=True
+            )
+            mock_connection_obj.commit.assert_called_once()
+
+    @patch("src.modules.database_transactions.execute_values")
+    def test_invalid_row_rolls_back(self, mock_execute_values):
+        # Arrange
+        with patch(
+            "src.modules.database_transactions.psycopg2.connect"
+        ) as mock_connect:
+            mock_connection_obj = mock_connect.return_value
+
+            def rows():
+                yield ["a", "b"]
+                raise ValueError("test-error")
+
+            # Act
+            actual_response = add_many_to_table(
+                "test-table", ["first-attribute", "second-attribute"], rows(), "id", 1
+            )
+
+            # Assert
+            assert {"statusCode": 500, "body": "Error: test-error"} == actual_response
+            mock_connection_obj.rollback.assert_called()
+            mock_connection_obj.commit.assert_not_called()
+
+    @patch("src.modules.database_transactions.execute_values")
+    def test_fail_add_many_to_table(self, mock_execute_values):
+        # Arrange
+        with patch("src.modules.database_transactions.psycopg2.connect"):
+            mock_execute_values.side_effect = psycopg2.Error("test-error")
+            expected_response = {
+                "statusCode": 500,
+                "body": "Error with adding to the database. Error: test-error",
+            }
+
+            # Act
+            actual_response = add_many_to_table("test-table", ["a"], [["b"]], "id", 1)
+
+            # Assert
+            assert expected_response == actual_response
+
+
 class TestGetFieldFromTable:
     @pytest.mark.parametrize("condition", ["", "WHERE test-condition"])
     def test_get_field(self, condition):
@@ -150,9 +300,27 @@ class TestGetFieldFromTable:
             actual_response = get_record_field_from_table(table_name, field, condition)
 
             # Assert
-            mock_cursor_obj.execute.assert_called_with(expected_sql)
+            mock_cursor_obj.execute.assert_called_with(expected_sql, None)
             assert expected_response == actual_response
 
+    def test_get_field_with_values(self):
+        # Arrange
+        with patch(
+            "src.modules.database_transactions.psycopg2.connect"
+        ) as mock_connect:
+            mock_cursor_obj = mock_connect.return_value.cursor.return_value
+            mock_cursor_obj.fetchall.return_value = "mock response"
+
+            expected_sql = "SELECT test-field FROM test-table WHERE name = %s;"
+
+            # Act
+            get_record_field_from_table(
+                "test-table", "test-field", "WHERE name = %s", ["test-name"]
+            )
+
+            # Assert
+            mock_cursor_obj.execute.assert_called_with(expected_sql, ["test-name"])
+
     def test_no_field_found(self):
         # Arrange
         with patch(
@@ -175,9 +343,25 @@ class TestGetFieldFromTable:
             actual_response = get_record_field_from_table(table_name, field, "")
 
             # Assert
-            mock_cursor_obj.execute.assert_called_with(expected_sql)
+            mock_cursor_obj.execute.assert_called_with(expected_sql, None)
             assert expected_response == actual_response
 
+    def test_no_field_found_allowed(self):
+        # Arrange
+        with patch(
+            "src.modules.database_transactions.psycopg2.connect"
+        ) as mock_connect:
+            mock_cursor_obj = mock_connect.return_value.cursor.return_value
+            mock_cursor_obj.fetchall.return_value = []
+
+            # Act
+            actual_response = get_record_field_from_table(
+                "test-table", "test-field", "", allow_empty=True
+            )
+
+            # Assert
+            assert {"statusCode": 200, "body": []} == actual_response
+
     @pytest.mark.parametrize(
         "expected_response,mock_side_effect",
         [
@@ -211,6 +395,172 @@ class TestGetFieldFromTable:
             assert expected_response == actual_response
 
 
+class TestGetRecordPageFromTable:
+    def test_get_page(self):
+        # Arrange
+        with patch(
+            "src.modules.database_transactions.psycopg2.connect"
+        ) as mock_connect:
+            mock_connection_obj = (
+                mock_connect.return_value
+            )  # connection object returned from psycopg2.connect
+            mock_cursor_obj = (
+                mock_connection_obj.cursor.return_value
+            )  # cursor object returned from connection obj
+            mock_cursor_obj.fetchmany.return_value = [("first",), ("second",)]
+
+            expected_sql = "SELECT test-field FROM test-table WHERE id > %s ORDER BY id LIMIT %s;"
+            expected_response = {"statusCode": 200, "body": [("first",), ("second",)]}
+
+            # Act
+            actual_response = get_record_page_from_table(
+                "test-table", "test-field", "WHERE id > %s ORDER BY id", [5], 2
+            )
+
+            # Assert
+            mock_cursor_obj.execute.assert_called_with(expected_sql, [5, 2])
+            mock_cursor_obj.fetchmany.assert_called_with(2)
+            mock_cursor_obj.fetchall.assert_not_called()
+            assert expected_response == actual_response
+
+    def test_keyed_page(self):
+        # Arrange
+        with patch(
+            "src.modules.database_transactions.psycopg2.connect"
+        ) as mock_connect:
+            mock_cursor_obj = mock_connect.return_value.cursor.return_value
+            mock_cursor_obj.fetchmany.return_value = [(1, "first"), (2, "second")]
+            mock_cursor_obj.description = [("id",), ("name",)]
+            expected_response = {
+                "statusCode": 200,
+                "body": [{"id": 1, "name": "first"}, {"id": 2, "name": "second"}],
+            }
+
+            # Act
+            actual_response = get_record_page_from_table(
+                "test-table", "id, name", "ORDER BY id", [], 2, keyed=True
+            )
+
+            # Assert
+            assert expected_response == actual_response
+
+    def test_empty_page(self):
+        # Arrange
+        with patch(
+            "src.modules.database_transactions.psycopg2.connect"
+        ) as mock_connect:
+            mock_cursor_obj = mock_connect.return_value.cursor.return_value
+            mock_cursor_obj.fetchmany.return_value = []
+
+            # Act
+            actual_response = get_record_page_from_table("", "", "", [], 2)
+
+            # Assert
+            assert {"statusCode": 200, "body": []} == actual_response
+
+    @pytest.mark.parametrize(
+        "expected_response,mock_side_effect",
+        [
+            ({"statusCode": 500, "body": "Error: test-error"}, Exception("test-error")),
+            (
+                {
+                    "statusCode": 500,
+                    "body": "Error with reading from the database: test-error",
+                },
+                psycopg2.Error("test-error"),
+            ),
+        ],
+    )
+    def test_fail_get_page(self, expected_response, mock_side_effect):
+        # Arrange
+        with patch(
+            "src.modules.database_transactions.psycopg2.connect"
+        ) as mock_connect:
+            mock_cursor_obj = mock_connect.return_value.cursor.return_value
+            mock_cursor_obj.execute.side_effect = mock_side_effect
+
+            # Act
+            actual_response = get_record_page_from_table("", "", "", [], 2)
+
+            # Assert
+            assert expected_response == actual_response
+
+
+class TestGetRecordStreamFromTable:
+    def test_stream_records(self):
+        # Arrange
+        with patch(
+            "src.modules.database_transactions.psycopg2.connect"
+        ) as mock_connect:
+            mock_connection_obj = (
+                mock_connect.return_value
+            )  # connection object returned from psycopg2.connect
+            mock_cursor_obj = (
+                mock_connection_obj.cursor.return_value
+            )  # cursor object returned from connection obj
+            mock_cursor_obj.__next__.side_effect = [(1, "a"), (2, "b"), StopIteration]
+            mock_cursor_obj.description = [("id",), ("name",)]
+
+            expected_sql = "SELECT test-field FROM test-table ORDER BY id;"
+
+            # Act
+            response = get_record_stream_from_table(
+                "test-table", "test-field", "ORDER BY id", [], 50
+            )
+            records = list(response["body"])
+
+            # Assert
+            assert response["statusCode"] == 200
+            assert records == [{"id": 1, "name": "a"}, {"id": 2, "name": "b"}]
+            mock_connection_obj.cursor.assert_called_with(name="record_stream")
+            assert mock_cursor_obj.itersize == 50
+            mock_cursor_obj.execute.assert_called_with(expected_sql, [])
+            mock_cursor_obj.close.assert_called_once()
+
+    def test_stream_closed_early(self):
+        # Arrange
+        with patch(
+            "src.modules.database_transactions.psycopg2.connect"
+        ) as mock_connect:
+            mock_cursor_obj = mock_connect.return_value.cursor.return_value
+
+            # Act
+            response = get_record_stream_from_table("", "", "", [], 50)
+            response["body"].close()
+            response["body"].close()
+
+            # Assert
+            mock_cursor_obj.close.assert_called_once()
+            assert list(response["body"]) == []
+
+    @pytest.mark.parametrize(
+        "expected_response,mock_side_effect",
+        [
+            ({"statusCode": 500, "body": "Error: test-error"}, Exception("test-error")),
+            (
+                {
+                    "statusCode": 500,
+                    "body": "Error with reading from the database: test-error",
+                },
+                psycopg2.Error("test-error"),
+            ),
+        ],
+    )
+    def test_fail_stream(self, expected_response, mock_side_effect):
+        # Arrange
+        with patch(
+            "src.modules.database_transactions.psycopg2.connect"
+        ) as mock_connect:
+            mock_cursor_obj = mock_connect.return_value.cursor.return_value
+            mock_cursor_obj.execute.side_effect = mock_side_effect
+
+            # Act
+            actual_response = get_record_stream_from_table("", "", "", [], 50)
+
+            # Assert
+            assert expected_response == actual_response
+
+
 class TestUpdateField:
     @pytest.mark.parametrize("condition", ["", "WHERE test-condition"])
     def test_success_update_field(self, condition):
@@ -228,16 +578,14 @@ class TestUpdateField:
             table_name = "test-table"
             field = "test-field"
             value = "test-value"
-            expected_sql = (
-                f"UPDATE test-table SET test-field = 'test-value' {condition};"
-            )
+            expected_sql = f"UPDATE test-table SET test-field = %s {condition};"
             expected_response = {"statusCode": 200, "body": "Data successfully updated"}
 
             # Act
             actual_response = update_field(table_name, field, value, condition)
 
             # Assert
-            mock_cursor_obj.execute.assert_called_with(expected_sql)
+            mock_cursor_obj.execute.assert_called_with(expected_sql, [value])
             assert expected_response == actual_response
 
     @pytest.mark.parametrize(
@@ -273,6 +621,106 @@ class TestUpdateField:
             assert expected_response == actual_response
 
 
+class TestUpdateFields:
+    def test_success_update_fields(self):
+        # Arrange
+        with patch(
+            "src.modules.database_transactions.psycopg2.connect"
+        ) as mock_connect:
+            mock_connection_obj = (
+                mock_connect.return_value
+            )  # connection object returned from psycopg2.connect
+            mock_cursor_obj = (
+                mock_connection_obj.cursor.return_value
+            )  # cursor object returned from connection obj
+
+            field_values = {"first-field": "value-one", "second-field": "value-two"}
+            expected_sql = "UPDATE test-table SET first-field = %s, second-field = %s WHERE id = %s;"
+            expected_response = {"statusCode": 200, "body": "Data successfully updated"}
+
+            # Act
+            actual_response = update_fields(
+                "test-table", field_values, "WHERE id = %s", ["test-id"]
+            )
+
+            # Assert
+            mock_cursor_obj.execute.assert_called_with(
+                expected_sql, ["value-one", "value-two", "test-id"]
+            )
+            mock_connection_obj.commit.assert_called()
+            assert expected_response == actual_response
+
+    @pytest.mark.parametrize(
+        "expected_response,mock_fetch_output",
+        [
+            ({"statusCode": 200, "body": [("test-id",)]}, [("test-id",)]),
+            ({"statusCode": 200, "body": []}, []),
+        ],
+    )
+    def test_update_fields_returning(self, expected_response, mock_fetch_output):
+        # Arrange
+        with patch(
+            "src.modules.database_transactions.psycopg2.connect"
+        ) as mock_connect:
+            mock_connection_obj = (
+                mock_connect.return_value
+            )  # connection object returned from psycopg2.connect
+            mock_cursor_obj = (
+                mock_connection_obj.cursor.return_value
+            )  # cursor object returned from connection obj
+            mock_cursor_obj.fetchall.return_value = mock_fetch_output
+
+            expected_sql = "UPDATE test-table SET test-field = %s WHERE id = %s RETURNING id;"
+
+            # Act
+            actual_response = update_fields(
+                "test-table",
+                {"test-field": "test-value"},
+                "WHERE id = %s",
+                ["test-id"],
+                returning="id",
+            )
+
+            # Assert
+            mock_cursor_obj.execute.assert_called_with(
+                expected_sql, ["test-value", "test-id"]
+            )
+            assert expected_response == actual_response
+
+    @pytest.mark.parametrize(
+        "expected_response,mock_side_effect",
+        [
+            ({"statusCode": 500, "body": "Error: test-error"}, Exception("test-error")),
+            (
+                {
+                    "statusCode": 500,
+                    "body": "Error with database when updating record. Error: test-error",
+                },
+                psycopg2.Error("test-error"),
+            ),
+        ],
+    )
+    def test_fail_update_fields(self, expected_response, mock_side_effect):
+        # Arrange
+        with patch(
+            "src.modules.database_transactions.psycopg2.connect"
+        ) as mock_connect:
+            mock_connection_obj = (
+                mock_connect.return_value
+            )  # connection object returned from psycopg2.connect
+            mock_cursor_obj = (
+                mock_connection_obj.cursor.return_value
+            )  # cursor object returned from connection obj
+            mock_cursor_obj.execute.side_effect = mock_side_effect
+
+            # Act
+            actual_response = update_fields("", {"field": "value"}, "")
+
+            # Assert
+            assert expected_response == actual_response
+            mock_connection_obj.rollback.assert_called()
+
+
 class TestDeleteRecord:
     def test_successful_delete(self):
         # Arrange
@@ -299,7 +747,27 @@ class TestDeleteRecord:
             actual_response = delete_record(table_name, condition)
 
             # Assert
-            mock_cursor_obj.execute.assert_called_with(expected_sql)
+            mock_cursor_obj.execute.assert_called_with(expected_sql, None)
+            assert expected_response == actual_response
+
+    def test_delete_returning(self):
+        # Arrange
+        with patch(
+            "src.modules.database_transactions.psycopg2.connect"
+        ) as mock_connect:
+            mock_cursor_obj = mock_connect.return_value.cursor.return_value
+            mock_cursor_obj.fetchall.return_value = [(1,), (2,)]
+
+            expected_sql = "DELETE FROM test-table WHERE id = ANY(%s) RETURNING id;"
+            expected_response = {"statusCode": 200, "body": [(1,), (2,)]}
+
+            # Act
+            actual_response = delete_record(
+                "test-table", "WHERE id = ANY(%s)", [[1, 2, 3]], returning="id"
+            )
+
+            # Assert
+            mock_cursor_obj.execute.assert_called_with(expected_sql, [[1, 2, 3]])
             assert expected_response == actual_response
 
     @pytest.mark.parametrize(
@@ -333,3 +801,68 @@ class TestDeleteRecord:
 
             # Assert
             assert expected_response == actual_response
+
+
+class TestExecuteStatement:
+    def create_mock_cursor(self):
+        mock_cursor_obj = MagicMock()
+        mock_cursor_obj.connection.prepared_statements = set()
+        return mock_cursor_obj
+
+    @patch("src.modules.database_transactions.DB_USE_PREPARED_STATEMENTS", True)
+    def test_statement_prepared_once(self):
+        # Arrange
+        mock_cursor_obj = self.create_mock_cursor()
+        sql = "SELECT a FROM t WHERE b = %s AND c = %s;"
+
+        # Act
+        execute_statement(mock_cursor_obj, sql, [1, 2])
+        execute_statement(mock_cursor_obj, sql, [3, 4])
+
+        # Assert
+        executed = [call.args for call in mock_cursor_obj.execute.call_args_list]
+        statement_name = executed[0][0].split()[1]
+        assert executed == [
+            (f"PREPARE {statement_name} AS SELECT a FROM t WHERE b = $1 AND c = $2;",),
+            (f"EXECUTE {statement_name} (%s, %s);", [1, 2]),
+            (f"EXECUTE {statement_name} (%s, %s);", [3, 4]),
+        ]
+        assert mock_cursor_obj.connection.prepared_statements == {statement_name}
+
+    @patch("src.modules.database_transactions.DB_USE_PREPARED_STATEMENTS", True)
+    def test_statement_without_placeholders(self):
+        # Arrange
+        mock_cursor_obj = self.create_mock_cursor()
+
+        # Act
+        execute_statement(mock_cursor_obj, "SELECT a FROM t;", [])
+
+        # Assert
+        statement_name = mock_cursor_obj.execute.call_args_list[0].args[0].split()[1]
+        mock_cursor_obj.execute.assert_called_with(f"EXECUTE {statement_name};")
+
+    @patch("src.modules.database_transactions.DB_MAX_PREPARED_STATEMENTS", 0)
+    @patch("src.modules.database_transactions.DB_USE_PREPARED_STATEMENTS", True)
+    def test_statement_not_prepared_over_limit(self):
+        # Arrange
+        mock_cursor_obj = self.create_mock_cursor()
+        sql = "SELECT a FROM t WHERE b = %s;"
+
+        # Act
+        execute_statement(mock_cursor_obj, sql, [1])
+
+        # Assert
+        mock_cursor_obj.execute.assert_called_once_with(sql, [1])
+        assert mock_cursor_obj.connection.prepared_statements == set()
+
+    @pytest.mark.parametrize("values", [None, [1]])
+    def test_statement_not_prepared_when_disabled(self, values):
+        # Arrange
+        mock_cursor_obj = self.create_mock_cursor()
+        sql = "SELECT a FROM t WHERE b = %s;"
+
+        # Act
+        execute_statement(mock_cursor_obj, sql, values)
+
+        # Assert
+        mock_cursor_obj.execute.assert_called_once_with(sql, values)
@@ -0,0 +1,62 @@
+import pytest
+from src.modules.json_patch import JsonPatchError, apply_patch, parse_pointer
+
+
+class TestParsePointer:
+    def test_escaped_tokens(self):
+        # Act
+        actual_tokens = parse_pointer("/a~1b/c~0d/0")
+
+        # Assert
+        assert actual_tokens == ["a/b", "c~d", "0"]
+
+    def test_invalid_pointer(self):
+        # Act / Assert
+        with pytest.raises(JsonPatchError):
+            parse_pointer("a/b")
+
+
+class TestApplyPatch:
+    document = {"status": "to do", "labels": [{"start": 0, "end": 4}], "tags": "cat"}
+
+    def test_operations(self):
+        # Arrange
+        operations = [
+            {"op": "test", "path": "/status", "value": "to do"},
+            {"op": "replace", "path": "/status", "value": "done"},
+            {"op": "add", "path": "/labels/-", "value": {"start": 5, "end": 9}},
+            {"op": "add", "path": "/labels/0/name", "value": "noun"},
+            {"op": "remove", "path": "/labels/1/end"},
+            {"op": "copy", "from": "/tags", "path": "/category"},
+            {"op": "move", "from": "/labels/1", "path": "/labels/0"},
+        ]
+
+        # Act
+        actual_document = apply_patch(self.document, operations)
+
+        # Assert
+        assert actual_document == {
+            "status": "done",
+            "labels": [{"start": 5}, {"start": 0, "end": 4, "name": "noun"}],
+            "tags": "cat",
+            "category": "cat",
+        }
+        assert self.document["labels"] == [{"start": 0, "end": 4}]  # left unchanged
+
+    @pytest.mark.parametrize(
+        "operations",
+        [
+            {"op": "remove", "path": "/tags"},
+            [{"op": "remove", "path": "/missing"}],
+            [{"op": "replace", "path": "/labels/1", "value": {}}],
+            [{"op": "add", "path": "/labels/01", "value": {}}],
+            [{"op": "test", "path": "/status", "value": "done"}],
+            [{"op": "move", "from": "/labels", "path": "/labels/0"}],
+            [{"op": "add", "path": "/status"}],
+            [{"op": "rename", "path": "/status"}],
+        ],
+    )
+    def test_invalid_patch(self, operations):
+        # Act / Assert
+        with pytest.raises(JsonPatchError):
+            apply_patch(self.document, operations)
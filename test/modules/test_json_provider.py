@@ -0,0 +1,58 @@
+import datetime
+import json
+import pytest
+from decimal import Decimal
+from unittest.mock import patch
+from src.modules import json_provider
+from src.app import app
+
+
+class TestFastJSONProvider:
+    value = {
+        "b": [(1, "text"), {"date": datetime.date(2024, 1, 2)}],
+        "a": Decimal("1.5"),
+        "c": "ünïcode",
+    }
+
+    @pytest.mark.parametrize("orjson", [json_provider.orjson, None])
+    def test_matches_standard_library(self, orjson):
+        # Arrange
+        expected_value = json.loads(
+            json.dumps(self.value, default=app.json.default, sort_keys=True)
+        )
+
+        # Act
+        with patch("src.modules.json_provider.orjson", orjson):
+            encoded = app.json.dumps_bytes(self.value)
+
+        # Assert
+        assert json.loads(encoded) == expected_value
+        assert expected_value["b"][1]["date"] == "Tue, 02 Jan 2024 00:00:00 GMT"
+        assert list(json.loads(encoded)) == ["a", "b", "c"]  # keys are sorted
+
+    def test_response(self):
+        # Act
+        with app.app_context():
+            response = app.json.response({"statusCode": 200, "body": [(1, "a")]})
+
+        # Assert
+        assert response.mimetype == "application/json"
+        assert json.loads(response.get_data()) == {"statusCode": 200, "body": [[1, "a"]]}
+
+    def test_route_uses_provider(self):
+        # Arrange
+        with patch("src.app.get_user_password") as mock_get_password:
+            mock_get_password.return_value = {"statusCode": 200, "body": [("password",)]}
+
+            # Act
+            response = app.test_client().post("/get_user_password", json={})
+
+        # Assert
+        assert response.get_json() == {"statusCode": 200, "body": [["password"]]}
+
+    def test_loads(self):
+        # Act
+        value = app.json.loads(b'{"a": [1, 2]}')
+
+        # Assert
+        assert value == {"a": [1, 2]}
@@ -0,0 +1,124 @@
+import psycopg2
+from unittest.mock import patch
+from prometheus_client import REGISTRY
+from src.modules.metrics import time_query, record_query_rows
+from src.modules.database_transactions import (
+    close_connection_pool,
+    get_record_field_from_table,
+)
+from src.app import app
+
+
+def get_sample(name, labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+class TestQueryMetrics:
+    def test_time_query(self):
+        # Arrange
+        labels = {"operation": "test-operation", "phase": "execute"}
+        count_before = get_sample("db_query_duration_seconds_count", labels)
+
+        # Act
+        with time_query("test-operation", "execute"):
+            pass
+
+        # Assert
+        assert get_sample("db_query_duration_seconds_count", labels) == count_before + 1
+
+    def test_record_query_rows(self):
+        # Arrange
+        labels = {"operation": "test-operation"}
+        sum_before = get_sample("db_query_rows_sum", labels)
+
+        # Act
+        record_query_rows("test-operation", [(1,), (2,), (3,)])
+
+        # Assert
+        assert get_sample("db_query_rows_sum", labels) == sum_before + 3
+
+    @patch("src.modules.database_transactions.psycopg2.connect")
+    def test_database_helper_timed(self, mock_connect):
+        # Arrange
+        close_connection_pool()
+        mock_cursor_obj = mock_connect.return_value.cursor.return_value
+        mock_cursor_obj.fetchall.return_value = [("test-user",)]
+        operation = "get_record_field_from_table"
+        counts_before = {
+            phase: get_sample(
+                "db_query_duration_seconds_count",
+                {"operation": operation, "phase": phase},
+            )
+            for phase in ["connect", "execute", "fetch", "commit"]
+        }
+
+        # Act
+        get_record_field_from_table("employee", "username", "")
+
+        # Assert
+        for phase, count_before in counts_before.items():
+            labels = {"operation": operation, "phase": phase}
+            assert get_sample("db_query_duration_seconds_count", labels) == count_before + 1
+        close_connection_pool()
+
+    @patch("src.modules.database_transactions.psycopg2.connect")
+    def test_database_error_counted(self, mock_connect):
+        # Arrange
+        close_connection_pool()
+        mock_cursor_obj = mock_connect.return_value.cursor.return_value
+        mock_cursor_obj.execute.side_effect = psycopg2.Error("test-error")
+        labels = {"operation": "get_record_field_from_table"}
+        errors_before = get_sample("db_query_errors_total", labels)
+
+        # Act
+        get_record_field_from_table("employee", "username", "")
+
+        # Assert
+        assert get_sample("db_query_errors_total", labels) == errors_before + 1
+        close_connection_pool()
+
+
+class TestRequestMetrics:
+    @patch("src.app.get_user_password")
+    def test_route_timed(self, mock_get_password):
+        # Arrange
+        mock_get_password.return_value = {"statusCode": 200, "body": [("test",)]}
+        labels = {"route": "/get_user_password", "method": "POST", "status": "200"}
+        count_before = get_sample("http_request_duration_seconds_count", labels)
+        size_before = get_sample(
+            "http_response_size_bytes_count", {"route": "/get_user_password"}
+        )
+
+        # Act
+        app.test_client().post("/get_user_password", json={"user-name": "test"})
+
+        # Assert
+        assert get_sample("http_request_duration_seconds_count", labels) == count_before + 1
+        assert (
+            get_sample("http_response_size_bytes_count", {"route": "/get_user_password"})
+            == size_before + 1
+        )
+
+    @patch("src.app.get_user_password")
+    def test_error_status_from_body(self, mock_get_password):
+        # Arrange
+        mock_get_password.return_value = {"statusCode": 400, "body": "Error: test-error"}
+        labels = {"route": "/get_user_password", "status": "400"}
+        errors_before = get_sample("http_request_errors_total", labels)
+
+        # Act
+        response = app.test_client().post("/get_user_password", json={})
+
+        # Assert
+        assert response.status_code == 200  # handlers report errors in the body
+        assert get_sample("http_request_errors_total", labels) == errors_before + 1
+
+    def test_metrics_route(self):
+        # Act
+        response = app.test_client().get("/metrics")
+
+        # Assert
+        assert response.status_code == 200
+        assert response.content_type.startswith("text/plain")
+        assert b"http_request_duration_seconds" in response.data
+        assert b"db_query_duration_seconds" in response.data
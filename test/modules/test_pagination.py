@@ -0,0 +1,44 @@
+import pytest
+from src.modules.pagination import (
+    InvalidPageRequest,
+    get_page_size,
+    encode_cursor,
+    decode_cursor,
+)
+
+
+class TestGetPageSize:
+    @pytest.mark.parametrize(
+        "args,expected_page_size",
+        [({}, 100), ({"page-size": "25"}, 25), ({"page-size": "5000"}, 1000)],
+    )
+    def test_page_size(self, args, expected_page_size):
+        # Act
+        actual_page_size = get_page_size(args)
+
+        # Assert
+        assert expected_page_size == actual_page_size
+
+    @pytest.mark.parametrize("page_size", ["abc", "0", "-3"])
+    def test_invalid_page_size(self, page_size):
+        # Act & Assert
+        with pytest.raises(InvalidPageRequest):
+            get_page_size({"page-size": page_size})
+
+
+class TestCursor:
+    def test_round_trip(self):
+        # Arrange
+        position = {"annotationid": 42}
+
+        # Act
+        actual_position = decode_cursor(encode_cursor(position))
+
+        # Assert
+        assert position == actual_position
+
+    @pytest.mark.parametrize("cursor", ["not-a-cursor", encode_cursor([1, 2])])
+    def test_invalid_cursor(self, cursor):
+        # Act & Assert
+        with pytest.raises(InvalidPageRequest):
+            decode_cursor(cursor)
@@ -0,0 +1,84 @@
+import pytest
+from src.modules.query_builder import (
+    build_insert,
+    build_bulk_insert,
+    build_update,
+    build_select,
+    build_page_select,
+    build_delete,
+    convert_placeholders,
+    get_statement_name,
+)
+
+
+class TestBuildStatements:
+    def test_build_insert(self):
+        # Act
+        sql = build_insert("test-table", ("a", "b"))
+
+        # Assert
+        assert sql == "INSERT INTO test-table (a, b) VALUES (%s, %s);"
+
+    def test_build_bulk_insert(self):
+        # Act
+        sql = build_bulk_insert("test-table", ("a", "b"), "id")
+
+        # Assert
+        assert sql == "INSERT INTO test-table (a, b) VALUES %s RETURNING id;"
+
+    @pytest.mark.parametrize(
+        "returning,expected_sql",
+        [
+            (None, "UPDATE test-table SET a = %s, b = %s WHERE id = %s;"),
+            ("id", "UPDATE test-table SET a = %s, b = %s WHERE id = %s RETURNING id;"),
+        ],
+    )
+    def test_build_update(self, returning, expected_sql):
+        # Act
+        sql = build_update("test-table", ("a", "b"), "WHERE id = %s", returning)
+
+        # Assert
+        assert sql == expected_sql
+
+    def test_build_select(self):
+        # Act
+        select_sql = build_select("test-table", "a", "WHERE id = %s")
+        page_sql = build_page_select("test-table", "a", "WHERE id = %s")
+
+        # Assert
+        assert select_sql == "SELECT a FROM test-table WHERE id = %s;"
+        assert page_sql == "SELECT a FROM test-table WHERE id = %s LIMIT %s;"
+
+    def test_build_delete(self):
+        # Act
+        sql = build_delete("test-table", "WHERE id = ANY(%s)", "id")
+
+        # Assert
+        assert sql == "DELETE FROM test-table WHERE id = ANY(%s) RETURNING id;"
+
+    def test_statements_cached(self):
+        # Act
+        first_sql = build_select("test-table", "a", "")
+        second_sql = build_select("test-table", "a", "")
+
+        # Assert
+        assert first_sql is second_sql
+
+
+class TestPreparedStatementHelpers:
+    def test_convert_placeholders(self):
+        # Act
+        sql = convert_placeholders("SELECT a FROM t WHERE b = %s AND c = %s LIMIT %s;")
+
+        # Assert
+        assert sql == "SELECT a FROM t WHERE b = $1 AND c = $2 LIMIT $3;"
+
+    def test_statement_name(self):
+        # Act
+        first_name = get_statement_name("SELECT a FROM t;")
+        second_name = get_statement_name("SELECT b FROM t;")
+
+        # Assert
+        assert first_name == get_statement_name("SELECT a FROM t;")
+        assert first_name != second_name
+        assert first_name.startswith("statement_")
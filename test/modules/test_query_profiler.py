@@ -0,0 +1,146 @@
+import json
+import logging
+import psycopg2
+import pytest
+from flask import g
+from unittest.mock import MagicMock, patch
+from src.modules.query_profiler import (
+    record_statement,
+    get_query_plan,
+    start_query_trace,
+)
+from src.modules.database_transactions import close_connection_pool
+from src.app import app
+
+
+def create_mock_cursor(rowcount=2):
+    mock_cursor_obj = MagicMock()
+    mock_cursor_obj.rowcount = rowcount
+    return mock_cursor_obj
+
+
+class TestRecordStatement:
+    @patch("src.modules.query_profiler.QUERY_PROFILING", "header")
+    def test_statement_traced(self):
+        # Arrange
+        with app.test_request_context(headers={"X-Query-Profile": "true"}):
+            start_query_trace()
+
+            # Act
+            record_statement(create_mock_cursor(), "SELECT a FROM t;", None, 0.0012)
+
+            # Assert
+            assert g.query_trace == [
+                {"sql": "SELECT a FROM t;", "duration-ms": 1.2, "rows": 2}
+            ]
+
+    @pytest.mark.parametrize(
+        "profiling,headers",
+        [("off", {"X-Query-Profile": "true"}), ("header", {})],
+    )
+    def test_statement_not_traced(self, profiling, headers):
+        # Arrange
+        with patch("src.modules.query_profiler.QUERY_PROFILING", profiling):
+            with app.test_request_context(headers=headers):
+                start_query_trace()
+
+                # Act
+                record_statement(create_mock_cursor(), "SELECT a FROM t;", None, 0.001)
+
+                # Assert
+                assert g.query_trace is None
+
+    @patch("src.modules.query_profiler.get_query_plan")
+    def test_slow_statement_logged(self, mock_get_plan, caplog):
+        # Arrange
+        mock_get_plan.return_value = "Seq Scan on t"
+        mock_cursor_obj = create_mock_cursor()
+
+        # Act
+        with caplog.at_level(logging.WARNING):
+            record_statement(mock_cursor_obj, "SELECT a FROM t WHERE b = %s;", [1], 10)
+
+        # Assert
+        mock_get_plan.assert_called_with(mock_cursor_obj, "SELECT a FROM t WHERE b = %s;", [1])
+        assert "Slow query" in caplog.text
+        assert "Seq Scan on t" in caplog.text
+
+    @patch("src.modules.query_profiler.get_query_plan")
+    def test_fast_statement_not_logged(self, mock_get_plan, caplog):
+        # Act
+        with caplog.at_level(logging.WARNING):
+            record_statement(create_mock_cursor(), "SELECT a FROM t;", None, 0)
+
+        # Assert
+        mock_get_plan.assert_not_called()
+        assert caplog.text == ""
+
+
+class TestGetQueryPlan:
+    def test_query_plan(self):
+        # Arrange
+        mock_cursor_obj = create_mock_cursor()
+        explain_cursor = mock_cursor_obj.connection.cursor.return_value.__enter__.return_value
+        explain_cursor.fetchall.return_value = [("Index Scan",), ("  Index Cond",)]
+
+        # Act
+        plan = get_query_plan(mock_cursor_obj, "SELECT a FROM t WHERE b = %s;", [1])
+
+        # Assert
+        assert plan == "Index Scan\n  Index Cond"
+        explain_cursor.execute.assert_any_call("EXPLAIN SELECT a FROM t WHERE b = %s;", [1])
+        explain_cursor.execute.assert_called_with("RELEASE SAVEPOINT query_plan;")
+
+    def test_failed_plan_rolled_back_to_savepoint(self):
+        # Arrange
+        mock_cursor_obj = create_mock_cursor()
+        explain_cursor = mock_cursor_obj.connection.cursor.return_value.__enter__.return_value
+
+        def execute(sql, values=None):
+            if sql.startswith("EXPLAIN"):
+                raise psycopg2.Error("test-error")
+
+        explain_cursor.execute.side_effect = execute
+
+        # Act
+        plan = get_query_plan(mock_cursor_obj, "SELECT a FROM t;", None)
+
+        # Assert
+        assert plan is None
+        explain_cursor.execute.assert_called_with("ROLLBACK TO SAVEPOINT query_plan;")
+
+
+class TestQueryTraceHeader:
+    @patch("src.modules.query_profiler.QUERY_PROFILING", "header")
+    @patch("src.modules.database_transactions.DB_USE_PREPARED_STATEMENTS", False)
+    @patch("src.modules.database_transactions.psycopg2.connect")
+    def test_trace_header_returned(self, mock_connect):
+        # Arrange
+        close_connection_pool()
+        mock_cursor_obj = mock_connect.return_value.cursor.return_value
+        mock_cursor_obj.fetchall.return_value = [("test-password",)]
+        mock_cursor_obj.rowcount = 1
+
+        # Act
+        response = app.test_client().post(
+            "/get_user_password",
+            json={"user-name": "test-user"},
+            headers={"X-Query-Profile": "true"},
+        )
+
+        # Assert
+        query_trace = json.loads(response.headers["X-Query-Trace"])
+        assert query_trace[0]["sql"] == "SELECT password FROM employee WHERE username = %s;"
+        assert query_trace[0]["rows"] == 1
+        close_connection_pool()
+
+    @patch("src.app.get_user_password")
+    def test_no_trace_header_by_default(self, mock_get_password):
+        # Arrange
+        mock_get_password.return_value = {"statusCode": 200, "body": []}
+
+        # Act
+        response = app.test_client().post("/get_user_password", json={})
+
+        # Assert
+        assert "X-Query-Trace" not in response.headers
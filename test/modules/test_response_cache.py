@@ -0,0 +1,157 @@
+import json
+import pytest
+from unittest.mock import MagicMock, patch
+from src.modules.response_cache import (
+    get_table_versions,
+    get_cached_response,
+    response_cache,
+)
+from src.app import app
+
+
+@pytest.fixture(autouse=True)
+def clear_response_cache():
+    response_cache.clear()
+    yield
+    response_cache.clear()
+
+
+class TestGetTableVersions:
+    @patch("src.modules.response_cache.get_record_field_from_table")
+    def test_get_table_versions(self, mock_get_field):
+        # Arrange
+        mock_get_field.return_value = {"statusCode": 200, "body": [("employee", 3)]}
+
+        # Act
+        actual_response = get_table_versions(["employee"])
+
+        # Assert
+        assert mock_get_field.return_value == actual_response
+        mock_get_field.assert_called_with(
+            "table_version",
+            "tablename, sum(version)::bigint",
+            "WHERE tablename = ANY(%s) GROUP BY tablename ORDER BY tablename",
+            [["employee"]],
+        )
+
+
+class TestGetCachedResponse:
+    versions = {"statusCode": 200, "body": [("employee", 3)]}
+
+    @patch("src.modules.response_cache.get_table_versions")
+    def test_body_cached(self, mock_get_versions):
+        # Arrange
+        mock_get_versions.return_value = self.versions
+        build_response = MagicMock(return_value={"statusCode": 200, "body": ["user"]})
+
+        # Act
+        with app.test_request_context(method="GET"):
+            first_response = get_cached_response(["employee"], build_response)
+        with app.test_request_context(method="GET"):
+            second_response = get_cached_response(["employee"], build_response)
+
+        # Assert
+        build_response.assert_called_once()
+        assert json.loads(first_response.get_data()) == {"statusCode": 200, "body": ["user"]}
+        assert first_response.get_data() == second_response.get_data()
+        assert first_response.get_etag() == second_response.get_etag()
+        assert first_response.cache_control.no_cache
+
+    @patch("src.modules.response_cache.RESPONSE_CACHE_MAX_BODY_SIZE", 16)
+    @patch("src.modules.response_cache.get_table_versions")
+    def test_large_body_not_cached(self, mock_get_versions):
+        # Arrange
+        mock_get_versions.return_value = self.versions
+        build_response = MagicMock(return_value={"statusCode": 200, "body": ["user"] * 10})
+
+        # Act
+        with app.test_request_context(method="GET"):
+            first_response = get_cached_response(["employee"], build_response)
+        with app.test_request_context(method="GET"):
+            second_response = get_cached_response(["employee"], build_response)
+
+        # Assert
+        assert build_response.call_count == 2
+        assert first_response.get_data() == second_response.get_data()
+        assert first_response.get_etag() == second_response.get_etag()
+
+    @patch("src.modules.response_cache.get_table_versions")
+    def test_not_modified(self, mock_get_versions):
+        # Arrange
+        mock_get_versions.return_value = self.versions
+        build_response = MagicMock(return_value={"statusCode": 200, "body": ["user"]})
+        with app.test_request_context(method="GET"):
+            etag, _ = get_cached_response(["employee"], build_response).get_etag()
+        build_response.reset_mock()
+
+        # Act
+        with app.test_request_context(
+            method="GET", headers={"If-None-Match": f'"{etag}"'}
+        ):
+            response = get_cached_response(["employee"], build_response)
+
+        # Assert
+        assert response.status_code == 304
+        assert response.get_etag() == (etag, False)
+        build_response.assert_not_called()
+
+    @patch("src.modules.response_cache.get_table_versions")
+    def test_new_version_changes_etag(self, mock_get_versions):
+        # Arrange
+        mock_get_versions.return_value = self.versions
+        build_response = MagicMock(return_value={"statusCode": 200, "body": ["user"]})
+        with app.test_request_context(method="GET"):
+            first_etag = get_cached_response(["employee"], build_response).get_etag()
+        mock_get_versions.return_value = {"statusCode": 200, "body": [("employee", 4)]}
+
+        # Act
+        with app.test_request_context(method="GET"):
+            second_etag = get_cached_response(["employee"], build_response).get_etag()
+
+        # Assert
+        assert first_etag != second_etag
+        assert build_response.call_count == 2
+
+    @patch("src.modules.response_cache.get_table_versions")
+    def test_query_changes_etag(self, mock_get_versions):
+        # Arrange
+        mock_get_versions.return_value = self.versions
+        build_response = MagicMock(return_value={"statusCode": 200, "body": ["user"]})
+
+        # Act
+        with app.test_request_context(method="GET", query_string={"team": "a"}):
+            first_etag = get_cached_response(["employee"], build_response).get_etag()
+        with app.test_request_context(method="GET", query_string={"team": "b"}):
+            second_etag = get_cached_response(["employee"], build_response).get_etag()
+
+        # Assert
+        assert first_etag != second_etag
+
+    @patch("src.modules.response_cache.get_table_versions")
+    def test_errors_not_cached(self, mock_get_versions):
+        # Arrange
+        mock_get_versions.return_value = self.versions
+        build_response = MagicMock(return_value={"statusCode": 500, "body": "Error"})
+
+        # Act
+        with app.test_request_context(method="GET"):
+            first_response = get_cached_response(["employee"], build_response)
+        with app.test_request_context(method="GET"):
+            get_cached_response(["employee"], build_response)
+
+        # Assert
+        assert {"statusCode": 500, "body": "Error"} == first_response
+        assert build_response.call_count == 2
+
+    @patch("src.modules.response_cache.get_table_versions")
+    def test_versions_unavailable(self, mock_get_versions):
+        # Arrange
+        mock_get_versions.return_value = {"statusCode": 500, "body": "Error"}
+        build_response = MagicMock(return_value={"statusCode": 200, "body": ["user"]})
+
+        # Act
+        with app.test_request_context(method="GET"):
+            actual_response = get_cached_response(["employee"], build_response)
+
+        # Assert
+        assert {"statusCode": 200, "body": ["user"]} == actual_response
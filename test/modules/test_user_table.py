@@ -3,12 +3,22 @@ from src.modules.user_table import (
     get_user_password,
     get_users,
     get_user_access_level,
+    get_employee_details,
+    employee_cache,
 )
 from unittest.mock import patch
 from src.app import app
 import pytest
 
 
+# The employee cache is shared by the whole process so each test starts with an empty one
+@pytest.fixture(autouse=True)
+def clear_employee_cache():
+    employee_cache.clear()
+    yield
+    employee_cache.clear()
+
+
 class TestAddUser:
 
     @pytest.fixture()
@@ -53,6 +63,18 @@ class TestAddUser:
                 list(self.valid_json_input.values()),
             )
 
+    @patch("src.modules.user_table.add_to_table")
+    def test_add_user_invalidates_cache(self, mock_add_to_table, set_up):
+        # Arrange
+        mock_add_to_table.return_value = {"body": "Data successfully added", "statusCode": 200}
+        employee_cache.set("test-user", {"admin": False})
+        with app.test_request_context(method="POST", json=self.valid_json_input):
+            # Act
+            add_user()
+
+            # Assert
+            assert employee_cache.get("test-user") is None
+
     @patch("src.modules.user_table.add_to_table")
     def test_invalid_input(self, mock_add_to_table):
         # Arrange
@@ -99,7 +121,7 @@ class TestGetUserPassword:
         fake_input = {"user-name": "test-user"}
         employee_table = "employee"
         attribute = "password"
-        condition = "WHERE username = 'test-user'"
+        condition = "WHERE username = %s"
         mock_get_field.return_value = mock_return_value
 
         with app.test_request_context(method="POST", json=fake_input):
@@ -108,7 +130,9 @@ class TestGetUserPassword:
 
             # Assert
             assert expected_response == actual_response
-            mock_get_field.assert_called_with(employee_table, attribute, condition)
+            mock_get_field.assert_called_with(
+                employee_table, attribute, condition, ["test-user"]
+            )
 
     @patch("src.modules.user_table.get_record_field_from_table")
     def test_invalid_input(self, mock_get_field):
@@ -176,8 +200,11 @@ class TestGetUserAccessLevel:
     @patch("src.modules.user_table.get_record_field_from_table")
     def test_success_response(self, mock_get_field):
         # Arrange
-        mock_get_field.return_value = {"body": "fake-password", "statusCode": 200}
-        expected_response = {"body": "fake-password", "statusCode": 200}
+        mock_get_field.return_value = {
+            "body": [(True, "test-team", "test-first", "test-last")],
+            "statusCode": 200,
+        }
+        expected_response = {"body": [(True,)], "statusCode": 200}
 
         with app.test_request_context(method="POST", json=self.valid_input):
             # Act
@@ -186,9 +213,24 @@ class TestGetUserAccessLevel:
             # Assert
             assert expected_response == actual_response
             mock_get_field.assert_called_with(
-                "employee", "admin", "WHERE username = 'test-user'"
+                "employee",
+                "admin, team, firstname, lastname",
+                "WHERE username = %s",
+                ["test-user"],
             )
 
+    @patch("src.modules.user_table.get_record_field_from_table")
+    def test_user_not_found(self, mock_get_field):
+        # Arrange
+        mock_get_field.return_value = {"body": "Error: no records found", "statusCode": 500}
+
+        with app.test_request_context(method="POST", json=self.valid_input):
+            # Act
+            actual_response = get_user_access_level()
+
+            # Assert
+            assert mock_get_field.return_value == actual_response
+
     @patch("src.modules.user_table.get_record_field_from_table")
     def test_exception_raise(self, mock_get_field):
         # Arrange
@@ -201,3 +243,43 @@ class TestGetUserAccessLevel:
 
             # Assert
             assert expected_response == actual_response
+
+
+class TestGetEmployeeDetails:
+    @patch("src.modules.user_table.get_record_field_from_table")
+    def test_details_cached(self, mock_get_field):
+        # Arrange
+        mock_get_field.return_value = {
+            "body": [(False, "test-team", "test-first", "test-last")],
+            "statusCode": 200,
+        }
+        expected_response = {
+            "body": {
+                "admin": False,
+                "team": "test-team",
+                "firstname": "test-first",
+                "lastname": "test-last",
+            },
+            "statusCode": 200,
+        }
+
+        # Act
+        first_response = get_employee_details("test-user")
+        second_response = get_employee_details("test-user")
+
+        # Assert
+        assert expected_response == first_response == second_response
+        mock_get_field.assert_called_once()
+        assert employee_cache.stats() == {"hits": 1, "misses": 1, "size": 1}
+
+    @patch("src.modules.user_table.get_record_field_from_table")
+    def test_missing_user_not_cached(self, mock_get_field):
+        # Arrange
+        mock_get_field.return_value = {"body": "Error: no records found", "statusCode": 500}
+
+        # Act
+        get_employee_details("test-user")
+        get_employee_details("test-user")
+
+        # Assert
+        assert mock_get_field.call_count == 2